@@ -1,31 +1,45 @@
-import json
 import random
 import subprocess
 from navigation_tool import NavigationTool
+from route_planner import RouteProgress, compare_routes, load_navigation_points, plan_route, print_comparison
 
 # Load navigation points from the JSON file
-with open('navigation_points.json', 'r') as file:
-    navigation_data = json.load(file)
-
-navigation_points = navigation_data['points']
+navigation_points = load_navigation_points('navigation_points.json')
 
 # Select 10% of the points randomly
 random.seed(42)  # Optional: Ensures reproducibility
 sample_size = max(1, len(navigation_points) // 10)  # Ensure at least 1 point is selected
 selected_points = random.sample(navigation_points, sample_size)
 
+# Resume after the last completed point, visiting the rest in the cheapest order. The
+# first target is typed in full (see below), so the route is planned without a start.
+progress = RouteProgress('route_progress_10percent.json')
+remaining_points = progress.remaining(selected_points)
+route = plan_route(remaining_points)
+print_comparison(compare_routes(remaining_points, route))
+
 # Initialize the NavigationTool
 nav_tool = NavigationTool()
+# The dialog may have been reset since the last run, so the first target is typed in full
+last_kingdom, last_x, last_y = None, None, None
 
 # Iterate over the selected navigation points
-for kingdom, x, y in selected_points:
+for kingdom, x, y in route:
     print(f"Navigating to Kingdom: {kingdom}, X: {x}, Y: {y}")
     
-    # Navigate using NavigationTool
-    nav_tool.navigate_to_coordinates(kingdom, x, y)
+    # Navigate using NavigationTool, skipping fields that have not changed
+    if nav_tool.navigate_to_coordinates(kingdom, x, y, last_kingdom, last_x, last_y):
+        last_kingdom, last_x, last_y = kingdom, x, y
+    else:
+        # The dialog's contents are unknown after a failure, so re-enter every field next time
+        last_kingdom, last_x, last_y = None, None, None
 
     # Run the workflow script
     print("Running workflow...")
     subprocess.run(['python', 'workflow_template_creation.py'])
 
+    progress.mark((kingdom, x, y))
     print(f"✅ Completed workflow for Kingdom: {kingdom}, X: {x}, Y: {y}\n")
+
+# Start from the beginning on the next run
+progress.clear()
@@ -0,0 +1,192 @@
+import logging
+import queue
+import subprocess
+import threading
+import time
+import uuid
+
+# Default time to wait for a single command to finish on the device
+COMMAND_TIMEOUT = 10.0
+
+
+class AdbSessionError(RuntimeError):
+    """Raised when a command sent over a persistent ADB shell fails."""
+
+    def __init__(self, command, returncode, output, reason=None):
+        super().__init__(reason or f"'{command}' exited with status {returncode}: {output}")
+        self.command = command
+        self.returncode = returncode
+        self.output = output
+
+
+class AdbSession:
+    """One long-lived `adb shell` process per device, fed commands over stdin.
+
+    Every command is followed by an `echo` of a unique marker plus the exit
+    status, so the reader knows where one response ends and the next begins.
+    """
+
+    def __init__(self, device_id="emulator-5554", timeout=COMMAND_TIMEOUT):
+        self.device_id = device_id
+        self.timeout = timeout
+        self.logger = logging.getLogger("AdbSession")
+        self._process = None
+        self._lines = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Spawn the shell process if it is not already running."""
+        if self.is_alive():
+            return
+        command = ["adb"]
+        if self.device_id:
+            command += ["-s", self.device_id]
+        command.append("shell")
+
+        self.logger.debug(f"Starting persistent ADB shell: {' '.join(command)}")
+        self._process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+        self._lines = queue.Queue()
+        threading.Thread(target=self._pump_output, args=(self._process, self._lines), daemon=True).start()
+
+    @staticmethod
+    def _pump_output(process, lines):
+        """Move shell output into a queue so reads can time out on every platform."""
+        for line in process.stdout:
+            lines.put(line.rstrip("\r\n"))
+        lines.put(None)  # Shell exited
+
+    def is_alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    def run(self, command, timeout=None):
+        """Run a shell command on the device and return its output.
+
+        Raises AdbSessionError if the command exits non-zero, and restarts
+        the shell on the next call if the device connection dropped.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        marker = f"__ADB_DONE_{uuid.uuid4().hex}__"
+
+        with self._lock:
+            self.start()
+            try:
+                self._process.stdin.write(f"{{ {command}; }} 2>&1; echo {marker} $?\n")
+                self._process.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                self.close()
+                raise AdbSessionError(command, -1, f"ADB shell is not available: {e}")
+
+            output = []
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    line = self._lines.get(timeout=max(remaining, 0))
+                except queue.Empty:
+                    # The framing is lost once a command times out, so start over.
+                    self.close()
+                    raise AdbSessionError(command, -1, "\n".join(output),
+                                          reason=f"'{command}' timed out after {timeout}s")
+
+                if line is None:
+                    self.close()
+                    raise AdbSessionError(command, -1, "ADB shell exited: " + "\n".join(output))
+
+                if marker in line:
+                    # The marker may share a line with output that had no trailing newline
+                    head, _, status = line.partition(marker)
+                    if head:
+                        output.append(head)
+                    try:
+                        returncode = int(status.strip() or -1)
+                    except ValueError:
+                        # A garbled status line means the framing can no longer be trusted either.
+                        self.close()
+                        raise AdbSessionError(command, -1, "\n".join(output),
+                                              reason=f"'{command}' returned an unreadable status: {status!r}")
+                    break
+                output.append(line)
+
+        result = "\n".join(output).strip()
+        self.logger.debug(f"ADB [{returncode}] {command}: {result}")
+        if returncode != 0:
+            raise AdbSessionError(command, returncode, result)
+        return result
+
+    def close(self):
+        """Terminate the shell process."""
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        if self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# 📌 One shared session per device
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_session(device_id="emulator-5554"):
+    """Return the shared persistent session for a device, creating it on first use."""
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(device_id)
+        if session is None:
+            session = AdbSession(device_id)
+            _SESSIONS[device_id] = session
+        return session
+
+
+def measure_tap_latency(device_id="emulator-5554", x=8, y=61, samples=10):
+    """Time `input tap` per call, spawning adb each time versus over a persistent session.
+
+    Returns a dict of mean milliseconds per tap for both modes. The tap lands
+    on the given point, so pick one that is harmless on the current screen.
+    """
+    command = f"input tap {x} {y}"
+
+    start = time.perf_counter()
+    for _ in range(samples):
+        subprocess.run(["adb", "-s", device_id, "shell"] + command.split(), capture_output=True, check=True)
+    per_call_ms = (time.perf_counter() - start) * 1000 / samples
+
+    with AdbSession(device_id) as session:
+        session.run("true")  # Exclude shell start-up from the measurement
+        start = time.perf_counter()
+        for _ in range(samples):
+            session.run(command)
+        session_ms = (time.perf_counter() - start) * 1000 / samples
+
+    return {"subprocess_ms": per_call_ms, "session_ms": session_ms}
+
+
+if __name__ == "__main__":
+    import sys
+
+    device = sys.argv[1] if len(sys.argv) > 1 else "emulator-5554"
+    latency = measure_tap_latency(device)
+    print("⏱️ Per-tap latency")
+    print(f"🔹 adb subprocess per tap: {latency['subprocess_ms']:.1f} ms")
+    print(f"🔹 persistent session:     {latency['session_ms']:.1f} ms")
@@ -0,0 +1,255 @@
+import json
+import os
+from collections import Counter, deque
+import numpy as np
+from kxy_analytics import KXY_PATTERN
+
+# 📂 Files
+CALIBRATION_FILE = "calibration.json"
+
+# 📌 Calibration Parameters
+SCREEN_CENTER = (800, 450)  # Screen point the camera's world position refers to
+LATTICE_PARITY = 0          # Tiles on the staggered map have (X + Y) % 2 == LATTICE_PARITY
+MIN_GROUP_SIZE = 3          # Taps needed before a screen's camera position is fitted
+TRIM_TILES = 1.0            # Residual (tiles) beyond which a pair is treated as an OCR misread
+TRIM_ROUNDS = 3
+ANCHOR_HISTORY = 5          # Recent OCR anchors whose median camera is trusted
+
+# Sources recorded with the camera parked on one screen; refined.json came from a
+# mapper that moved the camera mid-pass at a different zoom, so it is left out
+CALIBRATION_SOURCES = ("ocr_labels.txt", "click_data.json", "ocr_results")
+
+
+class Calibration:
+    """
+    Affine map from screen taps to world tiles for a fixed zoom level.
+
+        world = camera + matrix @ (screen - SCREEN_CENTER)
+
+    camera is the (X, Y) world position under SCREEN_CENTER. It changes every
+    time the map moves, so it is located from one OCR'd anchor tap per screen
+    while matrix stays fixed.
+    """
+
+    def __init__(self, matrix, center=SCREEN_CENTER, parity=LATTICE_PARITY):
+        self.matrix = np.asarray(matrix, dtype=float)
+        self.center = np.asarray(center, dtype=float)
+        self.parity = parity
+
+    def predict(self, screen_points, camera):
+        """(N, 2) float world positions for (N, 2) screen points."""
+        offsets = np.atleast_2d(np.asarray(screen_points, dtype=float)) - self.center
+        return np.asarray(camera, dtype=float) + offsets @ self.matrix.T
+
+    def snap(self, world):
+        """Nearest lattice tiles to (N, 2) float world positions, measured in screen pixels."""
+        world = np.atleast_2d(world)
+        inverse = np.linalg.inv(self.matrix)
+        base = np.floor(world).astype(np.int64)
+
+        best = None
+        best_distance = None
+        for dx in (0, 1):
+            for dy in (0, 1):
+                candidate = base + (dx, dy)
+                distance = np.linalg.norm((candidate - world) @ inverse.T, axis=1)
+                distance[(candidate.sum(axis=1) % 2) != self.parity] = np.inf
+                if best is None:
+                    best, best_distance = candidate, distance
+                else:
+                    closer = distance < best_distance
+                    best[closer] = candidate[closer]
+                    best_distance[closer] = distance[closer]
+        return best
+
+    def predict_tiles(self, screen_points, camera):
+        """(N, 2) integer world tiles hit by tapping each screen point."""
+        return self.snap(self.predict(screen_points, camera))
+
+    def locate_camera(self, screen_points, tiles):
+        """Camera position from one or more taps whose tiles are known (e.g. by OCR)."""
+        offsets = np.atleast_2d(np.asarray(screen_points, dtype=float)) - self.center
+        cameras = np.atleast_2d(np.asarray(tiles, dtype=float)) - offsets @ self.matrix.T
+        return cameras.mean(axis=0)
+
+    def tile_pitch(self):
+        """Screen offsets (px) of one step in world X and in world Y."""
+        inverse = np.linalg.inv(self.matrix)
+        return inverse[:, 0], inverse[:, 1]
+
+    def save(self, path=CALIBRATION_FILE, stats=None):
+        data = {"matrix": self.matrix.tolist(), "center": self.center.tolist(), "parity": self.parity}
+        if stats:
+            data["stats"] = stats
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=CALIBRATION_FILE):
+        """The saved calibration, or None if none has been fitted."""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls(data["matrix"], data["center"], data["parity"])
+
+
+class KxyTracker:
+    """
+    Predicts the KXY of taps on one parked screen from a few OCR'd anchors.
+
+    Every OCR read both checks the current prediction (drift) and re-anchors
+    the camera. Camera and kingdom are the median and majority over the
+    last ANCHOR_HISTORY anchors, so once a few anchors agree a single
+    misread does not move them.
+    """
+
+    def __init__(self, calibration, history=ANCHOR_HISTORY):
+        self.calibration = calibration
+        self._kingdoms = deque(maxlen=history)
+        self._cameras = deque(maxlen=history)
+        self.checked = 0
+        self.drifted = 0
+
+    @property
+    def kingdom(self):
+        return Counter(self._kingdoms).most_common(1)[0][0] if self._kingdoms else None
+
+    @property
+    def camera(self):
+        return np.median(np.array(self._cameras), axis=0) if self._cameras else None
+
+    def predict(self, tap):
+        """Predicted 'K:.. X:.. Y:..' text for a tap, or None before the first anchor."""
+        if self.camera is None:
+            return None
+        x, y = self.calibration.predict_tiles([tap], self.camera)[0]
+        return f"K:{self.kingdom} X:{x} Y:{y}"
+
+    def observe(self, tap, text):
+        """
+        Feed one OCR'd tap.
+
+        Returns:
+            tuple: (KXY text, True if it was predicted rather than read), or (None, False).
+        """
+        match = KXY_PATTERN.search(text or "")
+        if not match:
+            predicted = self.predict(tap)
+            return predicted, predicted is not None
+
+        kingdom, x, y = (int(value) for value in match.groups())
+        read = f"K:{kingdom} X:{x} Y:{y}"
+        predicted = self.predict(tap)
+        if predicted is not None:
+            self.checked += 1
+            if predicted != read:
+                self.drifted += 1
+                print(f"⚠️ Tap {tap}: predicted {predicted}, OCR read {read}")
+
+        self._kingdoms.append(kingdom)
+        self._cameras.append(self.calibration.locate_camera([tap], [(x, y)]))
+        return read, False
+
+
+def group_screens(observations):
+    """
+    Split (source, tap_x, tap_y, kingdom, x, y) observations into per-screen groups.
+
+    A scan pass taps each screen point once, so within one source a repeated
+    tap point means the map (and camera) may have moved and a new group starts.
+    """
+    groups = []
+    current, seen, source = [], set(), None
+    for observation in observations:
+        tap = observation[1:3]
+        if observation[0] != source or tap in seen:
+            if current:
+                groups.append(current)
+            current, seen, source = [], set(), observation[0]
+        current.append(observation)
+        seen.add(tap)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def observations_from_tile_db(db, sources=CALIBRATION_SOURCES):
+    """Tap/KXY pairs from a tile_db.TileDB, in the order they were recorded."""
+    placeholders = ", ".join("?" for _ in sources)
+    rows = db.conn.execute(
+        "SELECT source, tap_x, tap_y, kingdom, x, y FROM observations"
+        " WHERE tap_x IS NOT NULL AND tap_y IS NOT NULL AND kingdom IS NOT NULL"
+        f" AND source IN ({placeholders}) ORDER BY source, id",
+        sources,
+    )
+    return [tuple(row) for row in rows]
+
+
+def fit_calibration(groups, center=SCREEN_CENTER, min_group_size=MIN_GROUP_SIZE, trim=TRIM_TILES):
+    """
+    Least-squares fit of one shared matrix with a camera position per screen group.
+
+    Pairs further than `trim` tiles from the fit (OCR misreads) are dropped
+    and the fit repeated.
+
+    Returns:
+        tuple: (Calibration, stats dict).
+    """
+    groups = [group for group in groups if len(group) >= min_group_size]
+    if not groups:
+        raise ValueError("❌ Not enough tap/KXY pairs to calibrate.")
+
+    screen = np.array([o[1:3] for group in groups for o in group], dtype=float) - center
+    world = np.array([o[4:6] for group in groups for o in group], dtype=float)
+    labels = np.concatenate([np.full(len(group), i) for i, group in enumerate(groups)])
+    design = np.hstack([screen, np.eye(len(groups))[labels]])
+
+    keep = np.ones(len(world), dtype=bool)
+    for _ in range(TRIM_ROUNDS):
+        solution = np.linalg.lstsq(design[keep], world[keep], rcond=None)[0]
+        residuals = np.linalg.norm(design @ solution - world, axis=1)
+        new_keep = residuals <= max(trim, 3 * np.median(residuals[keep]))
+        # A screen left with too few pairs cannot pin down its camera
+        new_keep &= np.bincount(labels[new_keep], minlength=len(groups))[labels] >= min_group_size
+        if (new_keep == keep).all():
+            break
+        keep = new_keep
+
+    calibration = Calibration(solution[:2].T, center)
+    cameras = solution[2:]
+    predicted = calibration.snap(design @ solution)
+    exact = (predicted == world).all(axis=1)
+    fitted = np.bincount(labels[keep], minlength=len(groups)) > 0
+    stats = {
+        "pairs": int(len(world)),
+        "groups": int(fitted.sum()),
+        "inliers": int(keep.sum()),
+        "rms_residual_tiles": float(np.sqrt(np.mean(residuals[keep] ** 2))),
+        "exact_inlier_percent": float(exact[keep].mean() * 100),
+        "parity_percent": float(np.mean(world.sum(axis=1) % 2 == calibration.parity) * 100),
+        "cameras": [
+            [Counter(o[3] for o in group).most_common(1)[0][0], *camera.round(2).tolist()]
+            for group, camera, used in zip(groups, cameras, fitted) if used
+        ],
+    }
+    return calibration, stats
+
+
+if __name__ == "__main__":
+    from tile_db import TileDB
+
+    with TileDB() as db:
+        db.import_all()
+        calibration, stats = fit_calibration(group_screens(observations_from_tile_db(db)))
+
+    x_step, y_step = calibration.tile_pitch()
+    print(f"✔ Fitted {stats['groups']} screens from {stats['inliers']}/{stats['pairs']} tap/KXY pairs")
+    print(f"🔹 One X step = {x_step.round(1)} px, one Y step = {y_step.round(1)} px")
+    print(f"🔹 RMS residual {stats['rms_residual_tiles']:.3f} tiles, "
+          f"{stats['exact_inlier_percent']:.1f}% of inliers predicted exactly after snapping")
+    print(f"🔹 {stats['parity_percent']:.1f}% of OCR'd tiles have (X + Y) % 2 == {calibration.parity}")
+    calibration.save(stats=stats)
+    print(f"✔ Saved {CALIBRATION_FILE}")
@@ -0,0 +1,171 @@
+import os
+import re
+import cv2
+import numpy as np
+
+# 📂 One memory-mapped grid file per kingdom
+COVERAGE_DIR = "coverage"
+
+# 📌 Grid Dimensions — X 0-511, Y 0-1023, stored row-major as [y, x]
+GRID_WIDTH = 512
+GRID_HEIGHT = 1024
+TOTAL_TILES = 511 * 1023  # Tile count used for coverage percentages
+REGION_SIZE = 64          # Default block size for per-region coverage
+
+_FILE_PATTERN = re.compile(r"k(\d+)\.npy$")
+
+
+class CoverageMap:
+    """
+    Byte-per-tile coverage grids for each kingdom, persisted as memory-mapped .npy files.
+
+    With directory=None the grids live in memory only, for one-off counts
+    that must not touch the shared coverage files.
+    """
+
+    def __init__(self, directory=COVERAGE_DIR):
+        self.directory = directory
+        self._grids = {}
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, kingdom):
+        return os.path.join(self.directory, f"k{kingdom}.npy")
+
+    def grid(self, kingdom, create=True):
+        """The (GRID_HEIGHT, GRID_WIDTH) uint8 grid for a kingdom; 1 = covered."""
+        kingdom = int(kingdom)
+        if kingdom not in self._grids:
+            if self.directory is None:
+                if not create:
+                    return None
+                self._grids[kingdom] = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+                return self._grids[kingdom]
+            path = self._path(kingdom)
+            if os.path.exists(path):
+                self._grids[kingdom] = np.lib.format.open_memmap(path, mode="r+")
+            elif create:
+                self._grids[kingdom] = np.lib.format.open_memmap(
+                    path, mode="w+", dtype=np.uint8, shape=(GRID_HEIGHT, GRID_WIDTH)
+                )
+            else:
+                return None
+        return self._grids[kingdom]
+
+    def kingdoms(self):
+        if self.directory is None:
+            return sorted(self._grids)
+        found = {int(m.group(1)) for m in map(_FILE_PATTERN.match, os.listdir(self.directory)) if m}
+        return sorted(found | set(self._grids))
+
+    @staticmethod
+    def _valid(xs, ys):
+        xs = np.atleast_1d(np.asarray(xs, dtype=np.int64))
+        ys = np.atleast_1d(np.asarray(ys, dtype=np.int64))
+        keep = (xs >= 0) & (xs < GRID_WIDTH) & (ys >= 0) & (ys < GRID_HEIGHT)
+        return xs, ys, keep
+
+    def mark(self, kingdom, xs, ys):
+        """
+        Mark tiles as covered.
+
+        Returns:
+            int: How many of them were not covered before.
+        """
+        xs, ys, keep = self._valid(xs, ys)
+        if not keep.any():
+            return 0
+        grid = self.grid(kingdom)
+        cells = np.unique(ys[keep] * GRID_WIDTH + xs[keep])
+        flat = grid.reshape(-1)
+        new = int(np.count_nonzero(flat[cells] == 0))
+        flat[cells] = 1
+        return new
+
+    def is_covered(self, kingdom, xs, ys):
+        """Boolean array: whether each (x, y) has been covered."""
+        xs, ys, keep = self._valid(xs, ys)
+        covered = np.zeros(xs.shape, dtype=bool)
+        grid = self.grid(kingdom, create=False)
+        if grid is not None:
+            covered[keep] = grid[ys[keep], xs[keep]] != 0
+        return covered
+
+    def covered_count(self, kingdom=None):
+        """Covered tiles in one kingdom, or across all of them."""
+        kingdoms = self.kingdoms() if kingdom is None else [kingdom]
+        total = 0
+        for k in kingdoms:
+            grid = self.grid(k, create=False)
+            if grid is not None:
+                total += int(np.count_nonzero(grid))
+        return total
+
+    def coverage_percent(self, kingdom):
+        return self.covered_count(kingdom) / TOTAL_TILES * 100
+
+    def uncovered_in_rect(self, kingdom, x1, y1, x2, y2):
+        """(N, 2) array of uncovered (x, y) tiles in an inclusive rectangle."""
+        x1, x2 = max(min(x1, x2), 0), min(max(x1, x2), GRID_WIDTH - 1)
+        y1, y2 = max(min(y1, y2), 0), min(max(y1, y2), GRID_HEIGHT - 1)
+        if x1 > x2 or y1 > y2:
+            return np.empty((0, 2), dtype=np.int64)
+
+        grid = self.grid(kingdom, create=False)
+        if grid is None:
+            ys, xs = np.mgrid[y1:y2 + 1, x1:x2 + 1]
+            return np.column_stack([xs.ravel(), ys.ravel()])
+        ys, xs = np.nonzero(grid[y1:y2 + 1, x1:x2 + 1] == 0)
+        return np.column_stack([xs + x1, ys + y1])
+
+    def region_coverage(self, kingdom, region_size=REGION_SIZE):
+        """
+        Percent covered per region_size x region_size block.
+
+        Returns:
+            np.ndarray: (blocks_y, blocks_x) float array.
+        """
+        grid = self.grid(kingdom, create=False)
+        blocks_y = -(-GRID_HEIGHT // region_size)
+        blocks_x = -(-GRID_WIDTH // region_size)
+        if grid is None:
+            return np.zeros((blocks_y, blocks_x))
+
+        padded = np.zeros((blocks_y * region_size, blocks_x * region_size), dtype=np.uint32)
+        padded[:GRID_HEIGHT, :GRID_WIDTH] = grid != 0
+        counts = padded.reshape(blocks_y, region_size, blocks_x, region_size).sum(axis=(1, 3))
+
+        # Edge blocks hold fewer real tiles
+        heights = np.minimum(region_size, GRID_HEIGHT - np.arange(blocks_y) * region_size)
+        widths = np.minimum(region_size, GRID_WIDTH - np.arange(blocks_x) * region_size)
+        return counts / np.outer(heights, widths) * 100
+
+    def export_heatmap(self, kingdom, path, region_size=None):
+        """
+        Write a PNG heatmap of a kingdom's coverage.
+
+        With region_size, each block is coloured by its coverage percent;
+        otherwise every tile is one pixel.
+        """
+        if region_size:
+            coverage = self.region_coverage(kingdom, region_size)
+            image = np.repeat(np.repeat(coverage, region_size, axis=0), region_size, axis=1)
+            image = (image[:GRID_HEIGHT, :GRID_WIDTH] * 255 / 100).astype(np.uint8)
+        else:
+            grid = self.grid(kingdom, create=False)
+            image = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8) if grid is None else (grid != 0) * np.uint8(255)
+
+        heatmap = cv2.applyColorMap(image, cv2.COLORMAP_JET)
+        if not cv2.imwrite(path, heatmap):
+            raise OSError(f"Could not write heatmap to {path}")
+        return path
+
+    def clear(self):
+        """Mark every tile in every kingdom as uncovered."""
+        for kingdom in self.kingdoms():
+            self.grid(kingdom)[:] = 0
+
+    def flush(self):
+        for grid in self._grids.values():
+            if isinstance(grid, np.memmap):
+                grid.flush()
@@ -0,0 +1,176 @@
+import json
+import os
+import time
+from collections import Counter
+import cv2
+import numpy as np
+from feature_matcher import TemplateFeatureCache
+
+# 📂 Index files
+INDEX_DIR = "feature_index"
+TEMPLATES_DIR = "game_templates"
+
+# 📌 Index Parameters
+TEMPLATE_SIZE = (50, 50)   # Templates are resized to this before extraction, as in match_template_workflow
+KD_TREES = 4               # FLANN randomized KD-trees
+SEARCH_CHECKS = 64         # Leaves visited per query; higher is slower and more exact
+NEIGHBOURS = 5             # Neighbours fetched per descriptor to find the runner-up template
+RATIO = 0.75               # Lowe ratio test threshold
+MIN_VOTES = 3              # Ratio-tested votes needed for a template to count as a match
+
+FLANN_INDEX_KDTREE = 1
+
+
+class TemplateDescriptorIndex:
+    """
+    One FLANN KD-tree over the SIFT descriptors of every template.
+
+    Each library descriptor carries the id of its template. A frame's
+    descriptors are queried once; a descriptor votes for its nearest
+    template if it passes the ratio test against the nearest descriptor
+    from a *different* template, so near-duplicate templates do not cancel
+    each other's votes.
+    """
+
+    def __init__(self, index_dir=INDEX_DIR, templates_dir=TEMPLATES_DIR, size=TEMPLATE_SIZE):
+        self.index_dir = index_dir
+        self.templates_dir = templates_dir
+        self.size = size
+        self.cache = TemplateFeatureCache(size=size)
+        self.templates = []  # [{"path", "category", "key"}], position = template id
+        self.descriptors = np.empty((0, 128), dtype=np.float32)
+        self.labels = np.empty(0, dtype=np.int32)
+        self.flann = None
+        self.last_query_seconds = None
+        os.makedirs(index_dir, exist_ok=True)
+        self._load()
+
+    def _path(self, name):
+        return os.path.join(self.index_dir, name)
+
+    def _load(self):
+        if not os.path.exists(self._path("templates.json")):
+            return
+        with open(self._path("templates.json"), "r") as f:
+            self.templates = json.load(f)
+        self.descriptors = np.load(self._path("descriptors.npy"))
+        self.labels = np.load(self._path("labels.npy"))
+        if len(self.descriptors):
+            self.flann = cv2.flann_Index()
+            if not self.flann.load(self.descriptors, self._path("flann.idx")):
+                self._build_tree()
+
+    def _save(self):
+        np.save(self._path("descriptors.npy"), self.descriptors)
+        np.save(self._path("labels.npy"), self.labels)
+        if self.flann is not None:
+            self.flann.save(self._path("flann.idx"))
+        # Written last: its presence means the other files are complete
+        tmp_path = self._path("templates.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.templates, f)
+        os.replace(tmp_path, self._path("templates.json"))
+
+    def _build_tree(self):
+        self.flann = None
+        if len(self.descriptors):
+            self.flann = cv2.flann_Index(self.descriptors, dict(algorithm=FLANN_INDEX_KDTREE, trees=KD_TREES))
+
+    def scan_templates(self):
+        """(path, category) of every template image under templates_dir/<category>/."""
+        found = []
+        if not os.path.isdir(self.templates_dir):
+            return found
+        for category in sorted(os.listdir(self.templates_dir)):
+            category_path = os.path.join(self.templates_dir, category)
+            if os.path.isdir(category_path):
+                for filename in sorted(os.listdir(category_path)):
+                    found.append((os.path.join(category_path, filename), category))
+        return found
+
+    def refresh(self):
+        """
+        Bring the index in line with the template folders.
+
+        Only templates that were added or changed have descriptors extracted
+        (or read from the descriptor cache); removed ones are dropped. The
+        KD-tree is rebuilt only if anything changed.
+
+        Returns:
+            tuple: (templates added or changed, templates removed).
+        """
+        current = {}
+        for path, category in self.scan_templates():
+            current[path] = (category, self.cache.key(path))
+
+        keep = [i for i, t in enumerate(self.templates) if current.get(t["path"], (None, None))[1] == t["key"]]
+        kept_paths = {self.templates[i]["path"] for i in keep}
+        added = [path for path in current if path not in kept_paths]
+        removed = len(self.templates) - len(keep)
+        if not added and not removed:
+            return 0, 0
+
+        # Renumber surviving templates and drop the rows of removed ones
+        remap = np.full(len(self.templates), -1, dtype=np.int32)
+        remap[keep] = np.arange(len(keep), dtype=np.int32)
+        rows = remap[self.labels] >= 0 if len(self.labels) else np.zeros(0, dtype=bool)
+        descriptors = [self.descriptors[rows]]
+        labels = [remap[self.labels[rows]]]
+        templates = [self.templates[i] for i in keep]
+
+        for path in added:
+            image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                continue
+            found = self.cache.descriptors(path, cv2.resize(image, self.size))
+            category, key = current[path]
+            descriptors.append(found)
+            labels.append(np.full(len(found), len(templates), dtype=np.int32))
+            templates.append({"path": path, "category": category, "key": key})
+
+        self.templates = templates
+        self.descriptors = np.concatenate(descriptors).astype(np.float32)
+        self.labels = np.concatenate(labels)
+        self._build_tree()
+        self._save()
+        self.cache.save()
+        return len(added), removed
+
+    def query(self, frame_descriptors, ratio=RATIO, min_votes=MIN_VOTES):
+        """
+        Vote templates for one frame.
+
+        Returns:
+            list: (template path, votes) with at least min_votes, best first.
+        """
+        start = time.perf_counter()
+        if self.flann is None or len(frame_descriptors) == 0:
+            self.last_query_seconds = time.perf_counter() - start
+            return []
+
+        k = min(NEIGHBOURS, len(self.descriptors))
+        indexes, distances = self.flann.knnSearch(frame_descriptors, k, params=dict(checks=SEARCH_CHECKS))
+        indexes = indexes.reshape(len(frame_descriptors), k)
+        distances = distances.reshape(len(frame_descriptors), k)
+        labels = self.labels[indexes]
+
+        # Nearest descriptor from a template other than the best one. With none among the
+        # k neighbours the ratio cannot be checked, so the descriptor does not vote: many
+        # near-identical keypoints in one template would otherwise swamp the count
+        other = labels != labels[:, :1]
+        has_other = other.any(axis=1)
+        runner_up = distances[np.arange(len(labels)), other.argmax(axis=1)]
+        # FLANN returns squared L2 distances
+        passed = has_other & (distances[:, 0] < (ratio ** 2) * runner_up)
+
+        votes = Counter(labels[passed, 0].tolist())
+        self.last_query_seconds = time.perf_counter() - start
+        return [(self.templates[t]["path"], count) for t, count in votes.most_common() if count >= min_votes]
+
+
+if __name__ == "__main__":
+    index = TemplateDescriptorIndex()
+    start = time.perf_counter()
+    added, removed = index.refresh()
+    print(f"✔ Index: {len(index.templates)} templates, {len(index.descriptors)} descriptors "
+          f"({added} added/changed, {removed} removed in {time.perf_counter() - start:.2f}s)")
@@ -6,6 +6,7 @@ import numpy as np
 TEMPLATES_DIR = "game_templates"
 DUPLICATE_REPORT = "duplicate_report.txt"
 SIMILARITY_THRESHOLD = 0.98  # Adjust threshold (1.0 = identical)
+BLOCK_SIZE = 2048  # Histograms correlated per block; memory is about BLOCK_SIZE² floats
 
 def load_images():
     """Load all images from the folder."""
@@ -17,39 +18,38 @@ def load_images():
             images[filename] = img
     return images
 
-def compare_images(img1, img2):
-    """Compare two images using histogram similarity."""
-    hist1 = cv2.calcHist([img1], [0], None, [256], [0, 256])
-    hist2 = cv2.calcHist([img2], [0], None, [256], [0, 256])
+def histogram_matrix(images):
+    """(N, 256) float32 grayscale histograms, centered and scaled to unit length."""
+    hists = np.empty((len(images), 256), dtype=np.float32)
+    for row, img in enumerate(images):
+        hists[row] = cv2.calcHist([img], [0], None, [256], [0, 256]).ravel()
 
-    hist1 = cv2.normalize(hist1, hist1).flatten()
-    hist2 = cv2.normalize(hist2, hist2).flatten()
-
-    similarity = cv2.compareHist(hist1, hist2, cv2.HISTCMP_CORREL)  # Compare histograms
-    return similarity
+    # HISTCMP_CORREL is the Pearson correlation, i.e. the dot product of these rows
+    hists -= hists.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(hists, axis=1, keepdims=True)
+    return np.divide(hists, norms, out=np.zeros_like(hists), where=norms > 0)
 
 def find_duplicates(images):
     """Find duplicate images based on histogram similarity."""
-    duplicates = []
-    checked = set()
-
     keys = list(images.keys())
-
-    for i in range(len(keys)):
-        for j in range(i + 1, len(keys)):
-            img1, img2 = keys[i], keys[j]
-
-            if (img1, img2) in checked or (img2, img1) in checked:
-                continue  # Skip already checked pairs
-
-            similarity = compare_images(images[img1], images[img2])
-
-            if similarity >= SIMILARITY_THRESHOLD:
-                duplicates.append((img1, img2, similarity))
-            
-            checked.add((img1, img2))
-
-    return duplicates
+    hists = histogram_matrix([images[key] for key in keys])
+
+    # Correlate BLOCK_SIZE x BLOCK_SIZE tiles of the upper triangle, so memory stays bounded
+    pairs = []
+    for start_i in range(0, len(keys), BLOCK_SIZE):
+        block_i = hists[start_i:start_i + BLOCK_SIZE]
+        for start_j in range(start_i, len(keys), BLOCK_SIZE):
+            similarity = block_i @ hists[start_j:start_j + BLOCK_SIZE].T
+            rows, columns = np.nonzero(similarity >= SIMILARITY_THRESHOLD)
+            i, j = rows + start_i, columns + start_j
+            upper = i < j
+            pairs.append((i[upper], j[upper], similarity[rows[upper], columns[upper]]))
+
+    if not pairs:
+        return []
+    i, j, scores = (np.concatenate(parts) for parts in zip(*pairs))
+    order = np.lexsort((j, i))  # Same order as comparing every pair in a nested loop
+    return [(keys[i[k]], keys[j[k]], float(scores[k])) for k in order]
 
 def delete_duplicates(duplicates):
     """Delete duplicate images and keep the first occurrence."""
@@ -93,12 +93,16 @@ def save_report(duplicates):
     print(f"✔ Duplicate report saved: {DUPLICATE_REPORT}")
 
 # Run duplicate detection, deletion, and renaming
-images = load_images()
-duplicates = find_duplicates(images)
-
-if duplicates:
-    save_report(duplicates)
-    delete_duplicates(duplicates)
-    re_label_images()
-else:
-    print("✅ No duplicate images found.")
+def main():
+    images = load_images()
+    duplicates = find_duplicates(images)
+
+    if duplicates:
+        save_report(duplicates)
+        delete_duplicates(duplicates)
+        re_label_images()
+    else:
+        print("✅ No duplicate images found.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+# 📂 Descriptor cache for template images
+CACHE_DIR = "feature_cache"
+MANIFEST_FILE = "manifest.json"
+
+# 📌 SIFT Parameters
+SIFT_FEATURES = 0        # Keypoints kept per image; 0 keeps all, as cv2.SIFT_create() does
+MIN_MATCHES = 10         # Cross-checked matches needed to count as a match
+
+_local = threading.local()
+
+
+def get_sift():
+    """One SIFT detector per thread, created on first use."""
+    if getattr(_local, "sift", None) is None:
+        _local.sift = cv2.SIFT_create(nfeatures=SIFT_FEATURES)
+    return _local.sift
+
+
+def extract_descriptors(gray):
+    """SIFT descriptors of a grayscale image as an (N, 128) float32 array (N may be 0)."""
+    _keypoints, descriptors = get_sift().detectAndCompute(gray, None)
+    if descriptors is None:
+        return np.empty((0, 128), dtype=np.float32)
+    return descriptors
+
+
+def count_matches(template_descriptors, frame_descriptors):
+    """Cross-checked brute-force L2 matches between two descriptor sets."""
+    if len(template_descriptors) == 0 or len(frame_descriptors) == 0:
+        return 0
+    matcher = cv2.BFMatcher(cv2.NORM_L2, crossCheck=True)
+    return len(matcher.match(template_descriptors, frame_descriptors))
+
+
+class TemplateFeatureCache:
+    """
+    Template descriptors cached on disk, one .npy per image content hash.
+
+    The manifest remembers each path's mtime and hash, so unchanged files are
+    not even re-read; a touched file with the same content reuses its entry.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, size=None):
+        self.cache_dir = cache_dir
+        self.size = size  # Templates are resized to this before extraction, so it is part of the key
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r") as f:
+                    self.manifest = json.load(f)
+            except json.JSONDecodeError:
+                self.manifest = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def key(self, path):
+        """Content hash of a template plus the extraction settings."""
+        entry = self.manifest.get(path)
+        mtime = os.path.getmtime(path)
+        if entry and entry["mtime"] == mtime and entry.get("features") == SIFT_FEATURES:
+            return entry["key"]
+
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            digest.update(f.read())
+        digest.update(f"{self.size}|{SIFT_FEATURES}".encode())
+        key = digest.hexdigest()
+        with self._lock:
+            self.manifest[path] = {"mtime": mtime, "key": key, "features": SIFT_FEATURES}
+            self._dirty = True
+        return key
+
+    def descriptors(self, path, image):
+        """Descriptors for a template, extracting from image only on a cache miss."""
+        cache_path = os.path.join(self.cache_dir, f"{self.key(path)}.npy")
+        if os.path.exists(cache_path):
+            self.hits += 1
+            return np.load(cache_path)
+
+        self.misses += 1
+        descriptors = extract_descriptors(image)
+        tmp_path = f"{cache_path}.{threading.get_ident()}.tmp.npy"
+        np.save(tmp_path, descriptors)
+        os.replace(tmp_path, cache_path)
+        return descriptors
+
+    def save(self):
+        """Write the manifest if any entries changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = f"{self.manifest_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.manifest, f)
+            os.replace(tmp_path, self.manifest_path)
+            self._dirty = False
+
+
+class FrameMatcher:
+    """Matches many templates against one frame whose SIFT features are extracted once."""
+
+    def __init__(self, frame):
+        start = time.perf_counter()
+        self.frame = frame
+        self.descriptors = extract_descriptors(frame)
+        self.extract_seconds = time.perf_counter() - start
+
+    def score(self, template_descriptors):
+        return count_matches(template_descriptors, self.descriptors)
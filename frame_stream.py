@@ -0,0 +1,320 @@
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque, namedtuple
+import cv2
+import numpy as np
+from screen_capture import ScreenCaptureError, capture_frame
+
+# 📌 Stream Parameters
+BUFFER_CAPACITY = 64          # Frames kept in memory
+STREAM_SIZE = (1600, 900)     # screenrecord output size (width, height)
+STREAM_BIT_RATE = 8_000_000
+DIFF_SIZE = (64, 36)          # Frames are compared at this resolution
+DIFF_THRESHOLD = 0.02         # Mean absolute difference (0-1) that counts as a change
+STABLE_THRESHOLD = 0.005      # Consecutive frames closer than this count as settled
+STABLE_MS = 100               # How long a changed screen must stay still
+POLL_INTERVAL = 0.02
+
+Frame = namedtuple("Frame", ["timestamp", "image"])
+UiChange = namedtuple("UiChange", ["changed", "frame", "elapsed"])
+
+
+def frame_difference(a, b, region=None, size=DIFF_SIZE):
+    """
+    Cheap perceptual difference between two frames, from 0 (identical) to 1.
+
+    Both frames are cropped to `region` (x1, y1, x2, y2) if given, converted
+    to grayscale and shrunk to `size` before comparing.
+    """
+    def reduce(image):
+        if region:
+            x1, y1, x2, y2 = region
+            image = image[y1:y2, x1:x2]
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_RGBA2GRAY if image.shape[2] == 4 else cv2.COLOR_RGB2GRAY)
+        return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+    return float(cv2.absdiff(reduce(a), reduce(b)).mean()) / 255.0
+
+
+def wait_for_ui_change(region=None, timeout=2.0, baseline=None, threshold=DIFF_THRESHOLD, stable_ms=STABLE_MS,
+                       grab=None, device_id=None, poll_interval=POLL_INTERVAL):
+    """
+    Poll captures until the screen (or a region of it) changes, instead of a fixed sleep.
+
+    Returns as soon as the difference from `baseline` crosses `threshold` and
+    the screen has then held still for `stable_ms`. If nothing changes before
+    `timeout`, the tap most likely did nothing and `changed` is False.
+
+    Args:
+        region (tuple): (x1, y1, x2, y2) area to watch, or None for the full screen.
+        timeout (float): Seconds to wait.
+        baseline (np.ndarray): Frame from before the action; defaults to the first poll.
+        threshold (float): Minimum frame_difference that counts as a change.
+        stable_ms (int): Settle time after the change; 0 returns on the first changed frame.
+        grab (callable): Returns the next RGBA frame; defaults to a raw ADB capture.
+        device_id (str): Device for the default capture.
+        poll_interval (float): Seconds between polls.
+
+    Returns:
+        UiChange: (changed, last frame, elapsed seconds).
+    """
+    if grab is None:
+        grab = lambda: capture_frame(device_id)
+
+    start = time.monotonic()
+    if baseline is None:
+        baseline = grab()
+
+    frame = baseline
+    changed_at = None
+    stable_since = None
+    while True:
+        previous, frame = frame, grab()
+        now = time.monotonic()
+
+        if changed_at is None:
+            if frame_difference(baseline, frame, region) >= threshold:
+                changed_at = stable_since = now
+        elif frame_difference(previous, frame, region) >= STABLE_THRESHOLD:
+            stable_since = now  # Still animating
+
+        if changed_at is not None and (now - stable_since) * 1000 >= stable_ms:
+            return UiChange(True, frame, now - start)
+        if now - start >= timeout:
+            return UiChange(changed_at is not None, frame, now - start)
+        time.sleep(poll_interval)
+
+
+class FrameRingBuffer:
+    """Bounded, thread-safe buffer of the most recent timestamped frames."""
+
+    def __init__(self, capacity=BUFFER_CAPACITY):
+        self._frames = deque(maxlen=capacity)
+        self._condition = threading.Condition()
+
+    def append(self, image, timestamp=None):
+        frame = Frame(time.monotonic() if timestamp is None else timestamp, image)
+        with self._condition:
+            self._frames.append(frame)
+            self._condition.notify_all()
+        return frame
+
+    def latest(self):
+        with self._condition:
+            return self._frames[-1] if self._frames else None
+
+    def latest_before(self, timestamp):
+        """Newest frame captured at or before `timestamp`."""
+        with self._condition:
+            for frame in reversed(self._frames):
+                if frame.timestamp <= timestamp:
+                    return frame
+        return None
+
+    def wait_for(self, predicate, after, timeout):
+        """Block until a frame newer than `after` satisfies `predicate`, or time out (None)."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                for frame in self._frames:
+                    if frame.timestamp > after:
+                        after = frame.timestamp  # Each frame is only checked once
+                        if predicate(frame):
+                            return frame
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+    def __len__(self):
+        with self._condition:
+            return len(self._frames)
+
+
+# 🎞️ Frame Sources — each yields (H, W, 4) RGBA frames until closed
+class ScreenrecordSource:
+    """Decodes `adb exec-out screenrecord` H.264 on the host with ffmpeg."""
+
+    def __init__(self, device_id=None, size=STREAM_SIZE, bit_rate=STREAM_BIT_RATE):
+        if shutil.which("ffmpeg") is None:
+            raise ScreenCaptureError("ffmpeg is required to decode the screenrecord stream")
+        self.device_id = device_id
+        self.size = size
+        self.bit_rate = bit_rate
+        self._processes = []
+        self._closed = False
+
+    def _start(self):
+        adb = ["adb"]
+        if self.device_id:
+            adb += ["-s", self.device_id]
+        adb += ["exec-out", "screenrecord", "--output-format=h264",
+                f"--size={self.size[0]}x{self.size[1]}", f"--bit-rate={self.bit_rate}", "-"]
+        ffmpeg = ["ffmpeg", "-loglevel", "error", "-fflags", "nobuffer", "-flags", "low_delay",
+                  "-f", "h264", "-i", "pipe:0", "-f", "rawvideo", "-pix_fmt", "rgba", "pipe:1"]
+
+        recorder = subprocess.Popen(adb, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        decoder = subprocess.Popen(ffmpeg, stdin=recorder.stdout, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        recorder.stdout.close()  # Let the decoder own the pipe
+        self._processes = [recorder, decoder]
+        return decoder
+
+    def frames(self):
+        width, height = self.size
+        frame_bytes = width * height * 4
+        while not self._closed:
+            # screenrecord stops by itself after 3 minutes, so restart it when it ends
+            decoder = self._start()
+            while not self._closed:
+                data = decoder.stdout.read(frame_bytes)
+                if len(data) < frame_bytes:
+                    break
+                yield np.frombuffer(data, dtype=np.uint8).reshape(height, width, 4)
+            self._stop_processes()
+
+    def _stop_processes(self):
+        for process in self._processes:
+            if process.poll() is None:
+                process.terminate()
+        self._processes = []
+
+    def close(self):
+        self._closed = True
+        self._stop_processes()
+
+
+class PollingSource:
+    """Back-to-back single-shot raw captures, for hosts without ffmpeg."""
+
+    def __init__(self, device_id=None):
+        self.device_id = device_id
+        self._closed = False
+
+    def frames(self):
+        while not self._closed:
+            yield capture_frame(self.device_id)
+
+    def close(self):
+        self._closed = True
+
+
+class DirectoryReplaySource:
+    """Replays a directory of PNGs in name order, standing in for a device."""
+
+    def __init__(self, directory, fps=10, loop=False):
+        self.paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory) if name.lower().endswith(".png")
+        )
+        self.fps = fps
+        self.loop = loop
+        self._closed = False
+
+    def frames(self):
+        while not self._closed:
+            for path in self.paths:
+                if self._closed:
+                    return
+                image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+                if image is None:
+                    continue
+                if image.ndim == 2:
+                    image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGBA)
+                elif image.shape[2] == 3:
+                    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGBA)
+                else:
+                    image = cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA)
+                yield image
+                if self.fps:
+                    time.sleep(1 / self.fps)
+            if not self.loop:
+                return
+
+    def close(self):
+        self._closed = True
+
+
+class FrameStream:
+    """Pulls frames from a source on a background thread into a ring buffer."""
+
+    def __init__(self, source, capacity=BUFFER_CAPACITY):
+        self.source = source
+        self.buffer = FrameRingBuffer(capacity)
+        self.frames_received = 0
+        self.error = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            for image in self.source.frames():
+                self.buffer.append(image)
+                self.frames_received += 1
+        except Exception as e:
+            self.error = e
+
+    def stop(self):
+        self.source.close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def latest(self):
+        return self.buffer.latest()
+
+    def wait_for_frame(self, after=None, timeout=2.0):
+        """First frame captured after `after` (default: now)."""
+        after = time.monotonic() if after is None else after
+        return self.buffer.wait_for(lambda frame: True, after, timeout)
+
+    def first_changed_frame(self, after, reference=None, region=None, threshold=DIFF_THRESHOLD, timeout=2.0):
+        """
+        First frame captured after `after` that differs from `reference`.
+
+        Args:
+            after (float): time.monotonic() timestamp, usually taken just before a tap.
+            reference (np.ndarray): Frame to compare against; defaults to the
+                newest frame at or before `after`.
+            region (tuple): Only compare this (x1, y1, x2, y2) area.
+            threshold (float): Minimum frame_difference that counts as a change.
+            timeout (float): Seconds to wait.
+
+        Returns:
+            Frame or None if nothing changed before the timeout.
+        """
+        if reference is None:
+            before = self.buffer.latest_before(after)
+            if before is None:
+                return self.wait_for_frame(after, timeout)
+            reference = before.image
+
+        def changed(frame):
+            return frame_difference(reference, frame.image, region) >= threshold
+
+        return self.buffer.wait_for(changed, after, timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def open_device_stream(device_id=None, capacity=BUFFER_CAPACITY):
+    """Start the best available live stream: screenrecord via ffmpeg, else polling."""
+    try:
+        source = ScreenrecordSource(device_id)
+    except ScreenCaptureError:
+        source = PollingSource(device_id)
+    return FrameStream(source, capacity).start()
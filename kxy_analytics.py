@@ -0,0 +1,202 @@
+import json
+import os
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+import numpy as np
+from coverage_map import COVERAGE_DIR, TOTAL_TILES, CoverageMap
+from result_store import RESULTS_FILE, read_records
+
+# 📂 Files
+STATE_FILE = "kxy_analytics_state.json"
+LEGACY_UNIQUE_LOG_FILE = "kxy_analytics_unique.txt"  # Unique KXY list used before the coverage map
+NAVIGATION_FILE = "navigation_points.json"
+
+KXY_PATTERN = re.compile(r'K:(\d+)\s*X:(\d+)\s*Y:(\d+)')
+
+
+def extract_timestamp(filename):
+    # Extract the timestamp from the filename
+    # Assuming the format is 'screenshot_YYYYMMDD_HHMMSS.png'
+    # Adjusting to handle cases where time might be missing
+    parts = filename.split('_')
+    if len(parts) > 2:
+        timestamp_str = parts[1] + '_' + parts[2].split('.')[0]
+    else:
+        timestamp_str = parts[1]  # Only date is present
+    try:
+        return datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
+    except ValueError:
+        return datetime.strptime(timestamp_str, "%Y%m%d")
+
+
+def load_navigation_points(path=NAVIGATION_FILE):
+    """Navigation targets as a set of (k, x, y) tuples."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r") as f:
+        return {tuple(point) for point in json.load(f)["points"]}
+
+
+class KxyAnalytics:
+    """
+    Incremental KXY report over the OCR results log.
+
+    Counters and the consumed byte offset are kept in STATE_FILE, and seen
+    tiles in a memory-mapped CoverageMap, so each refresh only reads the
+    records appended since the last one and writes what changed.
+    """
+
+    def __init__(self, results_file=RESULTS_FILE, state_file=STATE_FILE, coverage_dir=COVERAGE_DIR,
+                 navigation_file=NAVIGATION_FILE):
+        self.results_file = results_file
+        self.state_file = state_file
+        self.coverage = CoverageMap(coverage_dir)
+
+        # Navigation targets grouped per kingdom for vectorized coverage checks
+        self.navigation_points = load_navigation_points(navigation_file)
+        grouped = defaultdict(list)
+        for k, x, y in self.navigation_points:
+            grouped[k].append((x, y))
+        self._navigation_by_kingdom = {k: np.array(points) for k, points in grouped.items()}
+
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.offset = 0
+        self.total_entries = 0
+        self.total_kxy_entries = 0
+        self.total_non_kxy_entries = 0
+        self.first_entry_timestamp = None
+
+    def _load(self):
+        self._migrate_unique_log()
+        if not os.path.exists(self.state_file):
+            return
+        with open(self.state_file, "r") as f:
+            state = json.load(f)
+
+        # Start over if the results log was replaced or truncated
+        results_size = os.path.getsize(self.results_file) if os.path.exists(self.results_file) else 0
+        if state.get("offset", 0) > results_size:
+            print(f"⚠️ {self.results_file} is shorter than the saved offset, rebuilding analytics.")
+            self._reset()
+            self.coverage.clear()
+            return
+
+        self.offset = state["offset"]
+        self.total_entries = state["total_entries"]
+        self.total_kxy_entries = state["total_kxy_entries"]
+        self.total_non_kxy_entries = state["total_non_kxy_entries"]
+        if state.get("first_entry_timestamp"):
+            self.first_entry_timestamp = datetime.fromisoformat(state["first_entry_timestamp"])
+
+    def _migrate_unique_log(self):
+        """Fold the old unique-KXY text log into the coverage map once."""
+        if not os.path.exists(LEGACY_UNIQUE_LOG_FILE):
+            return
+        with open(LEGACY_UNIQUE_LOG_FILE, "r") as f:
+            self._mark([KXY_PATTERN.fullmatch(line.strip()) for line in f])
+        self.coverage.flush()
+        os.remove(LEGACY_UNIQUE_LOG_FILE)
+
+    def _mark(self, matches):
+        """Mark KXY regex matches as covered; returns the number of newly covered tiles."""
+        by_kingdom = defaultdict(list)
+        for match in matches:
+            if match:
+                k, x, y = (int(value) for value in match.groups())
+                by_kingdom[k].append((x, y))
+
+        new = 0
+        for kingdom, points in by_kingdom.items():
+            points = np.array(points)
+            new += self.coverage.mark(kingdom, points[:, 0], points[:, 1])
+        return new
+
+    @property
+    def unique_count(self):
+        return self.coverage.covered_count()
+
+    @property
+    def navigation_covered_count(self):
+        return sum(
+            int(np.count_nonzero(self.coverage.is_covered(k, points[:, 0], points[:, 1])))
+            for k, points in self._navigation_by_kingdom.items()
+        )
+
+    def _save(self):
+        # Coverage is flushed before the offset moves past it, so a crash
+        # between the two only means re-reading a few records.
+        self.coverage.flush()
+
+        state = {
+            "offset": self.offset,
+            "total_entries": self.total_entries,
+            "total_kxy_entries": self.total_kxy_entries,
+            "total_non_kxy_entries": self.total_non_kxy_entries,
+            "first_entry_timestamp": self.first_entry_timestamp.isoformat() if self.first_entry_timestamp else None,
+        }
+        tmp_path = f"{self.state_file}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=4)
+        os.replace(tmp_path, self.state_file)
+
+    def update(self):
+        """Consume records appended since the last call; returns how many were read."""
+        new_entries, offset = read_records(self.results_file, self.offset)
+        if not new_entries:
+            return 0
+
+        if self.first_entry_timestamp is None:
+            self.first_entry_timestamp = extract_timestamp(new_entries[0]['filename'])
+
+        matches = [KXY_PATTERN.search(entry.get('text', '')) for entry in new_entries]
+        kxy_count = sum(1 for match in matches if match)
+        self.total_kxy_entries += kxy_count
+        self.total_non_kxy_entries += len(matches) - kxy_count
+        self._mark(matches)
+
+        self.total_entries += len(new_entries)
+        self.offset = offset
+        self._save()
+        return len(new_entries)
+
+    def report(self, now=None):
+        """Current coverage figures as a dict."""
+        now = now or datetime.now()
+        elapsed = now - self.first_entry_timestamp if self.first_entry_timestamp else timedelta(0)
+        unique_count = self.unique_count
+
+        # Extrapolate from the unique-tile discovery rate so far
+        seconds = elapsed.total_seconds()
+        rate = unique_count / seconds if seconds > 0 else 0.0
+        eta = timedelta(seconds=(TOTAL_TILES - unique_count) / rate) if rate else None
+
+        return {
+            "total_entries": self.total_entries,
+            "total_kxy_entries": self.total_kxy_entries,
+            "total_non_kxy_entries": self.total_non_kxy_entries,
+            "unique_kxy_entries_count": unique_count,
+            "grid_coverage_percent": unique_count / TOTAL_TILES * 100,
+            "navigation_points": len(self.navigation_points),
+            "navigation_points_covered": self.navigation_covered_count,
+            "elapsed_time": elapsed,
+            "eta": eta,
+        }
+
+    def print_report(self):
+        report = self.report()
+        total_entries = report["total_entries"] or 1
+        navigation_total = report["navigation_points"] or 1
+
+        print("KXY Data Analysis Report")
+        print("========================")
+        print(f"Total entries with KXY data: {report['total_kxy_entries']} ({(report['total_kxy_entries'] / total_entries) * 100:.2f}%)")
+        print(f"Total entries without KXY data: {report['total_non_kxy_entries']} ({(report['total_non_kxy_entries'] / total_entries) * 100:.2f}%)")
+        print(f"Unique KXY entries count: {report['unique_kxy_entries_count']}")
+        print(f"Percentage of unique KXY entries compared to total grid tiles: {report['grid_coverage_percent']:.2f}%")
+        print(f"Navigation points covered: {report['navigation_points_covered']}/{report['navigation_points']} ({(report['navigation_points_covered'] / navigation_total) * 100:.2f}%)")
+        print(f"Elapsed time since first entry: {report['elapsed_time']}")
+        print(f"Estimated time to full grid coverage: {report['eta'] if report['eta'] is not None else 'unknown'}")
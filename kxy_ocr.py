@@ -0,0 +1,209 @@
+import json
+import os
+import re
+import threading
+import cv2
+import numpy as np
+from PIL import Image
+import pytesseract
+from ocr_engine import OcrResult, ocr_image
+from tile_db import DB_FILE, classified_tiles
+
+# 📌 KXY OCR Parameters
+KXY_PATTERN = re.compile(r'K:(\d+)\s*X:(\d+)\s*Y:(\d+)')
+KXY_CONFIG = "--psm 7 -c tessedit_char_whitelist=0123456789KXY:"  # One line, KXY glyphs only
+LAYOUT_FILE = "kxy_layouts.json"
+STRIP_PADDING = 8   # Pixels kept around the located line
+STRIP_SCALE = 2     # Small text reads better upscaled
+CLASS_TEXT = True   # Also OCR the whole popup of tiles DB_FILE has no class for yet
+
+# Tap point in screenshot names written by tile_scan_pipeline: screenshot_<time>_x<x>_y<y>.png
+TAP_FILENAME_PATTERN = re.compile(r"_x(\d+)_y(\d+)\.\w+$")
+
+
+def tap_from_filename(path):
+    """(x, y) tap encoded in a screenshot's filename, or None."""
+    match = TAP_FILENAME_PATTERN.search(os.path.basename(path))
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def format_kxy(match):
+    """Normalised 'K:914 X:23 Y:9' text for a KXY regex match."""
+    return f"K:{match.group(1)} X:{match.group(2)} Y:{match.group(3)}"
+
+
+def to_gray_array(image):
+    """PIL image or RGB(A)/gray array → grayscale array."""
+    if isinstance(image, Image.Image):
+        image = np.asarray(image.convert("L"))
+    elif image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_RGBA2GRAY if image.shape[2] == 4 else cv2.COLOR_RGB2GRAY)
+    return image
+
+
+def locate_kxy_strip(gray):
+    """
+    Find the popup's coordinate line with one full-frame OCR pass.
+
+    Returns:
+        tuple: ((x1, y1, x2, y2) strip box or None, regex match or None, full text).
+    """
+    data = pytesseract.image_to_data(Image.fromarray(gray), output_type=pytesseract.Output.DICT)
+
+    lines = {}
+    for i, word in enumerate(data["text"]):
+        if word.strip():
+            key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines.setdefault(key, []).append(i)
+
+    full_text = "\n".join(" ".join(data["text"][i] for i in indexes) for indexes in lines.values())
+
+    height, width = gray.shape
+    for indexes in lines.values():
+        text = " ".join(data["text"][i] for i in indexes)
+        match = KXY_PATTERN.search(text)
+        if not match:
+            continue
+        # Only the words from "K:" onwards belong to the strip
+        first = next((i for i in indexes if data["text"][i].startswith("K")), indexes[0])
+        words = indexes[indexes.index(first):]
+        x1 = min(data["left"][i] for i in words) - STRIP_PADDING
+        y1 = min(data["top"][i] for i in words) - STRIP_PADDING
+        x2 = max(data["left"][i] + data["width"][i] for i in words) + STRIP_PADDING
+        y2 = max(data["top"][i] + data["height"][i] for i in words) + STRIP_PADDING
+        # Leave room on the right for longer numbers than the ones seen here
+        x2 += (x2 - x1) // 2
+        return (max(x1, 0), max(y1, 0), min(x2, width), min(y2, height)), match, full_text
+    return None, None, full_text
+
+
+class KxyReader:
+    """
+    Reads the K/X/Y line by OCRing only its strip of the popup.
+
+    The strip is located once per layout (screen size plus tap point, since
+    the popup follows the tapped tile) and remembered in LAYOUT_FILE. If the
+    strip stops matching, it is located again.
+    """
+
+    def __init__(self, layout_file=LAYOUT_FILE):
+        self.layout_file = layout_file
+        self.last_full_text = None  # Set when read() had to OCR the whole frame
+        self._lock = threading.Lock()
+        self._learned = {}  # Boxes located by this process, re-applied on every save
+        self.layouts = self._read_layouts()
+
+    def _read_layouts(self):
+        if not self.layout_file or not os.path.exists(self.layout_file):
+            return {}
+        try:
+            with open(self.layout_file, "r") as f:
+                return {key: tuple(box) for key, box in json.load(f).items()}
+        except (json.JSONDecodeError, OSError):
+            return {}
+
+    @staticmethod
+    def layout_key(gray, tap=None):
+        height, width = gray.shape
+        key = f"{width}x{height}"
+        return f"{key}@{tap[0]},{tap[1]}" if tap else key
+
+    def _save(self):
+        """
+        Merge this process's boxes into the file on disk and write it back.
+
+        Pool workers each run a reader, so the file is re-read first and
+        boxes other workers saved in the meantime are kept (and picked up).
+        """
+        if not self.layout_file:
+            return
+        self.layouts = {**self._read_layouts(), **self._learned}
+        tmp_path = f"{self.layout_file}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.layouts, f, indent=4)
+        os.replace(tmp_path, self.layout_file)
+
+    def read_strip(self, gray, box):
+        x1, y1, x2, y2 = box
+        strip = gray[y1:y2, x1:x2]
+        if STRIP_SCALE != 1:
+            strip = cv2.resize(strip, None, fx=STRIP_SCALE, fy=STRIP_SCALE, interpolation=cv2.INTER_CUBIC)
+        return KXY_PATTERN.search(ocr_image(strip, config=KXY_CONFIG))
+
+    def read(self, image, tap=None):
+        """
+        Return the popup's KXY match, or None if the frame has no coordinate line.
+
+        Args:
+            image: PIL image or RGB(A)/grayscale array of the full screen.
+            tap (tuple): Screen point that opened the popup, if known.
+        """
+        gray = to_gray_array(image)
+        key = self.layout_key(gray, tap)
+        self.last_full_text = None
+
+        box = self.layouts.get(key)
+        if box:
+            match = self.read_strip(gray, box)
+            if match:
+                return match
+
+        box, match, self.last_full_text = locate_kxy_strip(gray)
+        if box:
+            with self._lock:
+                self.layouts[key] = box
+                self._learned[key] = box
+                self._save()
+        return match
+
+
+# Per-process reader for pool workers, and the tiles whose class is already known
+_reader = None
+_classified = None
+
+
+def read_kxy_item(item, full_text_fallback=True, class_text=CLASS_TEXT):
+    """
+    Pool entry point: KXY text for an image path or an (array or path, tap) pair.
+
+    A bare path gets its tap from the filename, so its layout is keyed by
+    the tapped point rather than shared by every popup.
+
+    The result is just the "K:.. X:.. Y:.." line for tiles that tile_db
+    already has a class for (or that this process has read before). With
+    class_text, any other tile also gets the full popup text after that
+    line, so it can be classified. When no coordinate line is found the
+    whole frame is OCR'd instead, so tiles without KXY still get their text.
+    """
+    global _reader, _classified
+    if _reader is None:
+        _reader = KxyReader()
+    if _classified is None:
+        _classified = classified_tiles(DB_FILE) if class_text else set()
+
+    tap = None
+    try:
+        if isinstance(item, tuple):
+            image, tap = item
+        else:
+            image, tap = item, tap_from_filename(item)
+        if isinstance(image, str):
+            with Image.open(image) as img:
+                image = np.asarray(img.convert("RGB"))
+
+        match = _reader.read(image, tap)
+        if match:
+            tile = tuple(int(value) for value in match.groups())
+            if not class_text or tile in _classified:
+                return OcrResult(format_kxy(match), None)
+            _classified.add(tile)
+            # Locating the strip may already have OCR'd the whole frame
+            full_text = _reader.last_full_text if _reader.last_full_text is not None else ocr_image(image)
+            return OcrResult(f"{format_kxy(match)}\n{full_text.strip()}".strip(), None)
+        if not full_text_fallback:
+            return OcrResult("", None)
+        if _reader.last_full_text is None:
+            return OcrResult(ocr_image(image).strip(), None)
+        return OcrResult(_reader.last_full_text.strip(), None)
+    except Exception as e:
+        return OcrResult("", str(e))
@@ -1,10 +1,14 @@
 import os
 import cv2
 import numpy as np
-import subprocess
 import concurrent.futures
 from datetime import datetime
-from skimage.metrics import structural_similarity as ssim
+from descriptor_index import TemplateDescriptorIndex
+from feature_matcher import MIN_MATCHES, FrameMatcher, TemplateFeatureCache
+from screen_capture import ScreenCaptureError, capture_frame, to_gray
+from tap_lattice import load_tap_points
+from template_pack import load_pack
+from tile_classifier import TileClassifier
 
 # 📂 Paths & Config
 SCREENSHOT_PATH = "screenshots/latest_screenshot.png"
@@ -12,183 +16,40 @@ TEMPLATES_DIR = "game_templates"
 OUTPUT_REPORT = "match_results.txt"
 
 # ADB tap coordinates
-coordinates = [
-    (99, 451),
-    (332, 451),
-    (568, 451),
-    (802, 451),
-    (1031, 451),
-    (1262, 451),
-    (1479, 451),
-    (99, 893),
-    (332, 893),
-    (568, 893),
-    (802, 893),
-    (1031, 893),
-    (1262, 893),
-    (1470, 889),
-    (15, 850),
-    (215, 850),
-    (450, 850),
-    (684, 850),
-    (916, 850),
-    (1145, 850),
-    (1377, 850),
-    (99, 451),
-    (332, 451),
-    (568, 451),
-    (802, 451),
-    (1031, 451),
-    (1262, 451),
-    (1479, 451),
-    (99, 893),
-    (332, 893),
-    (568, 893),
-    (802, 893),
-    (1031, 893),
-    (1262, 893),
-    (1470, 889),
-    (15, 850),
-    (215, 850),
-    (450, 850),
-    (684, 850),
-    (916, 850),
-    (1145, 850),
-    (1377, 850),
-    (99, 795),
-    (332, 795),
-    (568, 795),
-    (802, 795),
-    (1031, 795),
-    (1262, 795),
-    (1470, 795),
-    (215, 734),
-    (450, 734),
-    (684, 734),
-    (916, 734),
-    (1145, 734),
-    (1377, 734),
-    (1581, 734),
-    (99, 678),
-    (332, 678),
-    (568, 678),
-    (802, 678),
-    (1031, 678),
-    (1262, 678),
-    (1479, 678),
-    (215, 620),
-    (450, 620),
-    (684, 620),
-    (916, 620),
-    (1145, 620),
-    (1377, 620),
-    (1581, 620),
-    (99, 562),
-    (332, 562),
-    (568, 562),
-    (802, 562),
-    (1031, 562),
-    (1262, 562),
-    (1479, 562),
-    (8, 505),
-    (215, 505),
-    (450, 505),
-    (684, 505),
-    (916, 505),
-    (1145, 505),
-    (1377, 505),
-    (1581, 505),
-    (8, 394),
-    (215, 394),
-    (450, 394),
-    (684, 394),
-    (916, 394),
-    (1145, 394),
-    (1377, 394),
-    (1581, 394),
-    (99, 338),
-    (332, 338),
-    (568, 338),
-    (802, 338),
-    (1031, 338),
-    (1262, 338),
-    (1479, 338),
-    (8, 281),
-    (215, 281),
-    (450, 281),
-    (684, 281),
-    (916, 281),
-    (1145, 281),
-    (1377, 281),
-    (1581, 265),
-    (99, 225),
-    (332, 225),
-    (568, 225),
-    (802, 225),
-    (1031, 225),
-    (1262, 225),
-    (1479, 225),
-    (8, 168),
-    (215, 168),
-    (450, 168),
-    (684, 168),
-    (916, 168),
-    (1145, 168),
-    (1377, 168),
-    (1581, 168),
-    (99, 112),
-    (332, 112),
-    (568, 112),
-    (799, 89),
-    (1012, 89),
-    (1262, 112),
-    (1442, 101),
-    (8, 61),
-    (215, 61),
-    (373, 61),
-    (1392, 61)
-    # Add more coordinates as needed
-]
+coordinates = load_tap_points()  # One tap per visible tile, see tap_lattice.py
 
 TEMPLATE_SIZE = (50, 50)  # Standard template size for matching
 
+# "index" votes with one FLANN query over all templates; "brute" matches each template separately;
+# "tiles" classifies the crop at each tap point against every template
+MATCH_MODE = "index"
+
 # 🔍 Load Templates into Memory
 def load_templates():
-    templates = {}
-    for category in os.listdir(TEMPLATES_DIR):
-        category_path = os.path.join(TEMPLATES_DIR, category)
-        if not os.path.isdir(category_path):
-            continue
-
-        for filename in os.listdir(category_path):
-            template_path = os.path.join(category_path, filename)
-            img = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
-
-            if img is not None:
-                img = cv2.resize(img, TEMPLATE_SIZE)
-                templates[template_path] = (img, category)
-
+    """{path: (image, category)}, mapped from the template pack (see template_pack.py)."""
+    templates = load_pack(templates_dir=TEMPLATES_DIR, size=TEMPLATE_SIZE).templates()
     print(f"✔ Loaded {len(templates)} templates, resized for matching.")
     return templates
 
 # 📸 Capture Screenshot
 def take_screenshot():
-    if not os.path.exists("screenshots"):
-        os.makedirs("screenshots")
-
     print("📸 Taking new screenshot...")
-    subprocess.run(["adb", "shell", "screencap", "-p", "/sdcard/screenshot.png"], check=True)
-    subprocess.run(["adb", "pull", "/sdcard/screenshot.png", SCREENSHOT_PATH], check=True)
-    subprocess.run(["adb", "shell", "rm", "/sdcard/screenshot.png"], check=True)
+    try:
+        frame = capture_frame(save_path=SCREENSHOT_PATH)
+    except ScreenCaptureError as e:
+        print(f"❌ Error taking screenshot: {e}")
+        return None
 
     print(f"✔ Screenshot saved: {SCREENSHOT_PATH}")
+    return to_gray(frame)
 
 # 📂 Load Screenshot
 def load_screenshot():
     if not os.path.exists(SCREENSHOT_PATH):
-        take_screenshot()
+        screenshot = take_screenshot()
+    else:
+        screenshot = cv2.imread(SCREENSHOT_PATH, cv2.IMREAD_GRAYSCALE)
 
-    screenshot = cv2.imread(SCREENSHOT_PATH, cv2.IMREAD_GRAYSCALE)
     if screenshot is None:
         print("❌ Failed to load screenshot!")
         return None
@@ -196,38 +57,73 @@ def load_screenshot():
     print(f"✔ Screenshot loaded: {screenshot.shape}")
     return screenshot
 
-# 🔍 Feature Matching using SIFT & SSIM
-def match_template(template, screenshot, template_name):
-    sift = cv2.SIFT_create(nfeatures=2000)  # More keypoints
-    kp1, des1 = sift.detectAndCompute(template, None)
-    kp2, des2 = sift.detectAndCompute(screenshot, None)
-
-    if des1 is None or des2 is None:
+# 🔍 Feature Matching using SIFT
+def match_template(template, screenshot, template_name, frame=None, cache=None):
+    """
+    Score one template against the screenshot.
+
+    frame holds the screenshot's SIFT features, extracted once per screenshot
+    and shared by every template; cache supplies the template's descriptors.
+    """
+    if frame is None:
+        frame = FrameMatcher(screenshot)
+    if cache is None:
+        cache = TemplateFeatureCache(size=TEMPLATE_SIZE)
+
+    template_descriptors = cache.descriptors(template_name, template)
+    if len(template_descriptors) == 0 or len(frame.descriptors) == 0:
         return None  # Skip if features cannot be detected
 
-    bf = cv2.BFMatcher(cv2.NORM_L2, crossCheck=True)
-    matches = bf.match(des1, des2)
-
-    match_score = len(matches)
+    match_score = frame.score(template_descriptors)
 
-    if match_score > 10:  # Lowered threshold
+    if match_score > MIN_MATCHES:  # Lowered threshold
         return (template_name, match_score)
+    # Per-tile appearance checks are the "tiles" mode's job
+    return None
+
+# 🗂️ Indexed Template Matching
+def match_templates_indexed(frame):
+    """Query the screenshot's descriptors once against the index over every template."""
+    index = TemplateDescriptorIndex(templates_dir=TEMPLATES_DIR, size=TEMPLATE_SIZE)
+    added, removed = index.refresh()
+    if added or removed:
+        print(f"✔ Descriptor index updated: {added} templates added/changed, {removed} removed")
 
-    # Secondary check using SSIM
-    resized_template = cv2.resize(template, screenshot.shape[::-1])
-    ssim_score = ssim(resized_template, screenshot)
+    results = index.query(frame.descriptors)
+    print(f"✔ Queried {len(index.templates)} templates in {index.last_query_seconds * 1000:.1f} ms")
+    return results
 
-    if ssim_score > 0.85:  # Adjust SSIM threshold
-        return (template_name, int(ssim_score * 100))
+# 🧩 Per-Tile Classification
+def match_templates_by_tile(screenshot, templates):
+    """Best template per tile crop, scored as one batched correlation matrix."""
+    classifier = TileClassifier(templates)
+    tiles = classifier.classify(screenshot, coordinates)
+    print(f"✔ Classified {len(tiles)} tiles against {len(templates)} templates "
+          f"in {classifier.last_seconds * 1000:.1f} ms")
 
-    return None
+    results = [
+        (f"{tile['tap']} {tile['template']}", int(tile["score"] * 100))
+        for tile in tiles if tile["template"] is not None
+    ]
+    return report_top_matches(results)
 
 # ⚡ Parallel Template Matching
 def match_templates_parallel(screenshot, templates):
+    if MATCH_MODE == "tiles":
+        return match_templates_by_tile(screenshot, templates)
+
+    frame = FrameMatcher(screenshot)
+    print(f"✔ Extracted {len(frame.descriptors)} screenshot features once in {frame.extract_seconds:.2f}s")
+
+    if MATCH_MODE == "index":
+        results = match_templates_indexed(frame)
+        return report_top_matches(results)
+
+    cache = TemplateFeatureCache(size=TEMPLATE_SIZE)
     results = []
     with concurrent.futures.ThreadPoolExecutor() as executor:
         future_to_template = {
-            executor.submit(match_template, template, screenshot, name): (name, category)
+            executor.submit(match_template, template, screenshot, name, frame, cache): (name, category)
             for name, (template, category) in templates.items()
         }
 
@@ -236,6 +132,11 @@ def match_templates_parallel(screenshot, templates):
             if result:
                 results.append(result)
 
+    cache.save()
+    print(f"✔ Template descriptors: {cache.hits} from cache, {cache.misses} extracted")
+    return report_top_matches(results)
+
+def report_top_matches(results):
     results = sorted(results, key=lambda x: x[1], reverse=True)
 
     # 🔍 Debug: Print top 5 matches
@@ -273,8 +174,10 @@ def save_report(matched_results):
 
 # 🚀 Main Execution
 def main():
-    print("🔍 Loading templates into memory...")
-    templates = load_templates()
+    templates = None
+    if MATCH_MODE != "index":  # The index keeps its own template descriptors
+        print("🔍 Loading templates into memory...")
+        templates = load_templates()
 
     print("📸 Checking for screenshot...")
     screenshot = load_screenshot()
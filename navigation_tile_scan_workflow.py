@@ -1,26 +1,40 @@
-import json
 import subprocess
 from navigation_tool import NavigationTool
+from route_planner import RouteProgress, compare_routes, load_navigation_points, plan_route, print_comparison
 
 # Load navigation points from the JSON file
-with open('navigation_points.json', 'r') as file:
-    navigation_data = json.load(file)
+navigation_points = load_navigation_points('navigation_points.json')
 
-navigation_points = navigation_data['points']
+# Resume after the last completed point, visiting the rest in the cheapest order. The
+# first target is typed in full (see below), so the route is planned without a start.
+progress = RouteProgress()
+remaining_points = progress.remaining(navigation_points)
+route = plan_route(remaining_points)
+print_comparison(compare_routes(remaining_points, route))
 
 # Initialize the NavigationTool
 nav_tool = NavigationTool()
+# The dialog may have been reset since the last run, so the first target is typed in full
+last_kingdom, last_x, last_y = None, None, None
 
 # Iterate over each navigation point
-for point in navigation_points:
+for point in route:
     kingdom, x, y = point
 
-    # Navigate to the point using the NavigationTool
+    # Navigate to the point using the NavigationTool, skipping fields that have not changed
     print(f"Navigating to Kingdom: {kingdom}, X: {x}, Y: {y}")
-    nav_tool.navigate_to_coordinates(kingdom, x, y)
+    if nav_tool.navigate_to_coordinates(kingdom, x, y, last_kingdom, last_x, last_y):
+        last_kingdom, last_x, last_y = kingdom, x, y
+    else:
+        # The dialog's contents are unknown after a failure, so re-enter every field next time
+        last_kingdom, last_x, last_y = None, None, None
 
     # Run the workflow script
     print("Running workflow...")
     subprocess.run(['python', 'workflow_template_creation.py'])
 
-    print(f"Completed navigation and template creation workflow for Kingdom: {kingdom}, X: {x}, Y: {y}\n") 
\ No newline at end of file
+    progress.mark(point)
+    print(f"Completed navigation and template creation workflow for Kingdom: {kingdom}, X: {x}, Y: {y}\n")
+
+# Start from the beginning on the next run
+progress.clear()
@@ -1,11 +1,33 @@
 import logging
 import time
 import subprocess
+from adb_session import AdbSessionError, get_session
+from frame_stream import wait_for_ui_change
+from screen_capture import capture_frame
+
+# 📌 Screen positions for the navigation dialog
+MENU_BUTTON_POSITION = (843, 118)  # Navigation menu button
+FIELD_TAP_POSITIONS = {
+    "kingdom": (685, 335),  # Kingdom input field
+    "x": (821, 335),        # X coordinate input field
+    "y": (969, 335)         # Y coordinate input field
+}
+GO_BUTTON_POSITION = (765, 467)  # "Go" button
+KEYPAD_POSITIONS = {
+    "0": (1098, 619), "1": (1065, 379), "2": (1195, 367),
+    "3": (1290, 367), "4": (1065, 430), "5": (1195, 430),
+    "6": (1290, 430), "7": (1065, 530), "8": (1195, 530),
+    "9": (1290, 530), "check": (1275, 630)  # Checkmark button
+}
+
+TAP_DELAY = 0.2  # Seconds for the UI to update after a tap
+STEP_MARKER = "__TAP_STEP_"
 
 class NavigationTool:
     def __init__(self, device_id="emulator-5554"):
         """Initialize the Navigation Tool."""
         self.device_id = device_id
+        self.session = get_session(device_id)
         self.logger = logging.getLogger("NavigationTool")
         self._setup_logging()
 
@@ -30,10 +52,33 @@ class NavigationTool:
             self.logger.error(f"ADB command failed: {e}")
             return None
 
-    def tap_screen(self, x, y):
-        """Tap a specific coordinate on the device."""
-        self.run_adb_command(f"shell input tap {x} {y}")
-        time.sleep(0.2)  # Allow UI time to update
+    def run_shell_command(self, command):
+        """Run a command on the persistent device shell; raises AdbSessionError on failure."""
+        return self.session.run(command)
+
+    def tap_screen(self, x, y, wait_for_change=False, region=None, timeout=2.0):
+        """
+        Tap a specific coordinate on the device.
+
+        With wait_for_change, block until the screen (or `region` of it) has
+        reacted and settled instead of sleeping a fixed delay, and return the
+        UiChange so callers can tell when a tap did nothing.
+        """
+        if not wait_for_change:
+            self.run_shell_command(f"input tap {x} {y}")
+            time.sleep(TAP_DELAY)  # Allow UI time to update
+            return None
+
+        baseline = capture_frame(self.device_id)
+        self.run_shell_command(f"input tap {x} {y}")
+        change = wait_for_ui_change(region, timeout, baseline=baseline, device_id=self.device_id)
+        if not change.changed:
+            self.logger.warning(f"⚠️ Tap at ({x}, {y}) did not change the screen within {timeout}s")
+        return change
+
+    def close(self):
+        """Shut down the persistent device shell."""
+        self.session.close()
 
     def validate_coordinates(self, kingdom, x, y):
         """Validate coordinates before navigation."""
@@ -44,7 +89,8 @@ class NavigationTool:
         self.logger.info(f"✅ Validated coordinates: Kingdom={kingdom}, X={x}, Y={y}")
         return True
 
-    def navigate_to_coordinates(self, kingdom, x, y, last_kingdom=None, last_x=None, last_y=None, retries=3):
+    def navigate_to_coordinates(self, kingdom, x, y, last_kingdom=None, last_x=None, last_y=None, retries=3,
+                                batched=True):
         """
         Navigate to a given set of coordinates in the game.
 
@@ -56,42 +102,19 @@ class NavigationTool:
             last_x (int): Previously used X coordinate.
             last_y (int): Previously used Y coordinate.
             retries (int): Number of retries before failing.
+            batched (bool): Send the whole tap sequence as one device-side script.
         """
         self.validate_coordinates(kingdom, x, y)
 
-        # Tap positions for fields and "Go" button
-        field_tap_positions = {
-            "kingdom": (685, 335),  # Kingdom input field
-            "x": (821, 335),        # X coordinate input field
-            "y": (969, 335)         # Y coordinate input field
-        }
-        go_button_position = (765, 467)  # "Go" button
-
         for attempt in range(retries):
             try:
                 self.logger.info(f"🗺️ Navigating to: Kingdom={kingdom}, X={x}, Y={y} (Attempt {attempt + 1})")
+                steps = self.build_navigation_steps(kingdom, x, y, last_kingdom, last_x, last_y)
 
-                # Tap navigation menu button
-                self.tap_screen(843, 118)
-
-                # Change kingdom only if it's different
-                if last_kingdom != kingdom:
-                    self.logger.info(f"🌍 Updating Kingdom to {kingdom}")
-                    self._tap_and_enter(field_tap_positions["kingdom"], kingdom)
-
-                # Change X coordinate only if it's different
-                if last_x != x:
-                    self.logger.info(f"📍 Updating X coordinate to {x}")
-                    self._tap_and_enter(field_tap_positions["x"], x)
-
-                # Change Y coordinate only if it's different
-                if last_y != y:
-                    self.logger.info(f"📍 Updating Y coordinate to {y}")
-                    self._tap_and_enter(field_tap_positions["y"], y)
-
-                # Tap the "Go" button
-                self.logger.info("🚀 Pressing 'Go' button")
-                self.tap_screen(*go_button_position)
+                if batched:
+                    self.run_tap_script(steps)
+                else:
+                    self.run_tap_steps(steps)
 
                 self.logger.info(f"✅ Successfully navigated to {x}, {y} in Kingdom {kingdom}")
                 return True  # Exit after success
@@ -102,6 +125,69 @@ class NavigationTool:
         self.logger.critical(f"🚨 Navigation failed after {retries} attempts.")
         return False
 
+    def build_navigation_steps(self, kingdom, x, y, last_kingdom=None, last_x=None, last_y=None, delay=TAP_DELAY):
+        """
+        Build the full tap sequence for a navigation target.
+
+        Fields that match the previous target are not re-entered.
+
+        Returns:
+            list: (x, y, delay, label) tuples, in tap order.
+        """
+        steps = [(*MENU_BUTTON_POSITION, delay, "navigation menu")]
+
+        for field, value, last_value in (("kingdom", kingdom, last_kingdom), ("x", x, last_x), ("y", y, last_y)):
+            if last_value != value:
+                steps += self._field_entry_steps(FIELD_TAP_POSITIONS[field], value, delay, field)
+
+        steps.append((*GO_BUTTON_POSITION, delay, "'Go' button"))
+        return steps
+
+    def _field_entry_steps(self, tap_position, value, delay=TAP_DELAY, field="field"):
+        """Taps that select an input field, type a value on the keypad and confirm it."""
+        steps = [(*tap_position, delay, f"{field} field")]
+        for digit in str(value):
+            if digit not in KEYPAD_POSITIONS:
+                raise ValueError(f"❌ Invalid digit '{digit}' for keypad entry.")
+            steps.append((*KEYPAD_POSITIONS[digit], delay, f"digit '{digit}'"))
+        steps.append((*KEYPAD_POSITIONS["check"], delay, "checkmark button"))
+        return steps
+
+    def run_tap_steps(self, steps):
+        """Send taps one round trip at a time, waiting each step's delay."""
+        for tap_x, tap_y, delay, label in steps:
+            self.run_shell_command(f"input tap {tap_x} {tap_y}")
+            self.logger.info(f"👆 Tapped {label} at ({tap_x}, {tap_y})")
+            time.sleep(delay)
+
+    def run_tap_script(self, steps):
+        """
+        Send a tap sequence as one compound shell script in a single round trip.
+
+        Each step echoes a marker once its tap succeeds, so if the script
+        stops part-way the remaining steps are re-sent in per-tap mode.
+        """
+        commands = []
+        for index, (tap_x, tap_y, delay, _label) in enumerate(steps):
+            commands.append(f"input tap {tap_x} {tap_y} && echo {STEP_MARKER}{index}")
+            if delay:
+                commands.append(f"sleep {delay}")
+        script = " && ".join(commands)
+        timeout = self.session.timeout + sum(step[2] for step in steps)
+
+        self.logger.info(f"🚀 Sending {len(steps)} taps as one script")
+        try:
+            self.session.run(script, timeout=timeout)
+            return
+        except AdbSessionError as e:
+            completed = e.output.count(STEP_MARKER) if e.output else 0
+            if completed >= len(steps):
+                raise
+            self.logger.warning(f"⚠️ Tap script stopped at step {completed + 1}/{len(steps)}: {e}")
+
+        self.logger.info("↩️ Falling back to per-tap mode for the remaining steps")
+        self.run_tap_steps(steps[completed:])
+
     def _tap_and_enter(self, tap_position, value):
         """
         Tap on an input field and enter a numerical value using the on-screen keypad.
@@ -110,28 +196,6 @@ class NavigationTool:
             tap_position (tuple): (x, y) coordinates of the input field.
             value (int): The numerical value to enter.
         """
-        keypad_positions = {
-            "0": (1098, 619), "1": (1065, 379), "2": (1195, 367),
-            "3": (1290, 367), "4": (1065, 430), "5": (1195, 430),
-            "6": (1290, 430), "7": (1065, 530), "8": (1195, 530),
-            "9": (1290, 530), "check": (1275, 630)  # Checkmark button
-        }
-
-        # Tap on the input field
-        self.tap_screen(*tap_position)
         self.logger.info(f"🖊️ Entering value {value} at {tap_position}")
-
-        # Enter each digit
-        for digit in str(value):
-            if digit in keypad_positions:
-                key_x, key_y = keypad_positions[digit]
-                self.tap_screen(key_x, key_y)
-                self.logger.info(f"🔢 Tapped digit '{digit}' at ({key_x}, {key_y})")
-            else:
-                raise ValueError(f"❌ Invalid digit '{digit}' for keypad entry.")
-
-        # Confirm input
-        check_x, check_y = keypad_positions["check"]
-        self.tap_screen(check_x, check_y)
+        self.run_tap_steps(self._field_entry_steps(tap_position, value))
         self.logger.info("✅ Confirmed input with checkmark button.")
-
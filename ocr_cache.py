@@ -0,0 +1,207 @@
+import hashlib
+import multiprocessing.util
+import os
+import sqlite3
+import time
+import numpy as np
+from PIL import Image
+import pytesseract
+
+# 📂 Cache file
+CACHE_FILE = "ocr_cache.db"
+
+# 📌 Cache Parameters
+MAX_ENTRIES = 200_000    # Least recently used results are evicted beyond this
+EVICT_FRACTION = 0.1     # Share of MAX_ENTRIES dropped per eviction, so it does not run on every insert
+EVICT_CHECK_INTERVAL = 500  # Inserts between size checks; the cache may overshoot by this much per process
+FLUSH_INTERVAL = 100     # Lookups between writes of the hit/miss counters and last-used times
+FLUSH_SECONDS = 5.0      # ...or seconds since the last write, whichever comes first
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_cache (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    last_used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ocr_cache_last_used ON ocr_cache (last_used);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0);
+"""
+
+# One cache per process, opened on first use; a forked child opens its own
+_cache = None
+_cache_pid = None
+_inherited = []  # Caches copied in by fork, kept so their connections are never closed here
+
+
+def _tesseract(image, config):
+    return pytesseract.image_to_string(image, config=config)
+
+
+def image_key(image, config=""):
+    """sha1 of the exact pixels handed to tesseract plus the OCR config."""
+    digest = hashlib.sha1()
+    if isinstance(image, Image.Image):
+        digest.update(f"{image.mode}|{image.size}".encode())
+        digest.update(image.tobytes())
+    else:
+        image = np.ascontiguousarray(image)
+        digest.update(f"{image.dtype}|{image.shape}".encode())
+        digest.update(image.data)
+    digest.update(config.encode())
+    return digest.hexdigest()
+
+
+class OcrCache:
+    """
+    Persistent OCR results keyed by image content and config, with LRU eviction.
+
+    Worker processes each open their own connection to the same WAL-mode
+    database; hits and misses are counted per instance and, across
+    processes, in the counters table. Lookups only read: counters and
+    last-used times are written in one transaction every FLUSH_INTERVAL
+    lookups or FLUSH_SECONDS, and on close().
+    """
+
+    def __init__(self, path=CACHE_FILE, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._pending_hits = 0
+        self._pending_misses = 0
+        self._touched = {}  # key -> last-used time not yet written
+        self._flushed_at = time.monotonic()
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def get(self, key):
+        """Cached text for key, or None."""
+        row = self.conn.execute("SELECT text FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            self._pending_misses += 1
+        else:
+            self.hits += 1
+            self._pending_hits += 1
+            self._touched[key] = time.time()
+        if self._pending_hits + self._pending_misses >= FLUSH_INTERVAL \
+                or time.monotonic() - self._flushed_at >= FLUSH_SECONDS:
+            self.flush()
+        return None if row is None else row[0]
+
+    def flush(self):
+        """Write this instance's pending counts and last-used times to the database."""
+        self._flushed_at = time.monotonic()
+        if not (self._pending_hits or self._pending_misses):
+            return
+        with self.conn:
+            self.conn.executemany("UPDATE ocr_cache SET last_used = ? WHERE key = ?",
+                                  [(used, key) for key, used in self._touched.items()])
+            self.conn.executemany("UPDATE counters SET value = value + ? WHERE name = ?",
+                                  [(self._pending_hits, "hits"), (self._pending_misses, "misses")])
+        self._pending_hits = self._pending_misses = 0
+        self._touched.clear()
+
+    def put(self, key, text):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO ocr_cache VALUES (?, ?, ?)", (key, text, time.time()))
+        self._puts += 1
+        if self._puts % EVICT_CHECK_INTERVAL == 0 and self.size() > self.max_entries:
+            self.evict()
+
+    def evict(self):
+        """Drop the least recently used entries down to (1 - EVICT_FRACTION) of max_entries."""
+        self.flush()  # Recent hits must not look unused
+        excess = self.size() - int(self.max_entries * (1 - EVICT_FRACTION))
+        if excess > 0:
+            with self.conn:
+                self.conn.execute(
+                    "DELETE FROM ocr_cache WHERE key IN "
+                    "(SELECT key FROM ocr_cache ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+
+    def size(self):
+        return self.conn.execute("SELECT COUNT(*) FROM ocr_cache").fetchone()[0]
+
+    def image_to_string(self, image, config="", ocr=None):
+        """
+        pytesseract.image_to_string through the cache.
+
+        Args:
+            ocr: Function (image, config) → text run on a miss; defaults to
+                pytesseract.image_to_string.
+        """
+        ocr = ocr or _tesseract
+        if not isinstance(image, (Image.Image, np.ndarray)):
+            return ocr(image, config)  # Nothing to hash, e.g. a path
+
+        key = image_key(image, config)
+        text = self.get(key)
+        if text is None:
+            text = ocr(image, config)
+            self.put(key, text)
+        return text
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def totals(self):
+        """
+        (hits, misses) over every process that has used this cache file.
+
+        Includes this instance's lookups; other processes' show up once they flush.
+        """
+        self.flush()
+        counters = dict(self.conn.execute("SELECT name, value FROM counters"))
+        return counters["hits"], counters["misses"]
+
+    def close(self):
+        if self.conn is None:
+            return
+        self.flush()
+        self.conn.close()
+        self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def get_cache():
+    """This process's OcrCache on CACHE_FILE."""
+    global _cache, _cache_pid
+    if _cache is not None and _cache_pid != os.getpid():
+        # SQLite connections must not be used across fork, and the parent's finalizer does not run here
+        _inherited.append(_cache)
+        _cache = None
+    if _cache is None:
+        _cache = OcrCache(CACHE_FILE)
+        _cache_pid = os.getpid()
+        # Pool workers exit without running atexit hooks, but they do run multiprocessing finalizers
+        multiprocessing.util.Finalize(_cache, _cache.close, exitpriority=10)
+    return _cache
+
+
+def cached_image_to_string(image, config=""):
+    """Drop-in for pytesseract.image_to_string(image, config=config) that consults the cache."""
+    return get_cache().image_to_string(image, config)
+
+
+if __name__ == "__main__":
+    with OcrCache() as cache:
+        hits, misses = cache.totals()
+        lookups = hits + misses
+        print(f"📊 OCR cache: {cache.size()} entries, {hits} hits / {lookups} lookups "
+              f"({hits / lookups * 100 if lookups else 0:.1f}% hit rate)")
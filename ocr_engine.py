@@ -0,0 +1,135 @@
+import os
+import shlex
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from PIL import Image
+import pytesseract
+from ocr_cache import get_cache
+
+try:
+    import tesserocr
+except ImportError:  # Optional: fall back to one tesseract process per image
+    tesserocr = None
+
+# 📌 OCR Parameters
+TESSERACT_CMD = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+OCR_WORKERS = os.cpu_count() or 1
+CHUNK_SIZE = 4  # Images sent to a worker per round trip
+USE_OCR_CACHE = True  # Reuse results for pixel-identical inputs, see ocr_cache.py
+
+OcrResult = namedtuple("OcrResult", ["text", "error"])
+BatchStats = namedtuple("BatchStats", ["images", "seconds", "images_per_second"])
+
+# Per-process state, set up once by init_worker
+_config = ""
+_api = None
+
+
+def _parse_config(config):
+    """Split a tesseract CLI config string into a page segmentation mode and -c variables."""
+    psm = None
+    variables = {}
+    args = shlex.split(config)
+    for i, arg in enumerate(args):
+        if arg == "--psm" and i + 1 < len(args):
+            psm = int(args[i + 1])
+        elif arg == "-c" and i + 1 < len(args) and "=" in args[i + 1]:
+            key, value = args[i + 1].split("=", 1)
+            variables[key] = value
+    return psm, variables
+
+
+def init_worker(tesseract_cmd=TESSERACT_CMD, config=""):
+    """Point pytesseract at the binary and open a persistent tesserocr API if installed."""
+    global _config, _api
+    _config = config
+    if os.path.exists(tesseract_cmd):
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+    if tesserocr is None or _api is not None:
+        return
+    try:
+        _api = tesserocr.PyTessBaseAPI()
+        psm, variables = _parse_config(config)
+        if psm is not None:
+            _api.SetPageSegMode(psm)
+        for key, value in variables.items():
+            _api.SetVariable(key, value)
+    except RuntimeError:
+        _api = None  # No language data for the binding, use the CLI instead
+
+
+def ocr_image(image, config=None):
+    """
+    OCR one image in the current process.
+
+    Uses the persistent tesserocr API when it is available and the config
+    matches the one it was set up with, otherwise pytesseract.
+    """
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image[..., :3] if image.ndim == 3 else image)
+    if config is None:
+        config = _config
+
+    if USE_OCR_CACHE:
+        return get_cache().image_to_string(image, config, _run_ocr)
+    return _run_ocr(image, config)
+
+
+def _run_ocr(image, config):
+    if _api is not None and config == _config:
+        _api.SetImage(image)
+        return _api.GetUTF8Text()
+    return pytesseract.image_to_string(image, config=config)
+
+
+def ocr_item(item):
+    """Worker entry point: OCR a path or array and report failures instead of raising."""
+    try:
+        if isinstance(item, str):
+            with Image.open(item) as img:
+                return OcrResult(ocr_image(img).strip(), None)
+        return OcrResult(ocr_image(item).strip(), None)
+    except Exception as e:
+        return OcrResult("", str(e))
+
+
+class OcrEngine:
+    """Process pool OCR with one persistent tesseract binding per worker."""
+
+    def __init__(self, workers=OCR_WORKERS, config="", chunk_size=CHUNK_SIZE, tesseract_cmd=TESSERACT_CMD):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.last_stats = None
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker, initargs=(tesseract_cmd, config)
+        )
+
+    def ocr_batch(self, items):
+        """
+        OCR a batch of image paths or arrays across the pool.
+
+        Returns:
+            list: OcrResult per item, in input order.
+        """
+        return self.map(ocr_item, items)
+
+    def map(self, func, items):
+        """Run a picklable per-image OCR function across the pool, keeping input order."""
+        items = list(items)
+        start = time.perf_counter()
+        results = list(self._executor.map(func, items, chunksize=self.chunk_size))
+        seconds = time.perf_counter() - start
+        self.last_stats = BatchStats(len(items), seconds, len(items) / seconds if seconds else 0.0)
+        return results
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
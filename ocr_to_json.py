@@ -1,31 +1,30 @@
 import os
-import json
 import time
-from PIL import Image
-import pytesseract
+from ocr_engine import OcrEngine
+from result_store import RESULTS_FILE, ResultStore, migrate_json_array, read_records
+from kxy_ocr import read_kxy_item, tap_from_filename
+from ocr_cache import get_cache
 
-# Configure Tesseract path
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+# "kxy" OCRs the popup's coordinate strip, plus the whole frame only for tiles whose class
+# is not known yet (see kxy_ocr.read_kxy_item); "full" OCRs the whole frame every time
+OCR_MODE = "kxy"
+
+# Shared OCR process pool, started on first use
+ocr_pool = None
 
 # Directories and files
 SCREENSHOTS_DIR = 'screenshots'
-OUTPUT_FILE = 'ocr_results.json'
-
-# Ensure JSON file exists
-if not os.path.exists(OUTPUT_FILE):
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump([], f)
+OUTPUT_FILE = RESULTS_FILE
 
 def load_existing_results():
-    """Load existing OCR results from the JSON file."""
-    try:
-        with open(OUTPUT_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
+    """Load existing OCR results from the JSON Lines file."""
+    return read_records(OUTPUT_FILE)[0]
 
 def process_images():
     """Process all images in the screenshots directory."""
+    # Convert the old ocr_results.json array on first run
+    migrate_json_array(jsonl_path=OUTPUT_FILE)
+
     if not os.path.exists(SCREENSHOTS_DIR):
         print(f"Error: Directory '{SCREENSHOTS_DIR}' not found.")
         return
@@ -36,33 +35,55 @@ def process_images():
         print("No new screenshots found.")
         return
     
-    ocr_results = load_existing_results()
+    global ocr_pool
+    if ocr_pool is None:
+        ocr_pool = OcrEngine()
 
-    for filename in screenshots:
-        image_path = os.path.join(SCREENSHOTS_DIR, filename)
-        print(f"Processing {filename}...")
+    new_results = []
+    processed = []
 
-        try:
-            with Image.open(image_path) as img:
-                text = pytesseract.image_to_string(img).strip()
+    print(f"Processing {len(screenshots)} images on {ocr_pool.workers} workers...")
+    image_paths = [os.path.join(SCREENSHOTS_DIR, filename) for filename in screenshots]
+    # Workers look up the shared OCR cache; its counters cover every process, but each
+    # worker writes its counts in batches, so a few lookups may land in the next report
+    hits_before, misses_before = get_cache().totals()
+    if OCR_MODE == "kxy":
+        # The popup follows the tapped tile, so each strip layout is keyed by its tap
+        results = ocr_pool.map(read_kxy_item, [(path, tap_from_filename(path)) for path in image_paths])
+    else:
+        results = ocr_pool.ocr_batch(image_paths)
+
+    for filename, image_path, result in zip(screenshots, image_paths, results):
+        if result.error:
+            print(f"Error processing {filename}: {result.error}")
+            continue
 
-            ocr_results.append({'filename': filename, 'text': text})
+        new_results.append({'filename': filename, 'text': result.text})
+        processed.append((filename, image_path))
 
+    # Append only the new results; they are synced before any screenshot is deleted
+    with ResultStore(OUTPUT_FILE) as store:
+        store.extend(new_results)
+
+    for filename, image_path in processed:
+        try:
             # Delete the screenshot after processing
             os.remove(image_path)
             print(f"Deleted {filename}")
+        except OSError as e:
+            print(f"Error deleting {filename}: {e}")
 
-        except Exception as e:
-            print(f"Error processing {filename}: {e}")
-
-    # Save results in bulk
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(ocr_results, f, indent=4)
-    
-    print(f"Processed {len(screenshots)} images.")
+    stats = ocr_pool.last_stats
+    print(f"Processed {len(screenshots)} images in {stats.seconds:.1f}s ({stats.images_per_second:.2f} images/s).")
+    hits, misses = get_cache().totals()
+    lookups = (hits - hits_before) + (misses - misses_before)
+    if lookups:
+        print(f"OCR cache: {hits - hits_before}/{lookups} lookups served from cache "
+              f"({(hits - hits_before) / lookups * 100:.1f}% hit rate).")
 
-# Continuous monitoring loop
-print("Monitoring for new screenshots...")
-while True:
-    process_images()
-    time.sleep(30)  # Wait before checking again
+if __name__ == "__main__":
+    # Continuous monitoring loop
+    print("Monitoring for new screenshots...")
+    while True:
+        process_images()
+        time.sleep(30)  # Wait before checking again
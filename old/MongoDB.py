@@ -1,22 +1,47 @@
-from pymongo import MongoClient
+import os
+import sys
+import time
 
-client = MongoClient('mongodb://localhost:27017/')
-db = client['grid_data']
-collection = db['tiles']
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tile_db import TileDB, make_observation
 
-# Function to insert tile data into MongoDB
-def insert_tile_data(kxy_data, adb_coords, screenshot_path):
-    tile_data = {
-        "kxy": kxy_data,
-        "adb_coords": adb_coords,
-        "screenshot": screenshot_path
+# Embedded SQLite store, no database server needed; opened on first use, not on import
+_db = None
+
+
+def get_db():
+    global _db
+    if _db is None:
+        _db = TileDB()
+    return _db
+
+
+def _document(observation):
+    kxy = f"K:{observation['kingdom']} X:{observation['x']} Y:{observation['y']}" if observation["kingdom"] is not None else observation["text"]
+    return {
+        "kxy": kxy,
+        "adb_coords": {"x": observation["tap_x"], "y": observation["tap_y"]},
+        "screenshot": observation["screenshot"],
     }
-    collection.insert_one(tile_data)
 
-# Function to query MongoDB for specific tiles
+
+# Function to insert tile data into the tile database
+def insert_tile_data(kxy_data, adb_coords, screenshot_path):
+    observation = make_observation(
+        kxy_data, "MongoDB.py", f"{time.time_ns()}", time.strftime("%Y-%m-%d %H:%M:%S"),
+        (adb_coords["x"], adb_coords["y"]), screenshot_path,
+    )
+    get_db().add([observation])
+
+
+# Function to query the tile database for specific tiles
 def query_tile_data(kxy_data):
-    return collection.find({"kxy": kxy_data})
+    observation = make_observation(kxy_data, "", "")
+    if observation["kingdom"] is None:
+        return []
+    return [_document(o) for o in get_db().observations_at(observation["kingdom"], observation["x"], observation["y"])]
+
 
 # Example function to query tiles by coordinates
 def query_by_coordinates(x, y):
-    return collection.find({"adb_coords": {"x": x, "y": y}})
+    return [_document(o) for o in get_db().observations_by_tap(x, y)]
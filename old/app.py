@@ -2,9 +2,13 @@ from flask import Flask, render_template, request, jsonify
 import subprocess
 import os
 import json
+import sys
 import cv2
 import numpy as np
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pyramid_match import PyramidMatcher
+
 app = Flask(__name__)
 
 ADB_SCREENSHOT_PATH = "/sdcard/screenshot.png"
@@ -15,6 +19,21 @@ TEMPLATE_FILE = "templates.json"
 # Ensure template folder exists
 os.makedirs(TEMPLATE_FOLDER, exist_ok=True)
 
+# Decoded template images by path, reused until the file's mtime changes
+_template_images = {}
+
+def read_template(template_path):
+    """Grayscale template image, decoded once per file version instead of on every search."""
+    try:
+        mtime = os.path.getmtime(template_path)
+    except OSError:
+        return None
+    cached = _template_images.get(template_path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, cv2.imread(template_path, cv2.IMREAD_GRAYSCALE))
+        _template_images[template_path] = cached
+    return cached[1]
+
 # Load templates
 def load_templates():
     print("📂 Loading templates...")  # Debugging
@@ -145,24 +164,21 @@ def search_template():
         template_path = template_info["path"]
 
         img = cv2.imread(LOCAL_SCREENSHOT_PATH, cv2.IMREAD_GRAYSCALE)
-        template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
+        template = read_template(template_path)
 
         if img is None or template is None:
             return jsonify({"error": "Screenshot or template missing"}), 404
 
-        result = cv2.matchTemplate(img, template, cv2.TM_CCOEFF_NORMED)
         threshold = 0.8
-        locations = np.where(result >= threshold)
-
         matches = []
         h, w = template.shape
 
-        for pt in zip(*locations[::-1]):
+        for x, y, _score in PyramidMatcher(img).match(template, threshold):
             matches.append({
-                "x1": int(pt[0]), 
-                "y1": int(pt[1]), 
-                "x2": int(pt[0] + w), 
-                "y2": int(pt[1] + h)
+                "x1": int(x),
+                "y1": int(y),
+                "x2": int(x + w),
+                "y2": int(y + h)
             })
 
         return json.dumps({"found": len(matches) > 0, "matches": matches}, default=convert_int64)
@@ -202,27 +218,25 @@ def search_all_templates():
             return jsonify({"error": "Screenshot missing"}), 404
 
         all_matches = {}
+        matcher = PyramidMatcher(img)  # Downscaled screenshot is shared by every template
 
         for template_name, template_info in templates.items():
             template_path = template_info["path"]
-            template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
+            template = read_template(template_path)
 
             if template is None:
                 continue  # Skip templates that couldn't be loaded
 
-            result = cv2.matchTemplate(img, template, cv2.TM_CCOEFF_NORMED)
             threshold = 0.8
-            locations = np.where(result >= threshold)
-
             matches = []
             h, w = template.shape
 
-            for pt in zip(*locations[::-1]):
+            for x, y, _score in matcher.match(template, threshold):
                 matches.append({
-                    "x1": int(pt[0]), 
-                    "y1": int(pt[1]), 
-                    "x2": int(pt[0] + w), 
-                    "y2": int(pt[1] + h)
+                    "x1": int(x),
+                    "y1": int(y),
+                    "x2": int(x + w),
+                    "y2": int(y + h)
                 })
 
             if matches:
@@ -5,11 +5,24 @@ from PIL import Image
 import json
 import os
 import re
+import sys
 import logging
 import pyautogui
 from pywinauto import Application
 import pygetwindow as gw
 
+# Shared capture helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_stream import wait_for_ui_change
+from screen_capture import ScreenCaptureError, capture_frame
+from tap_lattice import is_point_in_bad_area
+from ocr_cache import cached_image_to_string
+
+# Longest wait for the screen to react to a tap or key press
+UI_CHANGE_TIMEOUT = 1.0
+# Fixed wait used instead when the screen cannot be captured
+FALLBACK_DELAY = 1
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -32,19 +45,40 @@ def take_screenshot(screenshot_path):
     adb_command(f"adb pull /sdcard/screenshot.png {screenshot_path}")
     logging.info(f"Captured screenshot: {screenshot_path}")
 
+# Functions to wait for the screen after an input
+def capture_baseline():
+    """The current screen, or None if it cannot be captured."""
+    try:
+        return capture_frame()
+    except ScreenCaptureError as e:
+        logging.warning(f"Screen capture failed, falling back to a fixed delay: {e}")
+        return None
+
+def wait_for_screen(baseline):
+    """Wait for the screen to move off baseline; without a baseline or on a failed capture, sleep instead."""
+    if baseline is not None:
+        try:
+            return wait_for_ui_change(timeout=UI_CHANGE_TIMEOUT, baseline=baseline)
+        except ScreenCaptureError as e:
+            logging.warning(f"Screen capture failed, falling back to a fixed delay: {e}")
+    time.sleep(FALLBACK_DELAY)
+    return None
+
 # Function to close pop-up window
 def close_popup():
     """Closes the pop-up window using ADB to send a back key event."""
     logging.info("Attempting to close pop-up using ADB back key event.")
+    baseline = capture_baseline()
     result = adb_command("adb shell input keyevent 4")  # Key event 4 is the back button
     logging.info(f"ADB command result: {result}")
-    time.sleep(1)  # Add a delay to ensure the pop-up is closed
+    # Wait until the pop-up is gone rather than a fixed delay
+    change = wait_for_screen(baseline)
 
     # If the back key doesn't work, try tapping a specific coordinate
-    if "error" in result.lower():
+    if "error" in result.lower() or (change is not None and not change.changed):
         logging.warning("Back key event failed, trying to tap coordinates.")
         adb_command("adb shell input tap 100 100")  # Example coordinates, adjust as needed
-        time.sleep(1)
+        wait_for_screen(change.frame if change is not None else None)
 
 # Function to extract metadata and KXY from screenshot
 def extract_metadata_from_screenshot(screenshot_path):
@@ -56,7 +90,7 @@ def extract_metadata_from_screenshot(screenshot_path):
         # Convert to grayscale to improve OCR accuracy
         gray_img = cropped_img.convert('L')
         
-        text = pytesseract.image_to_string(gray_img)
+        text = cached_image_to_string(gray_img)
         logging.info(f"OCR Output:\n{text}")
         
         kxy_data = None
@@ -89,17 +123,6 @@ def crop_bad_area(image):
     cropped_image.paste((255, 255, 255), bad_area)
     return cropped_image
 
-# Check if a point is within a bad area
-def is_point_in_bad_area(x, y):
-    """Returns True if the point is within a predefined bad area."""
-    bad_areas = [
-        ((396, 0), (1382, 82)),
-        ((0, 589), (84, 765)),
-        ((1468, 779), (1594, 894)),
-        ((1522, 281), (1585, 335)),
-    ]
-    return any(x1 <= x <= x2 and y1 <= y <= y2 for (x1, y1), (x2, y2) in bad_areas)
-
 # Load tile coordinates
 def load_tile_coordinates(filename):
     """Loads tile coordinates from a JSON file."""
@@ -191,8 +214,12 @@ def main():
                 continue
             
             logging.info(f"Clicking point ({x}, {y})")
+            baseline = capture_baseline()
             click_point(x, y)
-            time.sleep(1)  # Ensure the tap is registered
+            # Ensure the tap is registered and the pop-up has rendered
+            change = wait_for_screen(baseline)
+            if change is not None and not change.changed:
+                logging.warning(f"Click at ({x}, {y}) did not change the screen.")
 
             screenshot_name = f"screenshot_x{x}_y{y}.png"
             screenshot_path = os.path.join(screenshot_folder, screenshot_name)
@@ -220,8 +247,7 @@ def main():
             click_entry = {"x": x, "y": y, "screenshot": screenshot_name, "metadata": metadata, "kxy": kxy_data}
             click_data.append(click_entry)
             
-            close_popup()
-            time.sleep(1)  # Ensure the pop-up is closed before proceeding
+            close_popup()  # Returns once the pop-up is closed
             
             try:
                 with open(log_file, "w") as f:
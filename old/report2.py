@@ -1,6 +1,14 @@
 import json
+import os
+import re
+import sys
 import time
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from coverage_map import CoverageMap
+
+KXY_PATTERN = re.compile(r'K:(\d+)\s*X:(\d+)\s*Y:(\d+)')
+
 # Function to print the report in a readable format
 def print_report(report):
     print("\n--- KXY Data Analysis Report ---")
@@ -21,7 +29,7 @@ def print_report(report):
                     print(f"ADBXY: {adbxy}")
     
     # Calculate the percentage of the total map scanned
-    total_tiles_scanned = 0  # Replace with the actual total number of tiles clicked on
+    total_tiles_scanned = report['total_tiles_scanned']
     total_tiles_in_grid = 511 * 1023
     percentage_scanned = (total_tiles_scanned / total_tiles_in_grid) * 100
 
@@ -62,8 +70,23 @@ def analyze_kxy_data(click_data):
         if len(adbxy_list) > kxy_data[kxy]:
             adbxy_data[kxy] = adbxy_list[:kxy_data[kxy]]
 
+    # Count this report's tiles on an in-memory map, leaving the shared coverage/ grids alone
+    tiles_by_kingdom = {}
+    for kxy in kxy_data:
+        match = KXY_PATTERN.search(kxy)
+        if match:
+            k, x, y = (int(value) for value in match.groups())
+            xs, ys = tiles_by_kingdom.setdefault(k, ([], []))
+            xs.append(x)
+            ys.append(y)
+
+    coverage = CoverageMap(directory=None)
+    for k, (xs, ys) in tiles_by_kingdom.items():
+        coverage.mark(k, xs, ys)
+
     # Return results
     return {
+        "total_tiles_scanned": coverage.covered_count(),
         "total_clicks": total_clicks,
         "unique_kxy_count": len(kxy_data),
         "kxy_data": kxy_data,
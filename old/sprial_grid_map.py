@@ -1,10 +1,14 @@
 import time
 import subprocess
 import os
-import pytesseract
 from PIL import Image
 import json
 import math
+import sys
+
+# Shared helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ocr_cache import cached_image_to_string
 
 # Define ADB command function
 def adb_command(command):
@@ -27,7 +31,7 @@ def extract_metadata_from_screenshot(screenshot_path):
     img = Image.open(screenshot_path)
     # Crop the image to exclude the bad area before running OCR
     cropped_img = crop_bad_area(img)
-    text = pytesseract.image_to_string(cropped_img)
+    text = cached_image_to_string(cropped_img)
 
     # Debug: Print OCR output to see what was extracted
     print(f"OCR Output:\n{text}")
@@ -0,0 +1,165 @@
+import random
+import time
+from collections import defaultdict
+
+# 📌 Index Parameters
+HASH_BITS = 64          # imagehash.phash with the default hash_size=8
+DEFAULT_RADIUS = 5      # Hamming distance at or below which two hashes are near-duplicates
+
+
+def hash_to_int(value):
+    """A perceptual hash as an int: accepts ints, hex strings and imagehash.ImageHash."""
+    if isinstance(value, int):
+        return value
+    return int(str(value), 16)
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class HammingIndex:
+    """
+    Multi-index hashing over 64-bit hashes for Hamming-radius queries.
+
+    Hashes are split into radius + 1 disjoint bit chunks, each with its own
+    hash table. Two hashes within radius bits of each other must agree
+    exactly on at least one chunk (pigeonhole), so a query only checks the
+    hashes sharing one of its chunk values instead of every stored hash.
+    """
+
+    def __init__(self, radius=DEFAULT_RADIUS, bits=HASH_BITS):
+        self.radius = radius
+        chunks = radius + 1
+        self._chunks = [
+            (bits * i // chunks, (1 << (bits * (i + 1) // chunks - bits * i // chunks)) - 1)
+            for i in range(chunks)
+        ]
+        self._tables = [defaultdict(list) for _ in self._chunks]
+        self._hashes = []
+        self._items = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, value, item):
+        value = hash_to_int(value)
+        position = len(self._items)
+        self._hashes.append(value)
+        self._items.append(item)
+        for (shift, mask), table in zip(self._chunks, self._tables):
+            table[(value >> shift) & mask].append(position)
+
+    def query(self, value, radius=None):
+        """
+        Stored items within radius of value.
+
+        Returns:
+            list: (item, distance), nearest first.
+        """
+        radius = self.radius if radius is None else radius
+        if radius > self.radius:
+            raise ValueError(f"❌ Index was built for radius {self.radius}, cannot query radius {radius}.")
+
+        value = hash_to_int(value)
+        seen = set()
+        found = []
+        for (shift, mask), table in zip(self._chunks, self._tables):
+            for position in table.get((value >> shift) & mask, ()):
+                if position in seen:
+                    continue
+                seen.add(position)
+                distance = hamming(self._hashes[position], value)
+                if distance <= radius:
+                    found.append((self._items[position], distance))
+        found.sort(key=lambda hit: hit[1])
+        return found
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        self.parent.setdefault(item, item)
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+
+def find_duplicate_clusters(hashes, radius=DEFAULT_RADIUS, survivor_key=None):
+    """
+    Group near-duplicate hashes.
+
+    Every pair within radius is found by querying the index before each
+    insert; pairs are joined with union-find, so a cluster is everything
+    connected by a chain of near-duplicates.
+
+    Args:
+        hashes (dict): {item: hash}.
+        survivor_key: Sort key choosing the item kept per cluster; defaults
+            to the item itself, so the result does not depend on input order.
+
+    Returns:
+        list: Clusters of two or more items, survivor first, rest sorted.
+    """
+    index = HammingIndex(radius)
+    clusters = UnionFind()
+    for item, value in hashes.items():
+        clusters.find(item)
+        for other, _distance in index.query(value):
+            clusters.union(other, item)
+        index.add(value, item)
+
+    members = defaultdict(list)
+    for item in hashes:
+        members[clusters.find(item)].append(item)
+    return sorted(
+        (sorted(group, key=survivor_key) for group in members.values() if len(group) > 1),
+        key=lambda group: survivor_key(group[0]) if survivor_key else group[0],
+    )
+
+
+def synthetic_hashes(count, radius=DEFAULT_RADIUS, duplicate_share=0.1, seed=0):
+    """Random 64-bit hashes where duplicate_share of them are copies of another with up to radius bits flipped."""
+    rng = random.Random(seed)
+    hashes = [rng.getrandbits(HASH_BITS) for _ in range(count)]
+    for i in range(int(count * duplicate_share)):
+        source, target = rng.randrange(count), rng.randrange(count)
+        flipped = hashes[source]
+        for bit in rng.sample(range(HASH_BITS), rng.randint(0, radius)):
+            flipped ^= 1 << bit
+        hashes[target] = flipped
+    return {i: value for i, value in enumerate(hashes)}
+
+
+def benchmark(sizes=(10_000, 100_000), radius=DEFAULT_RADIUS, pairwise_sample=2_000):
+    """Cluster synthetic hashes and time it against the all-pairs loop."""
+    sample = list(synthetic_hashes(pairwise_sample, radius).values())
+    start = time.perf_counter()
+    for i, a in enumerate(sample):
+        for b in sample[i + 1:]:
+            hamming(a, b)
+    pair_seconds = (time.perf_counter() - start) / (pairwise_sample * (pairwise_sample - 1) / 2)
+
+    for size in sizes:
+        hashes = synthetic_hashes(size, radius)
+        start = time.perf_counter()
+        clusters = find_duplicate_clusters(hashes, radius)
+        elapsed = time.perf_counter() - start
+        duplicates = sum(len(cluster) - 1 for cluster in clusters)
+        pairwise = pair_seconds * size * (size - 1) / 2
+        print(f"🔹 {size} hashes: {len(clusters)} clusters, {duplicates} duplicates in {elapsed:.2f}s "
+              f"(all pairs: ~{pairwise:.0f}s extrapolated from {pairwise_sample})")
+
+
+if __name__ == "__main__":
+    benchmark()
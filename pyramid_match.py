@@ -0,0 +1,174 @@
+import glob
+import os
+import time
+import cv2
+import numpy as np
+
+# 📌 Pyramid Parameters
+PYRAMID_SCALE = 4        # Coarse search runs at 1/PYRAMID_SCALE resolution
+MIN_COARSE_SIZE = 8      # Templates are never shrunk below this many pixels a side
+COARSE_SLACK = 0.15      # Coarse scores run lower than full-scale ones; candidates need threshold - slack
+MAX_CANDIDATES = 64      # Coarse peaks refined per template
+NMS_OVERLAP = 0.3        # Boxes overlapping a better one by more than this (IoU) are dropped
+
+
+def coarse_factor(template_shape, scale=PYRAMID_SCALE, min_size=MIN_COARSE_SIZE):
+    """Largest downscale factor up to scale that keeps the template at least min_size a side."""
+    factor = scale
+    while factor > 1 and min(template_shape[:2]) // factor < min_size:
+        factor //= 2
+    return max(factor, 1)
+
+
+def find_peaks(result, threshold, window, limit=MAX_CANDIDATES):
+    """
+    Local maxima of a matchTemplate result at or above threshold.
+
+    A pixel is a peak if it is the maximum of its window x window
+    neighbourhood, so one object gives one peak instead of a blob of
+    above-threshold pixels.
+
+    Returns:
+        list: (x, y, score) for up to limit peaks, best first.
+    """
+    kernel = np.ones((max(window, 1), max(window, 1)), dtype=np.uint8)
+    peaks = (result >= threshold) & (result >= cv2.dilate(result, kernel))
+    ys, xs = np.nonzero(peaks)
+    scores = result[ys, xs]
+    order = np.argsort(-scores, kind="stable")[:limit]
+    return [(int(xs[i]), int(ys[i]), float(scores[i])) for i in order]
+
+
+def non_max_suppression(hits, width, height, overlap=NMS_OVERLAP):
+    """Keep the best of any same-size boxes overlapping by more than overlap (IoU)."""
+    hits = sorted(hits, key=lambda hit: hit[2], reverse=True)
+    kept = []
+    for x, y, score in hits:
+        if all(_iou(x, y, kx, ky, width, height) <= overlap for kx, ky, _ in kept):
+            kept.append((x, y, score))
+    return kept
+
+
+def _iou(x1, y1, x2, y2, width, height):
+    inter_w = max(0, width - abs(x1 - x2))
+    inter_h = max(0, height - abs(y1 - y2))
+    intersection = inter_w * inter_h
+    return intersection / (2 * width * height - intersection)
+
+
+class PyramidMatcher:
+    """
+    Coarse-to-fine TM_CCOEFF_NORMED matching of many templates on one image.
+
+    Each template is first matched on a downscaled copy of the image (shared
+    between templates of similar size); only the windows around coarse
+    peaks are matched again at full resolution, and overlapping hits are
+    merged by non-maximum suppression.
+    """
+
+    def __init__(self, image, scale=PYRAMID_SCALE):
+        self.image = image
+        self.scale = scale
+        self._levels = {1: image}
+
+    def level(self, factor):
+        """The image downscaled by factor, computed once."""
+        if factor not in self._levels:
+            height, width = self.image.shape[:2]
+            self._levels[factor] = cv2.resize(self.image, (width // factor, height // factor),
+                                              interpolation=cv2.INTER_AREA)
+        return self._levels[factor]
+
+    def match(self, template, threshold, stop_at=None):
+        """
+        Locations of template in the image.
+
+        Args:
+            threshold (float): Minimum full-resolution score.
+            stop_at (float): Return as soon as one hit reaches this score.
+
+        Returns:
+            list: (x, y, score) top-left corners, one per object, best first.
+        """
+        height, width = template.shape[:2]
+        image_height, image_width = self.image.shape[:2]
+        if height > image_height or width > image_width:
+            return []
+
+        factor = coarse_factor(template.shape, self.scale)
+        if factor == 1:
+            result = cv2.matchTemplate(self.image, template, cv2.TM_CCOEFF_NORMED)
+            hits = find_peaks(result, threshold, min(width, height) // 2, limit=result.size)
+            if stop_at is not None and hits and hits[0][2] >= stop_at:
+                return hits[:1]
+            return non_max_suppression(hits, width, height)
+
+        small = cv2.resize(template, (width // factor, height // factor), interpolation=cv2.INTER_AREA)
+        coarse = cv2.matchTemplate(self.level(factor), small, cv2.TM_CCOEFF_NORMED)
+        candidates = find_peaks(coarse, threshold - COARSE_SLACK, min(small.shape[:2]) // 2)
+
+        # Refine each candidate in a window covering the coarse position's uncertainty
+        pad = 2 * factor
+        hits = []
+        for cx, cy, _ in candidates:
+            x0 = max(cx * factor - pad, 0)
+            y0 = max(cy * factor - pad, 0)
+            x1 = min(cx * factor + pad + width, image_width)
+            y1 = min(cy * factor + pad + height, image_height)
+            result = cv2.matchTemplate(self.image[y0:y1, x0:x1], template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (mx, my) = cv2.minMaxLoc(result)
+            if score < threshold:
+                continue
+            hits.append((x0 + mx, y0 + my, float(score)))
+            if stop_at is not None and score >= stop_at:
+                return hits[-1:]
+        return non_max_suppression(hits, width, height)
+
+
+def match_full_resolution(image, template, threshold):
+    """The original approach: every full-resolution pixel over threshold is a hit."""
+    result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+    locations = np.where(result >= threshold)
+    return [(int(x), int(y), float(result[y, x])) for x, y in zip(*locations[::-1])]
+
+
+def benchmark(screenshot_paths, template_paths, threshold=0.8):
+    """Time the original full-resolution matcher against PyramidMatcher on saved screenshots."""
+    templates = [(path, cv2.imread(path, cv2.IMREAD_GRAYSCALE)) for path in template_paths]
+    templates = [(path, template) for path, template in templates if template is not None]
+
+    full_seconds = pyramid_seconds = 0.0
+    raw_hits = objects = found = boxes = 0
+    for screenshot_path in screenshot_paths:
+        image = cv2.imread(screenshot_path, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            continue
+
+        start = time.perf_counter()
+        full = [(template, match_full_resolution(image, template, threshold)) for _, template in templates]
+        full_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        matcher = PyramidMatcher(image)
+        pyramid = [matcher.match(template, threshold) for _, template in templates]
+        pyramid_seconds += time.perf_counter() - start
+
+        for (template, hits), pyramid_hits in zip(full, pyramid):
+            raw_hits += len(hits)
+            boxes += len(pyramid_hits)
+            # Objects the original matcher found, merged the same way, and whether the pyramid found each
+            for x, y, _ in non_max_suppression(hits, template.shape[1], template.shape[0]):
+                objects += 1
+                found += any(abs(x - px) <= 2 and abs(y - py) <= 2 for px, py, _ in pyramid_hits)
+
+    print(f"📊 {len(screenshot_paths)} screenshots x {len(templates)} templates (threshold {threshold})")
+    print(f"🔹 Full resolution: {full_seconds:.2f}s, {raw_hits} raw hits ({objects} objects after NMS)")
+    print(f"🔹 Pyramid: {pyramid_seconds:.2f}s, {boxes} boxes, {found}/{objects} objects found")
+    if pyramid_seconds:
+        print(f"✔ {full_seconds / pyramid_seconds:.1f}x faster")
+
+
+if __name__ == "__main__":
+    screenshots = sorted(glob.glob(os.path.join("screenshots", "*.png")))
+    template_files = sorted(glob.glob(os.path.join("game_templates", "**", "*.png"), recursive=True))
+    benchmark(screenshots, template_files)
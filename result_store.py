@@ -0,0 +1,152 @@
+import json
+import os
+import time
+
+# 📂 Files
+RESULTS_FILE = "ocr_results.jsonl"
+LEGACY_RESULTS_FILE = "ocr_results.json"
+
+# 📌 Durability
+FSYNC_BATCH = 50        # Records written between fsyncs
+FSYNC_INTERVAL = 5.0    # Longest time (s) a written record may wait for an fsync
+
+
+def recover(path):
+    """
+    Drop a trailing partial line left by a crash mid-write.
+
+    Returns:
+        int: Number of bytes truncated.
+    """
+    if not os.path.exists(path):
+        return 0
+
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return 0
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return 0
+
+        # Walk back to the last complete line
+        position = size
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                position += newline + 1
+                break
+        f.truncate(position)
+        return size - position
+
+
+def migrate_json_array(json_path=LEGACY_RESULTS_FILE, jsonl_path=RESULTS_FILE):
+    """
+    One-time conversion of the old JSON array file into JSON Lines.
+
+    Does nothing once the JSONL file exists. The old file is left in place.
+
+    Raises:
+        ValueError: The old file cannot be decoded. No JSONL file is written,
+            since any JSONL file (even one a writer creates later) marks the
+            migration as done; repair the file and run again.
+
+    Returns:
+        int: Number of records migrated.
+    """
+    if os.path.exists(jsonl_path) or not os.path.exists(json_path):
+        return 0
+
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"❌ Cannot migrate {json_path} to {jsonl_path}, repair it first: {e}") from e
+
+    tmp_path = f"{jsonl_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, jsonl_path)
+    print(f"✔ Migrated {len(records)} records from {json_path} to {jsonl_path}")
+    return len(records)
+
+
+def read_records(path=RESULTS_FILE, offset=0):
+    """
+    Read complete records appended after a byte offset.
+
+    A line still being written is left for the next call, so readers can
+    tail the file while a writer appends to it.
+
+    Returns:
+        tuple: (list of records, offset to resume from).
+    """
+    if not os.path.exists(path):
+        return [], offset
+
+    records = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"⚠️ Skipping corrupt record at byte {offset - len(line)} in {path}")
+    return records, offset
+
+
+class ResultStore:
+    """Append-only JSON Lines store with batched fsyncs."""
+
+    def __init__(self, path=RESULTS_FILE, fsync_batch=FSYNC_BATCH, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+
+        dropped = recover(path)
+        if dropped:
+            print(f"⚠️ Dropped {dropped} bytes of a partial record from {path}")
+
+        self._file = open(path, "ab")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, record):
+        self.extend([record])
+
+    def extend(self, records):
+        data = b"".join(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n" for record in records)
+        if not data:
+            return
+        self._file.write(data)
+        self._unsynced += len(records)
+        if self._unsynced >= self.fsync_batch or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """Flush buffered records and fsync them to disk."""
+        self._file.flush()
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
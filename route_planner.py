@@ -0,0 +1,212 @@
+import json
+import os
+import time
+from collections import defaultdict
+from navigation_tool import TAP_DELAY
+
+# 📂 Files
+NAVIGATION_FILE = "navigation_points.json"
+PROGRESS_FILE = "route_progress.json"
+
+# 📌 Planner Parameters
+TWO_OPT_WINDOW = 40   # Furthest segment end tried from each start in 2-opt
+TWO_OPT_PASSES = 3    # Full sweeps before giving up on further gains
+
+
+def field_taps(value):
+    """Taps to re-enter one field: the field, its digits and the checkmark."""
+    return 2 + len(str(value))
+
+
+def navigation_taps(previous, point):
+    """
+    Taps NavigationTool.build_navigation_steps sends to reach point from previous.
+
+    The menu and "Go" buttons are always tapped; a kingdom, X or Y field is
+    only re-entered when it differs from the previous target.
+    """
+    taps = 2
+    for last_value, value in zip(previous or (None, None, None), point):
+        if value is not None and last_value != value:
+            taps += field_taps(value)
+    return taps
+
+
+def route_taps(route, start=None):
+    """Total taps to visit route in order, starting with start as the last target."""
+    total = 0
+    previous = start
+    for point in route:
+        total += navigation_taps(previous, point)
+        previous = point
+    return total
+
+
+def _nearest_neighbour(points, start):
+    """Greedy order: always go to the unvisited point that is cheapest to enter next."""
+    by_row = defaultdict(set)     # (kingdom, y) → indexes
+    by_column = defaultdict(set)  # (kingdom, x) → indexes
+    remaining = set(range(len(points)))
+    for i, (k, x, y) in enumerate(points):
+        by_row[(k, y)].add(i)
+        by_column[(k, x)].add(i)
+
+    def cheapest(candidates, previous):
+        # Fewest taps, then the closest point on the map so the camera moves least
+        return min(candidates, key=lambda i: (
+            navigation_taps(previous, points[i]),
+            abs(points[i][1] - previous[1]) + abs(points[i][2] - previous[2]) if previous else 0,
+            i,
+        ))
+
+    order = []
+    previous = start
+    while remaining:
+        if previous is None:
+            candidates = remaining
+        else:
+            k, x, y = previous
+            # Sharing a row or column means only one field has to be typed
+            candidates = by_row.get((k, y), set()) | by_column.get((k, x), set())
+            candidates = candidates or remaining
+        i = cheapest(candidates, previous)
+
+        order.append(i)
+        remaining.discard(i)
+        k, x, y = points[i]
+        by_row[(k, y)].discard(i)
+        by_column[(k, x)].discard(i)
+        previous = points[i]
+    return [points[i] for i in order]
+
+
+def _two_opt(route, start, window=TWO_OPT_WINDOW, passes=TWO_OPT_PASSES):
+    """
+    Windowed 2-opt for the asymmetric tap cost.
+
+    Reversing route[i..j] flips the direction of every leg inside it, so
+    prefix sums of forward and backward leg costs give each move's change
+    in O(1).
+    """
+    route = list(route)
+    n = len(route)
+
+    def prefix_sums():
+        # forward[m] / backward[m]: cost of the legs up to route[m] walked forwards / backwards
+        forward = [0] * n
+        backward = [0] * n
+        for m in range(1, n):
+            forward[m] = forward[m - 1] + navigation_taps(route[m - 1], route[m])
+            backward[m] = backward[m - 1] + navigation_taps(route[m], route[m - 1])
+        return forward, backward
+
+    for _ in range(passes):
+        improved = False
+        forward, backward = prefix_sums()
+        for i in range(n - 1):
+            before = route[i - 1] if i > 0 else start
+            best_delta, best_j = 0, None
+            for j in range(i + 1, min(i + window, n)):
+                after = route[j + 1] if j + 1 < n else None
+                old = navigation_taps(before, route[i]) + forward[j] - forward[i]
+                new = navigation_taps(before, route[j]) + backward[j] - backward[i]
+                if after is not None:
+                    old += navigation_taps(route[j], after)
+                    new += navigation_taps(route[i], after)
+                if new - old < best_delta:
+                    best_delta, best_j = new - old, j
+
+            if best_j is not None:
+                route[i:best_j + 1] = reversed(route[i:best_j + 1])
+                forward, backward = prefix_sums()
+                improved = True
+        if not improved:
+            break
+    return route
+
+
+def plan_route(points, start=None, window=TWO_OPT_WINDOW):
+    """
+    Order navigation points to minimise keypad taps.
+
+    Args:
+        points (list): (kingdom, x, y) targets.
+        start (tuple): Last target navigated to, so a run can resume from
+            where the dialog currently is.
+
+    Returns:
+        list: The points as tuples, in visiting order.
+    """
+    points = list(dict.fromkeys(tuple(point) for point in points))
+    start = tuple(start) if start else None
+    return _two_opt(_nearest_neighbour(points, start), start, window)
+
+
+def compare_routes(points, route, start=None):
+    """Predicted taps and seconds for file order, file order with field reuse and the planned route."""
+    points = [tuple(point) for point in points]
+    every_field = sum(navigation_taps(None, point) for point in points)
+    file_order = route_taps(points, start)
+    planned = route_taps(route, start)
+    return {
+        "points": len(points),
+        "file_order_all_fields_taps": every_field,
+        "file_order_taps": file_order,
+        "planned_taps": planned,
+        "taps_saved": file_order - planned,
+        "seconds_saved": (file_order - planned) * TAP_DELAY,
+        "seconds_saved_vs_all_fields": (every_field - planned) * TAP_DELAY,
+    }
+
+
+def print_comparison(comparison):
+    print(f"📊 Route over {comparison['points']} points:")
+    print(f"🔹 File order, every field typed: {comparison['file_order_all_fields_taps']} taps")
+    print(f"🔹 File order, unchanged fields skipped: {comparison['file_order_taps']} taps")
+    print(f"🔹 Planned route: {comparison['planned_taps']} taps")
+    print(f"✔ Saves {comparison['taps_saved']} taps ({comparison['seconds_saved']:.0f}s) over file order, "
+          f"{comparison['seconds_saved_vs_all_fields']:.0f}s over typing every field")
+
+
+def load_navigation_points(path=NAVIGATION_FILE):
+    with open(path, "r") as f:
+        return [tuple(point) for point in json.load(f)["points"]]
+
+
+class RouteProgress:
+    """Visited points and the last target, saved after each step so a run can resume."""
+
+    def __init__(self, path=PROGRESS_FILE):
+        self.path = path
+        self.done = set()
+        self.last = None
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                state = json.load(f)
+            self.done = {tuple(point) for point in state["done"]}
+            self.last = tuple(state["last"]) if state["last"] else None
+
+    def remaining(self, points):
+        return [tuple(point) for point in points if tuple(point) not in self.done]
+
+    def mark(self, point):
+        self.done.add(tuple(point))
+        self.last = tuple(point)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"last": self.last, "done": sorted(self.done)}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.done = set()
+        self.last = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+if __name__ == "__main__":
+    navigation_points = load_navigation_points()
+    started = time.perf_counter()
+    route = plan_route(navigation_points)
+    print(f"✔ Planned {len(route)} points in {time.perf_counter() - started:.1f}s")
+    print_comparison(compare_routes(navigation_points, route))
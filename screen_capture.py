@@ -0,0 +1,101 @@
+import os
+import struct
+import subprocess
+import time
+import cv2
+import numpy as np
+from PIL import Image
+
+# 📌 screencap raw output: width, height, pixel format (+ colour space on Android 10+)
+PIXEL_FORMAT_RGBA_8888 = 1
+PIXEL_FORMAT_RGBX_8888 = 2
+CAPTURE_TIMEOUT = 10
+
+
+class ScreenCaptureError(RuntimeError):
+    """Raised when a framebuffer capture fails or cannot be decoded."""
+
+
+def parse_raw_screencap(data):
+    """Turn the bytes of `screencap` (no -p) into an (H, W, 4) RGBA uint8 array."""
+    if len(data) < 12:
+        raise ScreenCaptureError(f"Capture too short ({len(data)} bytes)")
+
+    width, height, pixel_format = struct.unpack_from("<3I", data)
+    if pixel_format not in (PIXEL_FORMAT_RGBA_8888, PIXEL_FORMAT_RGBX_8888):
+        raise ScreenCaptureError(f"Unsupported pixel format {pixel_format}")
+
+    # Older Android versions write a 12-byte header, newer ones add a colour space field
+    pixels = width * height * 4
+    header_size = len(data) - pixels
+    if header_size not in (12, 16):
+        raise ScreenCaptureError(f"Unexpected capture size {len(data)} for {width}x{height}")
+
+    frame = np.frombuffer(data, dtype=np.uint8, count=pixels, offset=header_size)
+    return frame.reshape(height, width, 4)
+
+
+def capture_frame(device_id=None, save_path=None, timeout=CAPTURE_TIMEOUT):
+    """
+    Stream the raw framebuffer over `adb exec-out screencap` into memory.
+
+    Nothing is encoded on the device or written to /sdcard.
+
+    Args:
+        device_id (str): Device serial, or None for the only connected device.
+        save_path (str): Optionally also write the frame to this PNG path.
+        timeout (float): Seconds to wait for the capture.
+
+    Returns:
+        np.ndarray: (H, W, 4) RGBA frame.
+    """
+    command = ["adb"]
+    if device_id:
+        command += ["-s", device_id]
+    command += ["exec-out", "screencap"]
+
+    try:
+        result = subprocess.run(command, capture_output=True, check=True, timeout=timeout)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        raise ScreenCaptureError(f"screencap failed: {e}") from e
+
+    frame = parse_raw_screencap(result.stdout)
+    if save_path:
+        save_frame(frame, save_path)
+    return frame
+
+
+def save_frame(frame, path):
+    """Write an RGBA frame to disk as PNG."""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    if not cv2.imwrite(path, to_bgr(frame)):
+        raise ScreenCaptureError(f"Could not write {path}")
+
+
+def to_gray(frame):
+    """RGBA frame → single-channel grayscale, as cv2.IMREAD_GRAYSCALE would load it."""
+    return cv2.cvtColor(frame, cv2.COLOR_RGBA2GRAY)
+
+
+def to_bgr(frame):
+    """RGBA frame → BGR, as cv2.imread would load it."""
+    return cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR)
+
+
+def to_pil(frame):
+    """RGBA frame → RGB PIL image, for OCR and cropping."""
+    return Image.fromarray(np.ascontiguousarray(frame[..., :3]), "RGB")
+
+
+if __name__ == "__main__":
+    import sys
+
+    device = sys.argv[1] if len(sys.argv) > 1 else None
+    samples = 10
+    start = time.perf_counter()
+    for _ in range(samples):
+        frame = capture_frame(device)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / samples
+    print(f"📸 {frame.shape[1]}x{frame.shape[0]} raw capture: {elapsed_ms:.1f} ms per frame")
@@ -0,0 +1,205 @@
+import heapq
+import math
+import random
+import time
+from coverage_map import GRID_HEIGHT, GRID_WIDTH
+from kxy_analytics import KXY_PATTERN
+from result_store import RESULTS_FILE, read_records
+from tile_categories import CATEGORIES, classify_tile_by_text
+from tile_db import has_class_text
+
+# 📌 Index Parameters
+BUCKET_SIZE = 16  # Tiles per bucket side
+
+
+class SpatialIndex:
+    """
+    Grid-bucketed index of classified tiles, per kingdom and tile class.
+
+    Each (kingdom, class) pair maps BUCKET_SIZE x BUCKET_SIZE squares of the
+    map to the tiles inside them, so queries only look at nearby buckets.
+    Inserting a tile that is already indexed replaces it.
+    """
+
+    def __init__(self, bucket_size=BUCKET_SIZE):
+        self.bucket_size = bucket_size
+        self.offset = 0  # Position in the results log for update_from_log
+        self._buckets = {}  # (kingdom, class) → {(bx, by): {(x, y): record}}
+        self._classes = {}  # (kingdom, x, y) → class
+
+    def __len__(self):
+        return len(self._classes)
+
+    def _bucket(self, x, y):
+        return x // self.bucket_size, y // self.bucket_size
+
+    def insert(self, kingdom, x, y, tile_class, record=None):
+        """Add or re-classify one tile; record is returned by queries alongside it."""
+        previous = self._classes.get((kingdom, x, y))
+        if previous is not None and previous != tile_class:
+            buckets = self._buckets[(kingdom, previous)]
+            bucket = self._bucket(x, y)
+            del buckets[bucket][(x, y)]
+            if not buckets[bucket]:
+                del buckets[bucket]
+
+        self._classes[(kingdom, x, y)] = tile_class
+        buckets = self._buckets.setdefault((kingdom, tile_class), {})
+        buckets.setdefault(self._bucket(x, y), {})[(x, y)] = record
+
+    def insert_text(self, text, record=None):
+        """
+        Index a tile from its popup OCR text; returns False if it has no KXY.
+
+        Text with nothing but the KXY line leaves an indexed tile's class as it is.
+        """
+        match = KXY_PATTERN.search(text or "")
+        if not match:
+            return False
+        kingdom, x, y = (int(value) for value in match.groups())
+        if (kingdom, x, y) in self._classes and not has_class_text(text):
+            return True
+        self.insert(kingdom, x, y, classify_tile_by_text(text), record)
+        return True
+
+    def update_from_log(self, path=RESULTS_FILE):
+        """Index OCR records appended to the results log since the last call."""
+        records, self.offset = read_records(path, self.offset)
+        return sum(self.insert_text(record.get("text", ""), record) for record in records)
+
+    @classmethod
+    def from_tile_db(cls, db, bucket_size=BUCKET_SIZE):
+        """Build an index from every tile in a tile_db.TileDB."""
+        index = cls(bucket_size)
+        for tile in db.tiles():
+            index.insert(tile["kingdom"], tile["x"], tile["y"], tile["tile_class"], tile)
+        return index
+
+    # 🔍 Queries — results are (x, y, class, record) tuples
+
+    def in_rect(self, kingdom, x1, y1, x2, y2, tile_class=None):
+        """Tiles inside an inclusive rectangle, optionally of one class or a list of classes."""
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        bx1, by1 = self._bucket(x1, y1)
+        bx2, by2 = self._bucket(x2, y2)
+
+        results = []
+        for c in self._class_names(kingdom, tile_class):
+            buckets = self._buckets[(kingdom, c)]
+            for bx in range(bx1, bx2 + 1):
+                for by in range(by1, by2 + 1):
+                    for (x, y), record in buckets.get((bx, by), {}).items():
+                        if x1 <= x <= x2 and y1 <= y <= y2:
+                            results.append((x, y, c, record))
+        return results
+
+    def within_radius(self, kingdom, x, y, radius, tile_class=None):
+        """Tiles within a Euclidean radius of (x, y), nearest first."""
+        candidates = self.in_rect(kingdom, x - radius, y - radius, x + radius, y + radius, tile_class)
+        found = []
+        for tile in candidates:
+            distance = math.hypot(tile[0] - x, tile[1] - y)
+            if distance <= radius:
+                found.append((distance, tile))
+        found.sort(key=lambda item: item[0])
+        return [tile for _, tile in found]
+
+    def nearest(self, kingdom, x, y, n=1, tile_class=None):
+        """
+        The n tiles nearest to (x, y).
+
+        Rings of buckets are searched outwards until nothing outside the
+        searched square can be closer than the n-th best tile found.
+
+        Returns:
+            list: (distance, (x, y, class, record)) pairs, nearest first.
+        """
+        classes = self._class_names(kingdom, tile_class)
+        if not classes or n <= 0:
+            return []
+
+        all_buckets = [(c, self._buckets[(kingdom, c)]) for c in classes]
+        bucket_x, bucket_y = self._bucket(x, y)
+        # Rings needed to reach every corner of the kingdom
+        max_ring = max(
+            bucket_x, bucket_y,
+            (GRID_WIDTH - 1) // self.bucket_size - bucket_x,
+            (GRID_HEIGHT - 1) // self.bucket_size - bucket_y,
+        )
+
+        best = []  # Max-heap of the n nearest so far, as (-distance, x, y, class)
+        records = {}
+        for ring in range(max_ring + 1):
+            for bx, by in self._ring(bucket_x, bucket_y, ring):
+                for c, buckets in all_buckets:
+                    for (tx, ty), record in buckets.get((bx, by), {}).items():
+                        distance = math.hypot(tx - x, ty - y)
+                        if len(best) < n:
+                            heapq.heappush(best, (-distance, tx, ty, c))
+                        elif distance < -best[0][0]:
+                            heapq.heapreplace(best, (-distance, tx, ty, c))
+                        else:
+                            continue
+                        records[(tx, ty, c)] = record
+
+            # Anything in a later ring is at least this far away
+            if len(best) == n and -best[0][0] <= self._ring_clearance(x, y, bucket_x, bucket_y, ring):
+                break
+
+        best.sort(key=lambda item: -item[0])
+        return [(-d, (tx, ty, c, records[(tx, ty, c)])) for d, tx, ty, c in best]
+
+    def _class_names(self, kingdom, tile_class):
+        classes = CATEGORIES if tile_class is None else [tile_class] if isinstance(tile_class, str) else tile_class
+        return [c for c in classes if (kingdom, c) in self._buckets]
+
+    @staticmethod
+    def _ring(bucket_x, bucket_y, ring):
+        if ring == 0:
+            yield bucket_x, bucket_y
+            return
+        for bx in range(bucket_x - ring, bucket_x + ring + 1):
+            yield bx, bucket_y - ring
+            yield bx, bucket_y + ring
+        for by in range(bucket_y - ring + 1, bucket_y + ring):
+            yield bucket_x - ring, by
+            yield bucket_x + ring, by
+
+    def _ring_clearance(self, x, y, bucket_x, bucket_y, ring):
+        """Distance from (x, y) to the nearest tile outside the searched square of buckets."""
+        size = self.bucket_size
+        left = x - (bucket_x - ring) * size
+        right = (bucket_x + ring + 1) * size - 1 - x
+        bottom = y - (bucket_y - ring) * size
+        top = (bucket_y + ring + 1) * size - 1 - y
+        return min(left, right, bottom, top) + 1
+
+
+def benchmark(tiles=500_000, queries=1000, seed=1):
+    """Time inserts and queries over a synthetic kingdom."""
+    rng = random.Random(seed)
+    weights = {"terrain": 0.80, "resources": 0.12, "enemies": 0.05, "darknest": 0.01, "unknown": 0.02}
+    classes = rng.choices(list(weights), weights=list(weights.values()), k=tiles)
+
+    index = SpatialIndex()
+    start = time.perf_counter()
+    for tile_class in classes:
+        index.insert(914, rng.randrange(512), rng.randrange(1024), tile_class)
+    print(f"📊 Inserted {tiles} tiles ({len(index)} unique) in {time.perf_counter() - start:.2f}s")
+
+    points = [(rng.randrange(512), rng.randrange(1024)) for _ in range(queries)]
+    cases = {
+        "10 nearest resources": lambda x, y: index.nearest(914, x, y, 10, "resources"),
+        "darknests within radius 30": lambda x, y: index.within_radius(914, x, y, 30, "darknest"),
+        "enemies in 64x64 rect": lambda x, y: index.in_rect(914, x, y, x + 63, y + 63, "enemies"),
+    }
+    for name, query in cases.items():
+        start = time.perf_counter()
+        found = sum(len(query(x, y)) for x, y in points)
+        per_query = (time.perf_counter() - start) / queries * 1000
+        print(f"🔹 {name}: {per_query:.3f} ms/query ({found / queries:.1f} tiles on average)")
+
+
+if __name__ == "__main__":
+    benchmark()
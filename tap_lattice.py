@@ -0,0 +1,98 @@
+import json
+import os
+import numpy as np
+from calibration import Calibration
+
+# 📂 Files
+TILE_COORDINATES_FILE = "tile_coordinates.json"
+
+# 📌 Screen Layout
+SCREEN_SIZE = (1600, 900)
+EDGE_MARGIN = 25         # Half the 50 px template crop, so crops around every tap stay full size
+TILE_SAFETY = 0.6        # Taps stay within this fraction of a tile's diamond from its centre
+
+# Screen areas covered by game UI, as ((x1, y1), (x2, y2))
+BAD_AREAS = [
+    ((396, 0), (1382, 82)),
+    ((0, 589), (84, 765)),
+    ((1468, 779), (1594, 894)),
+    ((1522, 281), (1585, 335)),
+]
+
+# Fallback offsets (in tiles) tried when a tile's centre cannot be tapped
+NUDGES = [(0.0, 0.0), (0.35, 0.0), (-0.35, 0.0), (0.0, 0.35), (0.0, -0.35)]
+
+
+def is_point_in_bad_area(x, y, bad_areas=BAD_AREAS):
+    """Returns True if the point is within a predefined bad area."""
+    return any(x1 <= x <= x2 and y1 <= y <= y2 for (x1, y1), (x2, y2) in bad_areas)
+
+
+def generate_tap_points(calibration, screen_size=SCREEN_SIZE, margin=EDGE_MARGIN, bad_areas=BAD_AREAS,
+                        safety=TILE_SAFETY):
+    """
+    One screen point per tile visible on a parked screen.
+
+    Tiles are laid out from the calibrated pitch around a camera centred on
+    a tile. Each tile gets its centre, or for tiles cut by the screen edge
+    or covered by UI, the nearest tappable point still well inside the tile.
+
+    Returns:
+        list: (x, y) integer screen points, row by row from the top.
+    """
+    width, height = screen_size
+    inverse = np.linalg.inv(calibration.matrix)
+    camera = np.zeros(2)
+
+    # World offsets of every tile that could overlap the screen
+    corners = (np.array([[0, 0], [width, 0], [0, height], [width, height]]) - calibration.center) @ calibration.matrix.T
+    low = np.floor(corners.min(axis=0)).astype(int) - 1
+    high = np.ceil(corners.max(axis=0)).astype(int) + 1
+
+    points = []
+    for dy in range(low[1], high[1] + 1):
+        for dx in range(low[0], high[0] + 1):
+            if (dx + dy) % 2 != calibration.parity:
+                continue
+            tile = np.array([dx, dy])
+            for nudge in NUDGES:
+                screen = calibration.center + inverse @ (tile + nudge - camera)
+                screen = np.clip(screen, margin, (width - 1 - margin, height - 1 - margin)).round()
+                # Each tile is the diamond |dX| + |dY| <= 1 around its centre
+                offset = calibration.predict(screen, camera)[0] - tile
+                if np.abs(offset).sum() > safety or is_point_in_bad_area(*screen, bad_areas):
+                    continue
+                points.append((int(screen[0]), int(screen[1])))
+                break
+    return sorted(points, key=lambda point: (point[1], point[0]))
+
+
+def save_tap_points(points, path=TILE_COORDINATES_FILE):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"tiles": [{"x": x, "y": y} for x, y in points]}, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def load_tap_points(path=TILE_COORDINATES_FILE):
+    """The tap lattice as (x, y) tuples, generated from the calibration if the file is missing."""
+    if not os.path.exists(path):
+        calibration = Calibration.load()
+        if calibration is None:
+            raise FileNotFoundError(f"❌ Neither {path} nor a calibration to generate it from was found.")
+        save_tap_points(generate_tap_points(calibration), path)
+
+    with open(path, "r") as f:
+        return [(tile["x"], tile["y"]) for tile in json.load(f)["tiles"]]
+
+
+if __name__ == "__main__":
+    calibration = Calibration.load()
+    points = generate_tap_points(calibration)
+
+    # Every tap must land on its own tile
+    tiles = calibration.predict_tiles(points, np.zeros(2))
+    assert len({tuple(tile) for tile in tiles}) == len(points), "Two taps hit the same tile"
+
+    save_tap_points(points)
+    print(f"✔ Saved {len(points)} tap points, one per visible tile, to {TILE_COORDINATES_FILE}")
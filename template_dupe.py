@@ -2,6 +2,7 @@ import os
 import imagehash
 from PIL import Image
 from collections import defaultdict
+from phash_index import find_duplicate_clusters
 
 # Configuration
 TEMPLATE_DIR = "game_templates"  # Root folder for templates
@@ -33,34 +34,29 @@ def get_image_hashes():
 def find_and_delete_duplicates(hashes):
     """Finds and deletes duplicate images, keeping only one unique version."""
     similar_images = defaultdict(list)
-    checked_pairs = set()
-    deleted_files = []
-
-    file_list = list(hashes.keys())
-
-    for i, file1 in enumerate(file_list):
-        for j in range(i + 1, len(file_list)):  # Avoid redundant comparisons
-            file2 = file_list[j]
-            if (file1, file2) in checked_pairs or (file2, file1) in checked_pairs:
-                continue  # Skip already checked pairs
-            
-            hash_diff = hashes[file1] - hashes[file2]
 
-            if hash_diff <= SIMILARITY_THRESHOLD:
-                similar_images[file1].append(file2)
-                
-                # Check if the file exists before deleting
-                if os.path.exists(file2):
-                    os.remove(file2)  
-                    deleted_files.append(file2)
-                    print(f"🗑 Deleted duplicate: {file2}")
-                else:
-                    print(f"⚠️ Skipped deletion (file not found): {file2}")
-
-            checked_pairs.add((file1, file2))
+    # Cluster first, so every file is compared while all of them still exist
+    for cluster in find_duplicate_clusters(hashes, SIMILARITY_THRESHOLD):
+        survivor, *duplicates = cluster  # Survivor is the first path in sort order
+        similar_images[survivor].extend(duplicates)
 
+    deleted_files = delete_duplicates(similar_images)
     return similar_images, deleted_files
 
+def delete_duplicates(similar_images):
+    """Deletes every duplicate after clustering is complete."""
+    deleted_files = []
+    for duplicates in similar_images.values():
+        for file_path in duplicates:
+            # Check if the file exists before deleting
+            if os.path.exists(file_path):
+                os.remove(file_path)
+                deleted_files.append(file_path)
+                print(f"🗑 Deleted duplicate: {file_path}")
+            else:
+                print(f"⚠️ Skipped deletion (file not found): {file_path}")
+    return deleted_files
+
 def save_report(similar_images, deleted_files):
     """Saves a report of similar and deleted images to a file with UTF-8 encoding."""
     with open(REPORT_PATH, "w", encoding="utf-8") as report:  # ✅ Force UTF-8 Encoding
@@ -1,9 +1,8 @@
 import os
-import cv2
-import numpy as np
 import subprocess
-import time
-from datetime import datetime
+from pyramid_match import PyramidMatcher
+from template_pack import load_pack
+from screen_capture import ScreenCaptureError, capture_frame, to_gray
 
 # Ensure directories exist
 os.makedirs('screenshots', exist_ok=True)
@@ -24,36 +23,36 @@ def check_adb_connection():
         exit(1)
 
 def take_screenshot():
-    """Takes a new screenshot and saves it."""
+    """Takes a new screenshot, saves it, and returns it in grayscale."""
     try:
-        subprocess.run(['adb', 'shell', 'screencap', '-p', '/sdcard/screenshot.png'], check=True)
-        time.sleep(0.2)  # Allow time for the screenshot to save
-        subprocess.run(['adb', 'pull', '/sdcard/screenshot.png', SCREENSHOT_PATH], check=True)
-        subprocess.run(['adb', 'shell', 'rm', '/sdcard/screenshot.png'], check=True)
+        frame = capture_frame(save_path=SCREENSHOT_PATH)
         print(f"✔ Screenshot saved: {SCREENSHOT_PATH}")
-        return SCREENSHOT_PATH
-    except subprocess.CalledProcessError as e:
+        return to_gray(frame)
+    except ScreenCaptureError as e:
         print(f"❌ Error taking screenshot: {e}")
         return None
 
-def match_templates(screenshot_path, confidence_threshold=0.6):
-    """Find all matches from game templates above a confidence threshold."""
-    screenshot = cv2.imread(screenshot_path, cv2.IMREAD_GRAYSCALE)
-    matches = []
+def match_templates(screenshot, confidence_threshold=0.6, stop_at=None):
+    """
+    Find all matches from game templates above a confidence threshold.
 
-    for template_name in os.listdir(TEMPLATES_DIR):
-        template_path = os.path.join(TEMPLATES_DIR, template_name)
-        template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
+    Each object is reported once (see pyramid_match.PyramidMatcher); with
+    stop_at, the search ends at the first match reaching that confidence.
+    """
+    matches = []
+    if screenshot is None:
+        return matches
 
-        if template is None or screenshot is None:
-            continue
+    matcher = PyramidMatcher(screenshot)
+    pack = load_pack(templates_dir=TEMPLATES_DIR)  # Mapped 50x50 templates, see template_pack.py
+    for entry, template in zip(pack.entries, pack.images):
+        template_name = os.path.relpath(entry["path"], TEMPLATES_DIR)
 
         # Perform template matching
-        result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-        locs = np.where(result >= confidence_threshold)  # Find all matches above threshold
-
-        for pt in zip(*locs[::-1]):  # Flip (y, x) -> (x, y)
-            matches.append((template_name, pt, result[pt[1], pt[0]]))  # (filename, (x, y), confidence)
+        for x, y, confidence in matcher.match(template, confidence_threshold, stop_at):
+            matches.append((template_name, (x, y), confidence))  # (filename, (x, y), confidence)
+            if stop_at is not None and confidence >= stop_at:
+                return matches
 
     # Sort matches by confidence (highest first)
     matches.sort(key=lambda x: x[2], reverse=True)
@@ -72,11 +71,11 @@ def tap_on_match(matched_coords):
 check_adb_connection()
 
 # Take a new screenshot
-screenshot_path = take_screenshot()
+screenshot = take_screenshot()
 
 # Perform template matching
-if screenshot_path:
-    matches = match_templates(screenshot_path)
+if screenshot is not None:
+    matches = match_templates(screenshot)
 
     if matches:
         print(f"🎯 Found {len(matches)} matches:")
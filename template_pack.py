@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import re
+import time
+import cv2
+import numpy as np
+
+# 📂 Pack files
+PACK_DIR = "template_pack"
+TEMPLATES_DIR = "game_templates"
+IMAGES_FILE = "images_{}.npy"    # One file per generation, named in the manifest
+LEGACY_IMAGES_FILE = "images.npy"  # Single array file of packs written before generations
+MANIFEST_FILE = "manifest.json"
+
+# 📌 Pack Parameters
+TEMPLATE_SIZE = (50, 50)  # Every template is stored at this size, as used for matching
+LOAD_RETRIES = 3          # Reads of a manifest that does not describe the array on disk before rebuilding
+LOAD_RETRY_DELAY = 0.2    # Seconds between them, for a writer that just swapped generations
+
+# Tap point in names written by workflow_template_creation.save_template: <category>_X<x>_Y<y>_<timestamp>.png
+COORDS_PATTERN = re.compile(r"_X(\d+)_Y(\d+)_")
+GENERATION_PATTERN = re.compile(r"^images_(\d+)\.npy$")
+
+
+class TemplatePack:
+    """
+    The template library as one (N, h, w) uint8 array plus a manifest.
+
+    The array is an .npy file opened with mmap_mode="r", so loading costs
+    no decoding and no copies, and processes opening the same pack share
+    its pages. manifest.json names the array file and lists, per row: path,
+    category, sha1 of the file, mtime, byte size and the tap coordinates
+    parsed from the name.
+
+    Every rewrite goes to a new images_<n>.npy, so a file a reader has
+    mapped is never replaced underneath it (which Windows refuses anyway);
+    older generations are deleted once nothing maps them.
+    """
+
+    def __init__(self, pack_dir=PACK_DIR, templates_dir=TEMPLATES_DIR, size=TEMPLATE_SIZE):
+        self.pack_dir = pack_dir
+        self.templates_dir = templates_dir
+        self.size = size
+        self.entries = []
+        self.images = np.empty((0, size[1], size[0]), dtype=np.uint8)
+        self.images_file = None
+        os.makedirs(pack_dir, exist_ok=True)
+        self._load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _path(self, name):
+        return os.path.join(self.pack_dir, name)
+
+    def _load(self):
+        for _attempt in range(LOAD_RETRIES):
+            if not os.path.exists(self._path(MANIFEST_FILE)):
+                return
+            with open(self._path(MANIFEST_FILE), "r") as f:
+                manifest = json.load(f)
+            if manifest["size"] != list(self.size):
+                return  # Packed at another size; the next refresh rebuilds it
+            images_file = manifest.get("images", LEGACY_IMAGES_FILE)
+            try:
+                images = np.load(self._path(images_file), mmap_mode="r")
+            except (OSError, ValueError):
+                images = None  # Deleted by a writer after it wrote a newer manifest
+            if images is not None and len(manifest["entries"]) == images.shape[0]:
+                self.entries = manifest["entries"]
+                self.images = images
+                self.images_file = images_file
+                return
+            time.sleep(LOAD_RETRY_DELAY)
+        print(f"⚠️ {self._path(MANIFEST_FILE)} does not match its array; the next refresh rebuilds the pack")
+
+    def scan_templates(self):
+        """(path, category) of every file under templates_dir/<category>/."""
+        found = []
+        if not os.path.isdir(self.templates_dir):
+            return found
+        for category in sorted(os.listdir(self.templates_dir)):
+            category_path = os.path.join(self.templates_dir, category)
+            if os.path.isdir(category_path):
+                for filename in sorted(os.listdir(category_path)):
+                    found.append((os.path.join(category_path, filename), category))
+        return found
+
+    def refresh(self):
+        """
+        Bring the pack in line with the template folders.
+
+        Files whose mtime and size match the manifest are not read; a
+        changed file is only decoded if its sha1 differs. The array and
+        manifest are rewritten only if a row was added, changed or removed.
+
+        Returns:
+            tuple: (templates added or changed, templates removed).
+        """
+        previous = {entry["path"]: row for row, entry in enumerate(self.entries)}
+        entries, sources = [], []  # sources: old row to copy, or a freshly decoded image
+        added = 0
+        for path, category in self.scan_templates():
+            stat = os.stat(path)
+            row = previous.get(path)
+            entry = self.entries[row] if row is not None else None
+            if entry and entry["mtime"] == stat.st_mtime and entry["bytes"] == stat.st_size:
+                entries.append(entry)
+                sources.append(row)
+                continue
+
+            with open(path, "rb") as f:
+                data = f.read()
+            sha1 = hashlib.sha1(data).hexdigest()
+            if entry and entry["sha1"] == sha1:
+                entries.append(dict(entry, mtime=stat.st_mtime, bytes=stat.st_size))
+                sources.append(row)
+                continue
+
+            image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                continue
+            if image.shape[::-1] != self.size:
+                image = cv2.resize(image, self.size)
+            coords = COORDS_PATTERN.search(os.path.basename(path))
+            entries.append({
+                "path": path,
+                "category": category,
+                "sha1": sha1,
+                "mtime": stat.st_mtime,
+                "bytes": stat.st_size,
+                "coords": [int(coords.group(1)), int(coords.group(2))] if coords else None,
+            })
+            sources.append(image)
+            added += 1
+
+        removed = len(previous.keys() - {entry["path"] for entry in entries})
+        if not added and sources == list(range(len(self.entries))):
+            # Only mtimes may have moved; keep the array, refresh the manifest
+            if entries != self.entries:
+                self.entries = entries
+                self._write_manifest()
+            return 0, 0
+
+        self._write(entries, sources)
+        return added, removed
+
+    def _generations(self):
+        """Generation numbers of the array files in pack_dir."""
+        return [int(m.group(1)) for m in map(GENERATION_PATTERN.match, os.listdir(self.pack_dir)) if m]
+
+    def _write(self, entries, sources):
+        images_file = IMAGES_FILE.format(max(self._generations(), default=0) + 1)
+        tmp_path = self._path(f"{images_file}.tmp")
+        images = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8,
+                                           shape=(len(entries), self.size[1], self.size[0]))
+        for row, source in enumerate(sources):
+            images[row] = self.images[source] if isinstance(source, int) else source
+        images.flush()
+        del images
+        os.replace(tmp_path, self._path(images_file))
+
+        self.entries = entries
+        self.images_file = images_file
+        self._write_manifest()
+        self.images = np.load(self._path(images_file), mmap_mode="r")
+        self._remove_old_generations()
+
+    def _remove_old_generations(self):
+        old = [IMAGES_FILE.format(n) for n in self._generations()] + [LEGACY_IMAGES_FILE]
+        for name in old:
+            if name != self.images_file and os.path.exists(self._path(name)):
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass  # Still mapped by a reader on Windows; removed by a later write
+
+    def _write_manifest(self):
+        # Written after the array: a manifest always names a complete array
+        tmp_path = self._path(f"{MANIFEST_FILE}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"size": list(self.size), "images": self.images_file, "entries": self.entries}, f)
+        os.replace(tmp_path, self._path(MANIFEST_FILE))
+
+    def templates(self):
+        """{path: (image, category)} with each image a view into the mapped array."""
+        return {entry["path"]: (self.images[row], entry["category"]) for row, entry in enumerate(self.entries)}
+
+
+def load_pack(pack_dir=PACK_DIR, templates_dir=TEMPLATES_DIR, size=TEMPLATE_SIZE):
+    """A pack refreshed from templates_dir, reporting any rows it had to update."""
+    pack = TemplatePack(pack_dir, templates_dir, size)
+    added, removed = pack.refresh()
+    if added or removed:
+        print(f"✔ Template pack updated: {added} added/changed, {removed} removed")
+    return pack
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    pack = load_pack()
+    print(f"✔ Packed {len(pack)} templates in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    pack = TemplatePack()
+    pack.refresh()
+    print(f"✔ Reopened pack with {len(pack)} templates in {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from coverage_map import GRID_HEIGHT, GRID_WIDTH, CoverageMap
+
+
+class TestCoverageMap(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.coverage = CoverageMap(self.tmp.name)
+
+    def tearDown(self):
+        self.coverage._grids.clear()  # Release the memory maps before the directory goes
+        self.tmp.cleanup()
+
+    def test_mark_counts_new_tiles_once(self):
+        self.assertEqual(self.coverage.mark(1, [10, 11, 11], [20, 20, 20]), 2)
+        self.assertEqual(self.coverage.mark(1, [11, 12], [20, 20]), 1)
+        self.assertEqual(self.coverage.covered_count(1), 3)
+
+    def test_mark_ignores_out_of_range(self):
+        self.assertEqual(self.coverage.mark(1, [-1, GRID_WIDTH, 0], [0, 0, GRID_HEIGHT]), 0)
+        self.assertEqual(self.coverage.covered_count(), 0)
+
+    def test_grid_is_row_major(self):
+        self.coverage.mark(1, [5], [300])
+        self.assertEqual(self.coverage.grid(1)[300, 5], 1)
+        np.testing.assert_array_equal(self.coverage.is_covered(1, [5, 300, -3], [300, 5, 0]),
+                                      [True, False, False])
+
+    def test_unknown_kingdom_is_uncovered(self):
+        np.testing.assert_array_equal(self.coverage.is_covered(9, [1], [1]), [False])
+        self.assertEqual(self.coverage.kingdoms(), [])
+
+    def test_grids_persist(self):
+        self.coverage.mark(3, [1, 2], [1, 2])
+        self.coverage.mark(4, [1], [1])
+        self.coverage.flush()
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "k3.npy")))
+
+        reopened = CoverageMap(self.tmp.name)
+        self.assertEqual(reopened.kingdoms(), [3, 4])
+        self.assertEqual(reopened.covered_count(), 3)
+        self.assertEqual(reopened.covered_count(3), 2)
+
+    def test_in_memory_map_writes_nothing(self):
+        coverage = CoverageMap(directory=None)
+        self.assertEqual(coverage.mark(7, [1, 1, 2], [1, 1, 2]), 2)
+        coverage.flush()
+        self.assertEqual(coverage.kingdoms(), [7])
+        self.assertEqual(coverage.covered_count(), 2)
+        self.assertIsNone(coverage.grid(8, create=False))
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_uncovered_in_rect(self):
+        self.coverage.mark(1, [1, 2], [1, 1])
+        uncovered = self.coverage.uncovered_in_rect(1, 2, 1, 0, 2)
+        self.assertEqual(sorted(map(tuple, uncovered.tolist())),
+                         [(0, 1), (0, 2), (1, 2), (2, 2)])
+        self.assertEqual(len(self.coverage.uncovered_in_rect(5, 0, 0, 1, 1)), 4)
+
+    def test_region_coverage(self):
+        self.coverage.mark(1, np.arange(64), np.zeros(64, dtype=int))
+        regions = self.coverage.region_coverage(1, 64)
+        self.assertEqual(regions.shape, (GRID_HEIGHT // 64, GRID_WIDTH // 64))
+        self.assertAlmostEqual(regions[0, 0], 100 / 64)
+        self.assertEqual(regions[0, 1], 0)
+
+    def test_clear(self):
+        self.coverage.mark(1, [1], [1])
+        self.coverage.clear()
+        self.assertEqual(self.coverage.covered_count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import numpy as np
+from kxy_ocr import KXY_PATTERN, read_kxy_item, tap_from_filename
+
+
+class TestReadKxyItem(unittest.TestCase):
+
+    def setUp(self):
+        self.reader = MagicMock(last_full_text=None)
+        self.frame = np.zeros((10, 10, 3), dtype=np.uint8)
+        patches = [
+            patch("kxy_ocr._reader", self.reader),
+            patch("kxy_ocr._classified", {(1, 2, 3)}),
+            patch("kxy_ocr.ocr_image", return_value="Gold Mine\n"),
+        ]
+        self.ocr_image = patches[2].start()
+        for p in patches[:2]:
+            p.start()
+        for p in patches:
+            self.addCleanup(p.stop)
+
+    def read(self, kxy, **kwargs):
+        self.reader.read.return_value = KXY_PATTERN.search(kxy) if kxy else None
+        return read_kxy_item((self.frame, (5, 5)), **kwargs)
+
+    def test_known_tile_gets_only_kxy(self):
+        self.assertEqual(self.read("K:1 X:2 Y:3").text, "K:1 X:2 Y:3")
+        self.ocr_image.assert_not_called()
+
+    def test_new_tile_gets_full_text_once(self):
+        self.assertEqual(self.read("K:1 X:9 Y:9").text, "K:1 X:9 Y:9\nGold Mine")
+        self.assertEqual(self.read("K:1 X:9 Y:9").text, "K:1 X:9 Y:9")
+        self.assertEqual(self.ocr_image.call_count, 1)
+
+    def test_new_tile_reuses_locating_pass(self):
+        self.reader.last_full_text = "Forest\nK:1 X:8 Y:8"
+        self.assertEqual(self.read("K:1 X:8 Y:8").text, "K:1 X:8 Y:8\nForest\nK:1 X:8 Y:8")
+        self.ocr_image.assert_not_called()
+
+    def test_class_text_off(self):
+        self.assertEqual(self.read("K:1 X:7 Y:7", class_text=False).text, "K:1 X:7 Y:7")
+        self.ocr_image.assert_not_called()
+
+    def test_no_kxy_falls_back_to_full_text(self):
+        self.assertEqual(self.read(None).text, "Gold Mine")
+
+    def test_tap_from_filename(self):
+        self.assertEqual(tap_from_filename("shots/screenshot_20240101_101010_123456_x120_y45.png"), (120, 45))
+        self.assertIsNone(tap_from_filename("screenshot.png"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+import numpy as np
+from PIL import Image
+import ocr_cache
+from ocr_cache import OcrCache, get_cache, image_key
+
+
+class FakeOcr:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, image, config):
+        self.calls += 1
+        return f"text {self.calls}"
+
+
+def cached_lookup(value):
+    """Pool task: one lookup through this process's cache, OCR faked."""
+    return get_cache().image_to_string(np.full((4, 4), value, dtype=np.uint8), ocr=lambda image, config: "text")
+
+
+class TestOcrCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache.db")
+        self.cache = OcrCache(self.path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_image_key(self):
+        image = np.zeros((4, 4), dtype=np.uint8)
+        self.assertEqual(image_key(image), image_key(image.copy()))
+        self.assertNotEqual(image_key(image), image_key(image, "--psm 7"))
+        self.assertNotEqual(image_key(image), image_key(image.reshape(2, 8)))
+        self.assertNotEqual(image_key(image), image_key(Image.fromarray(image)))
+
+    def test_hit_skips_ocr(self):
+        ocr = FakeOcr()
+        image = np.full((8, 8), 7, dtype=np.uint8)
+        self.assertEqual(self.cache.image_to_string(image, ocr=ocr), "text 1")
+        self.assertEqual(self.cache.image_to_string(image.copy(), ocr=ocr), "text 1")
+        self.assertEqual(self.cache.image_to_string(image, "--psm 7", ocr=ocr), "text 2")
+        self.assertEqual(ocr.calls, 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+        self.assertAlmostEqual(self.cache.hit_rate, 1 / 3)
+
+    def test_paths_are_not_cached(self):
+        ocr = FakeOcr()
+        self.cache.image_to_string("screenshot.png", ocr=ocr)
+        self.cache.image_to_string("screenshot.png", ocr=ocr)
+        self.assertEqual(ocr.calls, 2)
+
+    def test_results_persist(self):
+        self.cache.put("key", "K:1 X:2 Y:3")
+        self.cache.close()
+        with OcrCache(self.path) as reopened:
+            self.assertEqual(reopened.get("key"), "K:1 X:2 Y:3")
+
+    def test_counters_are_shared_after_flush(self):
+        self.cache.put("key", "text")
+        other = OcrCache(self.path)
+        other.get("key")
+        other.get("missing")
+        # Counted locally until flushed, so lookups do not write
+        self.assertEqual(self.cache.totals(), (0, 0))
+        other.close()
+        self.assertEqual(self.cache.totals(), (1, 1))
+        self.cache.get("key")
+        self.assertEqual(self.cache.totals(), (2, 1))
+
+    def test_evict_keeps_recently_used(self):
+        cache = OcrCache(os.path.join(self.tmp.name, "small.db"), max_entries=10)
+        for i in range(12):
+            cache.put(f"key{i}", str(i))
+        cache.get("key0")  # Touched last, so it survives
+        cache.evict()
+        self.assertEqual(cache.size(), 9)
+        self.assertEqual(cache.get("key0"), "0")
+        self.assertIsNone(cache.get("key1"))
+        cache.close()
+
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs fork")
+class TestGetCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patches = [
+            patch("ocr_cache.CACHE_FILE", os.path.join(self.tmp.name, "cache.db")),
+            patch("ocr_cache._cache", None),
+            patch("ocr_cache._cache_pid", None),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        if ocr_cache._cache is not None:
+            ocr_cache._cache.close()
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def test_forked_workers_flush_their_counts(self):
+        # The parent opens its cache before the pool forks, as ocr_to_json does
+        self.assertEqual(get_cache().totals(), (0, 0))
+        values = [i % 5 for i in range(40)]
+        with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("fork")) as pool:
+            self.assertEqual(list(pool.map(cached_lookup, values)), ["text"] * 40)
+
+        hits, misses = get_cache().totals()
+        self.assertEqual(hits + misses, 40)
+        self.assertGreaterEqual(misses, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
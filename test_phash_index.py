@@ -0,0 +1,45 @@
+import unittest
+from phash_index import HammingIndex, find_duplicate_clusters, hamming, hash_to_int, synthetic_hashes
+
+
+class TestHammingIndex(unittest.TestCase):
+
+    def test_hash_to_int(self):
+        self.assertEqual(hash_to_int(255), 255)
+        self.assertEqual(hash_to_int("00000000000000ff"), 255)
+
+    def test_query_matches_brute_force(self):
+        hashes = synthetic_hashes(3000, radius=5, duplicate_share=0.3, seed=2)
+        index = HammingIndex(radius=5)
+        for item, value in hashes.items():
+            index.add(value, item)
+
+        for item in list(hashes)[:200]:
+            query = hashes[item]
+            found = index.query(query)
+            expected = sorted(other for other, value in hashes.items() if hamming(value, query) <= 5)
+            self.assertEqual(sorted(other for other, _ in found), expected)
+            distances = [distance for _, distance in found]
+            self.assertEqual(distances, sorted(distances))
+
+    def test_smaller_radius_query(self):
+        index = HammingIndex(radius=4)
+        index.add(0, "zero")
+        index.add(0b111, "three bits")
+        self.assertEqual(index.query(0, radius=2), [("zero", 0)])
+        with self.assertRaises(ValueError):
+            index.query(0, radius=5)
+
+    def test_clusters_join_chains(self):
+        # a-b and b-c are within radius, a-c is not: all three form one cluster
+        hashes = {"c": 0b111111000, "a": 0, "b": 0b111000, "far": (1 << 64) - 1}
+        self.assertEqual(find_duplicate_clusters(hashes, radius=3), [["a", "b", "c"]])
+
+    def test_survivor_key(self):
+        hashes = {"short": 1, "longer name": 1, "mid": 3}
+        clusters = find_duplicate_clusters(hashes, radius=1, survivor_key=lambda item: -len(item))
+        self.assertEqual(clusters, [["longer name", "short", "mid"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+import unittest
+from result_store import ResultStore, migrate_json_array, read_records, recover
+
+
+class TestResultStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "results.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_and_read_back(self):
+        with ResultStore(self.path) as store:
+            store.append({"filename": "a.png", "text": "K:1 X:2 Y:3"})
+            store.extend([{"filename": "b.png", "text": "é"}])
+        records, offset = read_records(self.path)
+        self.assertEqual([record["filename"] for record in records], ["a.png", "b.png"])
+        self.assertEqual(records[1]["text"], "é")
+        self.assertEqual(offset, os.path.getsize(self.path))
+
+    def test_read_resumes_from_offset(self):
+        with ResultStore(self.path) as store:
+            store.append({"n": 1})
+        _, offset = read_records(self.path)
+        with ResultStore(self.path) as store:
+            store.append({"n": 2})
+        records, _ = read_records(self.path, offset)
+        self.assertEqual(records, [{"n": 2}])
+
+    def test_read_leaves_partial_line(self):
+        with open(self.path, "wb") as f:
+            f.write(b'{"n": 1}\n{"n": 2')
+        records, offset = read_records(self.path)
+        self.assertEqual(records, [{"n": 1}])
+        self.assertEqual(offset, len(b'{"n": 1}\n'))
+
+    def test_read_skips_corrupt_line(self):
+        with open(self.path, "wb") as f:
+            f.write(b'{"n": 1}\nnot json\n{"n": 3}\n')
+        records, _ = read_records(self.path)
+        self.assertEqual(records, [{"n": 1}, {"n": 3}])
+
+    def test_recover_truncates_partial_record(self):
+        with open(self.path, "wb") as f:
+            f.write(b'{"n": 1}\n{"n": 2}\n{"n"')
+        self.assertEqual(recover(self.path), len(b'{"n"'))
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b'{"n": 1}\n{"n": 2}\n')
+
+    def test_recover_keeps_complete_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b'{"n": 1}\n')
+        self.assertEqual(recover(self.path), 0)
+        self.assertEqual(recover(os.path.join(self.tmp.name, "missing.jsonl")), 0)
+
+    def test_recover_file_without_newline(self):
+        with open(self.path, "wb") as f:
+            f.write(b'{"n"')
+        self.assertEqual(recover(self.path), 4)
+        self.assertEqual(os.path.getsize(self.path), 0)
+
+    def test_store_recovers_before_appending(self):
+        with open(self.path, "wb") as f:
+            f.write(b'{"n": 1}\n{"n": 2')
+        with ResultStore(self.path) as store:
+            store.append({"n": 3})
+        self.assertEqual(read_records(self.path)[0], [{"n": 1}, {"n": 3}])
+
+    def test_migrate_json_array(self):
+        legacy = os.path.join(self.tmp.name, "results.json")
+        with open(legacy, "w") as f:
+            json.dump([{"n": 1}, {"n": 2}], f)
+        self.assertEqual(migrate_json_array(legacy, self.path), 2)
+        self.assertEqual(read_records(self.path)[0], [{"n": 1}, {"n": 2}])
+        # Only the first run converts
+        self.assertEqual(migrate_json_array(legacy, self.path), 0)
+
+    def test_migrate_corrupt_json_array_retries(self):
+        legacy = os.path.join(self.tmp.name, "results.json")
+        with open(legacy, "w") as f:
+            f.write('[{"n": 1}, {"n"')
+        with self.assertRaises(ValueError):
+            migrate_json_array(legacy, self.path)
+        self.assertFalse(os.path.exists(self.path))
+
+        with open(legacy, "w") as f:
+            json.dump([{"n": 1}], f)
+        self.assertEqual(migrate_json_array(legacy, self.path), 1)
+        self.assertEqual(read_records(self.path)[0], [{"n": 1}])
+
+
+if __name__ == "__main__":
+    unittest.main()
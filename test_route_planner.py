@@ -0,0 +1,57 @@
+import itertools
+import os
+import random
+import tempfile
+import unittest
+from route_planner import RouteProgress, navigation_taps, plan_route, route_taps
+
+
+class TestRoutePlanner(unittest.TestCase):
+
+    def test_navigation_taps(self):
+        # Menu + Go, then each field: the field, its digits and the checkmark
+        self.assertEqual(navigation_taps(None, (914, 12, 345)), 2 + 5 + 4 + 5)
+        self.assertEqual(navigation_taps((914, 12, 345), (914, 12, 7)), 2 + 3)
+        self.assertEqual(navigation_taps((914, 12, 345), (914, 12, 345)), 2)
+
+    def test_route_taps_uses_start(self):
+        route = [(1, 10, 10), (1, 10, 20)]
+        self.assertEqual(route_taps(route), navigation_taps(None, route[0]) + 2 + 4)
+        self.assertEqual(route_taps(route, start=(1, 10, 5)), 2 + 4 + 2 + 4)
+
+    def test_plan_visits_every_point_once(self):
+        rng = random.Random(5)
+        points = [(rng.choice([1, 2]), rng.randrange(20), rng.randrange(20)) for _ in range(300)]
+        route = plan_route(points)
+        self.assertEqual(sorted(route), sorted(set(points)))
+
+    def test_plan_never_costs_more_than_file_order(self):
+        rng = random.Random(7)
+        points = list({(914, rng.randrange(30), rng.randrange(30)) for _ in range(200)})
+        rng.shuffle(points)
+        self.assertLessEqual(route_taps(plan_route(points)), route_taps(points))
+
+    def test_plan_is_optimal_on_small_input(self):
+        points = [(1, 5, 100), (1, 300, 7), (1, 6, 100), (1, 300, 8), (2, 6, 7)]
+        start = (1, 5, 100)
+        best = min(route_taps(order, start) for order in itertools.permutations(points))
+        self.assertEqual(route_taps(plan_route(points, start), start), best)
+
+    def test_progress_resumes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "progress.json")
+            progress = RouteProgress(path)
+            progress.mark([1, 2, 3])
+            progress.mark((1, 2, 4))
+
+            resumed = RouteProgress(path)
+            self.assertEqual(resumed.last, (1, 2, 4))
+            self.assertEqual(resumed.remaining([(1, 2, 3), (1, 2, 5), [1, 2, 4]]), [(1, 2, 5)])
+
+            resumed.clear()
+            self.assertFalse(os.path.exists(path))
+            self.assertEqual(RouteProgress(path).remaining([(1, 2, 3)]), [(1, 2, 3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
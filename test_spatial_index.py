@@ -0,0 +1,83 @@
+import math
+import os
+import random
+import tempfile
+import unittest
+from result_store import ResultStore
+from spatial_index import SpatialIndex
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SpatialIndex(bucket_size=16)
+        rng = random.Random(3)
+        self.tiles = {}
+        for _ in range(2000):
+            x, y = rng.randrange(512), rng.randrange(1024)
+            tile_class = rng.choice(["resources", "enemies", "terrain"])
+            self.index.insert(1, x, y, tile_class)
+            self.tiles[(x, y)] = tile_class
+
+    def brute_nearest(self, x, y, tile_class):
+        distances = sorted(math.hypot(tx - x, ty - y) for (tx, ty), c in self.tiles.items() if c == tile_class)
+        return distances
+
+    def test_reinsert_replaces_class(self):
+        index = SpatialIndex()
+        index.insert(1, 5, 5, "terrain")
+        index.insert(1, 5, 5, "resources", {"id": 1})
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.in_rect(1, 0, 0, 10, 10, "terrain"), [])
+        self.assertEqual(index.in_rect(1, 0, 0, 10, 10), [(5, 5, "resources", {"id": 1})])
+
+    def test_in_rect_matches_brute_force(self):
+        found = self.index.in_rect(1, 100, 300, 40, 200, ["resources", "enemies"])
+        expected = {(x, y) for (x, y), c in self.tiles.items()
+                    if 40 <= x <= 100 and 200 <= y <= 300 and c in ("resources", "enemies")}
+        self.assertEqual({(x, y) for x, y, _, _ in found}, expected)
+
+    def test_within_radius_is_sorted_and_complete(self):
+        found = self.index.within_radius(1, 250, 500, 40, "enemies")
+        distances = [math.hypot(x - 250, y - 500) for x, y, _, _ in found]
+        self.assertEqual(distances, sorted(distances))
+        expected = [d for d in self.brute_nearest(250, 500, "enemies") if d <= 40]
+        self.assertEqual(len(found), len(expected))
+
+    def test_nearest_matches_brute_force(self):
+        for x, y in [(0, 0), (511, 1023), (250, 500), (17, 900)]:
+            found = self.index.nearest(1, x, y, 5, "resources")
+            self.assertEqual([round(d, 6) for d, _ in found],
+                             [round(d, 6) for d in self.brute_nearest(x, y, "resources")[:5]])
+
+    def test_nearest_of_missing_class(self):
+        self.assertEqual(self.index.nearest(1, 10, 10, 3, "darknest"), [])
+        self.assertEqual(self.index.nearest(2, 10, 10, 3), [])
+
+    def test_insert_text(self):
+        index = SpatialIndex()
+        self.assertTrue(index.insert_text("Gold Mine\nK:12 X:34 Y:56"))
+        self.assertFalse(index.insert_text("no coordinates"))
+        self.assertEqual(index.in_rect(12, 34, 56, 34, 56), [(34, 56, "resources", None)])
+
+    def test_kxy_only_text_keeps_class(self):
+        index = SpatialIndex()
+        index.insert_text("Gold Mine\nK:12 X:34 Y:56")
+        self.assertTrue(index.insert_text("K:12 X:34 Y:56"))
+        self.assertEqual(index.in_rect(12, 34, 56, 34, 56), [(34, 56, "resources", None)])
+
+    def test_update_from_log_reads_only_new_records(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.jsonl")
+            with ResultStore(path) as store:
+                store.extend([{"text": "Forest K:1 X:1 Y:1"}, {"text": "nothing"}])
+            index = SpatialIndex()
+            self.assertEqual(index.update_from_log(path), 1)
+            with ResultStore(path) as store:
+                store.append({"text": "Guild profile K:1 X:2 Y:2"})
+            self.assertEqual(index.update_from_log(path), 1)
+            self.assertEqual(len(index), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from calibration import Calibration
+from tap_lattice import (BAD_AREAS, EDGE_MARGIN, SCREEN_SIZE, generate_tap_points, is_point_in_bad_area,
+                         load_tap_points, save_tap_points)
+
+CALIBRATION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibration.json")
+
+
+class TestTapLattice(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.calibration = Calibration.load(CALIBRATION_PATH)
+        cls.points = generate_tap_points(cls.calibration)
+
+    def test_points_keep_a_full_crop_on_screen(self):
+        xs, ys = np.array(self.points).T
+        self.assertGreaterEqual(EDGE_MARGIN, 50 // 2)
+        self.assertTrue((xs >= EDGE_MARGIN).all() and (xs <= SCREEN_SIZE[0] - 1 - EDGE_MARGIN).all())
+        self.assertTrue((ys >= EDGE_MARGIN).all() and (ys <= SCREEN_SIZE[1] - 1 - EDGE_MARGIN).all())
+
+    def test_points_avoid_ui(self):
+        self.assertFalse(any(is_point_in_bad_area(x, y, BAD_AREAS) for x, y in self.points))
+
+    def test_one_point_per_tile(self):
+        tiles = self.calibration.predict_tiles(self.points, np.zeros(2))
+        self.assertEqual(len({tuple(tile) for tile in tiles}), len(self.points))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tiles.json")
+            save_tap_points(self.points, path)
+            self.assertEqual(load_tap_points(path), self.points)
+
+
+if __name__ == "__main__":
+    unittest.main()
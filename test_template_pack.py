@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import cv2
+import numpy as np
+from template_pack import TemplatePack
+
+
+class TestTemplatePack(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.templates_dir = os.path.join(self.tmp.name, "game_templates")
+        self.pack_dir = os.path.join(self.tmp.name, "template_pack")
+        self.rng = np.random.default_rng(0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_template(self, category, name, shape=(50, 50)):
+        os.makedirs(os.path.join(self.templates_dir, category), exist_ok=True)
+        path = os.path.join(self.templates_dir, category, name)
+        cv2.imwrite(path, self.rng.integers(0, 256, shape, dtype=np.uint8))
+        return path
+
+    def open_pack(self):
+        return TemplatePack(self.pack_dir, self.templates_dir)
+
+    def test_build_and_reopen(self):
+        path = self.write_template("resources", "resources_X12_Y34_20240101.png")
+        self.write_template("terrain", "grass.png", shape=(60, 40))
+        pack = self.open_pack()
+        self.assertEqual(pack.refresh(), (2, 0))
+        self.assertEqual(pack.images.shape, (2, 50, 50))
+        self.assertEqual(pack.entries[0]["coords"], [12, 34])
+        self.assertIsNone(pack.entries[1]["coords"])
+        np.testing.assert_array_equal(pack.images[0], cv2.imread(path, cv2.IMREAD_GRAYSCALE))
+
+        reopened = self.open_pack()
+        self.assertEqual(len(reopened), 2)
+        self.assertIsInstance(reopened.images, np.memmap)
+        self.assertEqual(reopened.refresh(), (0, 0))
+        self.assertEqual(set(reopened.templates()), {entry["path"] for entry in pack.entries})
+
+    def test_refresh_tracks_changes(self):
+        self.write_template("resources", "a.png")
+        removed = self.write_template("resources", "b.png")
+        pack = self.open_pack()
+        pack.refresh()
+
+        os.remove(removed)
+        self.write_template("enemies", "c.png")
+        self.assertEqual(pack.refresh(), (1, 1))
+        self.assertEqual([entry["category"] for entry in pack.entries], ["enemies", "resources"])
+        self.assertEqual(pack.images.shape[0], 2)
+
+    def test_touched_file_is_not_repacked(self):
+        path = self.write_template("resources", "a.png")
+        pack = self.open_pack()
+        pack.refresh()
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+        self.assertEqual(pack.refresh(), (0, 0))
+        self.assertEqual(pack.entries[0]["mtime"], stat.st_mtime + 10)
+
+    @patch("template_pack.LOAD_RETRY_DELAY", 0)
+    def test_stale_manifest_is_rejected(self):
+        self.write_template("resources", "a.png")
+        pack = self.open_pack()
+        pack.refresh()
+        manifest_path = os.path.join(self.pack_dir, "manifest.json")
+        with open(manifest_path) as f:
+            stale = f.read()
+
+        # A manifest naming a generation that a later write has removed
+        self.write_template("resources", "b.png")
+        pack.refresh()
+        with open(manifest_path, "w") as f:
+            f.write(stale)
+
+        reader = self.open_pack()
+        self.assertEqual(len(reader), 0)
+        self.assertEqual(reader.refresh(), (2, 0))
+        self.assertEqual(reader.images.shape[0], 2)
+
+    def test_rewrite_uses_a_new_generation(self):
+        self.write_template("resources", "a.png")
+        pack = self.open_pack()
+        pack.refresh()
+        reader = self.open_pack()
+        before = np.array(reader.images)
+
+        self.write_template("resources", "b.png")
+        pack.refresh()
+        self.assertEqual(pack.images_file, "images_2.npy")
+        self.assertEqual(sorted(os.listdir(self.pack_dir)), ["images_2.npy", "manifest.json"])
+        # The reader's mapping was never replaced underneath it
+        np.testing.assert_array_equal(reader.images, before)
+        self.assertEqual(len(self.open_pack()), 2)
+
+    def test_legacy_pack_is_loaded_and_replaced(self):
+        self.write_template("resources", "a.png")
+        pack = self.open_pack()
+        pack.refresh()
+        # Lay the pack out as packs written before generations were
+        os.replace(os.path.join(self.pack_dir, "images_1.npy"), os.path.join(self.pack_dir, "images.npy"))
+        manifest_path = os.path.join(self.pack_dir, "manifest.json")
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        del manifest["images"]
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+
+        legacy = self.open_pack()
+        self.assertEqual(legacy.images_file, "images.npy")
+        self.assertEqual(len(legacy), 1)
+        self.write_template("resources", "b.png")
+        legacy.refresh()
+        self.assertEqual(sorted(os.listdir(self.pack_dir)), ["images_1.npy", "manifest.json"])
+
+    def test_other_size_is_rebuilt(self):
+        self.write_template("resources", "a.png")
+        self.open_pack().refresh()
+        pack = TemplatePack(self.pack_dir, self.templates_dir, size=(32, 32))
+        self.assertEqual(len(pack), 0)
+        pack.refresh()
+        self.assertEqual(pack.images.shape, (1, 32, 32))
+        with open(os.path.join(self.pack_dir, "manifest.json")) as f:
+            self.assertEqual(json.load(f)["size"], [32, 32])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from tile_db import TileDB, classified_tiles, has_class_text, make_observation
+
+
+class TestTileDB(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "tiles.db")
+        self.db = TileDB(self.path)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_has_class_text(self):
+        self.assertFalse(has_class_text("K:1 X:2 Y:3"))
+        self.assertFalse(has_class_text(None))
+        self.assertTrue(has_class_text("K:1 X:2 Y:3\nGold Mine"))
+
+    def test_observations_upsert_tiles(self):
+        self.db.add([
+            make_observation("Forest K:1 X:2 Y:3", "test", 0, "2024-01-01 10:00:00"),
+            make_observation("Gold Mine K:1 X:2 Y:3", "test", 1, "2024-01-01 11:00:00"),
+            make_observation("Grass K:1 X:2 Y:3", "test", 2, "2024-01-01 09:00:00"),
+        ])
+        tile = self.db.tile(1, 2, 3)
+        self.assertEqual(tile["tile_class"], "resources")
+        self.assertEqual(tile["observations"], 3)
+
+    def test_kxy_only_observation_keeps_class(self):
+        self.db.add([
+            make_observation("Gold Mine\nK:1 X:2 Y:3", "test", 0, "2024-01-01 10:00:00"),
+            make_observation("K:1 X:2 Y:3", "test", 1, "2024-01-01 11:00:00", tap=(50, 60)),
+        ])
+        tile = self.db.tile(1, 2, 3)
+        self.assertEqual(tile["tile_class"], "resources")
+        self.assertEqual(tile["text"], "Gold Mine\nK:1 X:2 Y:3")
+        self.assertEqual((tile["tap_x"], tile["observed_at"]), (50, "2024-01-01 11:00:00"))
+
+    def test_classified_tiles(self):
+        self.db.add([
+            make_observation("Gold Mine K:1 X:2 Y:3", "test", 0),
+            make_observation("Nothing known K:1 X:2 Y:4", "test", 1),
+            make_observation("K:1 X:2 Y:5", "test", 2),
+        ])
+        self.assertEqual(classified_tiles(self.path), {(1, 2, 3)})
+        self.assertEqual(classified_tiles(os.path.join(self.tmp.name, "missing.db")), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
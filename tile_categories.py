@@ -0,0 +1,19 @@
+# 📌 Tile categories, matching the game_templates sub-folders
+CATEGORIES = ["resources", "enemies", "terrain", "darknest", "unknown"]
+
+# Keywords in a tile popup's OCR text that identify each category, checked in order
+CATEGORY_KEYWORDS = [
+    ("resources", ["wood", "stone", "gold", "food", "vein", "ruins"]),
+    ("darknest", ["darknest", "min.", "2-player"]),
+    ("enemies", ["guild", "profile", "troops killed"]),
+    ("terrain", ["grass", "forest", "mountain", "beach", "lava"]),
+]
+
+
+def classify_tile_by_text(text):
+    """Classifies the tile based on detected text."""
+    text = text.lower()
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(word in text for word in keywords):
+            return category
+    return "unknown"
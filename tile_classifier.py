@@ -0,0 +1,118 @@
+import time
+import cv2
+import numpy as np
+from tap_lattice import load_tap_points
+
+# 📌 Classifier Parameters
+CROP_SIZE = 50          # Same crop as workflow_template_creation.crop_image
+MIN_SCORE = 0.80        # Normalized correlation below this leaves a tile unclassified
+
+
+def crop_tiles(frame, points, size=CROP_SIZE):
+    """
+    Every tile crop of a grayscale frame in one indexing step.
+
+    The frame is edge-padded by half a crop, so tiles at the screen border
+    still give full size x size crops.
+
+    Returns:
+        np.ndarray: (N, size, size) crops, one per (x, y) point.
+    """
+    half = size // 2
+    padded = np.pad(frame, half, mode="edge")
+    points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+    offsets = np.arange(size)
+    # Crop i spans rows y-half..y+half and columns x-half..x+half of the frame
+    rows = points[:, 1, None] + offsets
+    columns = points[:, 0, None] + offsets
+    return padded[rows[:, :, None], columns[:, None, :]]
+
+
+def normalize(stack):
+    """Flatten (N, h, w) images to zero-mean unit-length rows; flat images become zero rows."""
+    flat = stack.reshape(len(stack), -1).astype(np.float32)
+    flat -= flat.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(flat, axis=1, keepdims=True)
+    return np.divide(flat, norms, out=np.zeros_like(flat), where=norms > 1e-6)
+
+
+class TileClassifier:
+    """
+    Scores every tile crop against every template as one correlation matrix.
+
+    Templates are normalized once; per frame the crops are cut, normalized
+    and multiplied with the template matrix, so the cost is a single
+    (tiles x pixels) @ (pixels x templates) product.
+    """
+
+    def __init__(self, templates, size=CROP_SIZE):
+        """
+        Args:
+            templates (dict): {path: (image, category)} as returned by
+                match_template_workflow.load_templates.
+        """
+        self.size = size
+        self.names = list(templates)
+        self.categories = [templates[name][1] for name in self.names]
+        stack = np.stack([self._fit(templates[name][0]) for name in self.names]) \
+            if self.names else np.empty((0, size, size), dtype=np.uint8)
+        self.matrix = normalize(stack)
+        self.last_seconds = None
+
+    def _fit(self, image):
+        return image if image.shape == (self.size, self.size) else cv2.resize(image, (self.size, self.size))
+
+    @classmethod
+    def from_pack(cls, pack):
+        """Classifier over a template_pack.TemplatePack, normalizing its mapped array in one step."""
+        classifier = cls({}, pack.size[0])
+        classifier.names = [entry["path"] for entry in pack.entries]
+        classifier.categories = [entry["category"] for entry in pack.entries]
+        classifier.matrix = normalize(pack.images)
+        return classifier
+
+    def scores(self, frame, points):
+        """(N tiles, M templates) normalized correlation scores."""
+        return normalize(crop_tiles(frame, points, self.size)) @ self.matrix.T
+
+    def classify(self, frame, points, min_score=MIN_SCORE):
+        """
+        Best template per tile.
+
+        Returns:
+            list: {"tap", "template", "category", "score"} per point; template
+            and category are None when no template reaches min_score.
+        """
+        start = time.perf_counter()
+        if not self.names:
+            self.last_seconds = time.perf_counter() - start
+            return [{"tap": tuple(point), "template": None, "category": None, "score": 0.0} for point in points]
+
+        scores = self.scores(frame, points)
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(best)), best]
+
+        results = []
+        for point, template, score in zip(points, best.tolist(), best_scores.tolist()):
+            matched = score >= min_score
+            results.append({
+                "tap": tuple(point),
+                "template": self.names[template] if matched else None,
+                "category": self.categories[template] if matched else None,
+                "score": score,
+            })
+        self.last_seconds = time.perf_counter() - start
+        return results
+
+
+if __name__ == "__main__":
+    from match_template_workflow import load_screenshot
+    from template_pack import load_pack
+
+    classifier = TileClassifier.from_pack(load_pack())
+    screenshot = load_screenshot()
+    if screenshot is not None:
+        results = classifier.classify(screenshot, load_tap_points())
+        matched = sum(result["template"] is not None for result in results)
+        print(f"✔ Classified {len(results)} tiles against {len(classifier.names)} templates "
+              f"in {classifier.last_seconds * 1000:.1f} ms ({matched} matched)")
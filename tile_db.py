@@ -0,0 +1,304 @@
+import json
+import os
+import pathlib
+import re
+import sqlite3
+from datetime import datetime
+from kxy_analytics import KXY_PATTERN, extract_timestamp
+from result_store import LEGACY_RESULTS_FILE, RESULTS_FILE, read_records
+from tile_categories import classify_tile_by_text
+
+# 📂 Files
+DB_FILE = "tiles.db"
+CLICK_DATA_FILE = "old/click_data.json"
+REFINED_FILE = "old/refined.json"
+OCR_LABELS_FILE = "ocr_labels.txt"
+
+# 📌 Write Batching
+BATCH_SIZE = 500  # Observations per transaction
+
+OBSERVATION_FIELDS = [
+    "kingdom", "x", "y", "observed_at", "tap_x", "tap_y", "tile_class", "text", "screenshot", "source", "source_key",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY,
+    kingdom INTEGER,
+    x INTEGER,
+    y INTEGER,
+    observed_at TEXT,
+    tap_x INTEGER,
+    tap_y INTEGER,
+    tile_class TEXT,
+    text TEXT,
+    screenshot TEXT,
+    source TEXT NOT NULL,
+    source_key TEXT NOT NULL,
+    UNIQUE (source, source_key)
+);
+CREATE INDEX IF NOT EXISTS idx_observations_kxy ON observations (kingdom, x, y);
+CREATE INDEX IF NOT EXISTS idx_observations_tap ON observations (tap_x, tap_y);
+
+-- Latest observation per KXY tile
+CREATE TABLE IF NOT EXISTS tiles (
+    kingdom INTEGER NOT NULL,
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL,
+    observed_at TEXT,
+    tap_x INTEGER,
+    tap_y INTEGER,
+    tile_class TEXT,
+    text TEXT,
+    screenshot TEXT,
+    observations INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (kingdom, x, y)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_tiles_class ON tiles (tile_class, kingdom);
+
+-- Every new observation with a KXY upserts its tile, so re-imports never double count.
+-- Dropped first so databases made before the class-keeping rule get the current trigger
+DROP TRIGGER IF EXISTS observations_upsert_tile;
+CREATE TRIGGER observations_upsert_tile AFTER INSERT ON observations
+WHEN NEW.kingdom IS NOT NULL
+BEGIN
+    INSERT INTO tiles (kingdom, x, y, observed_at, tap_x, tap_y, tile_class, text, screenshot)
+    VALUES (NEW.kingdom, NEW.x, NEW.y, NEW.observed_at, NEW.tap_x, NEW.tap_y, NEW.tile_class, NEW.text, NEW.screenshot)
+    ON CONFLICT (kingdom, x, y) DO UPDATE SET observations = observations + 1;
+    -- An existing tile takes the new details only if they are at least as recent;
+    -- a KXY-only observation (no class) keeps the class and text it already has
+    UPDATE tiles SET
+        observed_at = NEW.observed_at,
+        tap_x = NEW.tap_x,
+        tap_y = NEW.tap_y,
+        tile_class = COALESCE(NEW.tile_class, tile_class),
+        text = CASE WHEN NEW.tile_class IS NULL THEN text ELSE NEW.text END,
+        screenshot = NEW.screenshot
+    WHERE kingdom = NEW.kingdom AND x = NEW.x AND y = NEW.y AND observations > 1
+      AND (observed_at IS NULL OR NEW.observed_at >= observed_at);
+END;
+"""
+
+
+def make_observation(text, source, source_key, observed_at=None, tap=None, screenshot=None, kxy=None):
+    """
+    Build an observation dict from OCR text.
+
+    The KXY is taken from kxy (if given) or the text, and the tile class from the text;
+    text holding nothing but the KXY line (see kxy_ocr) has no class.
+    """
+    match = KXY_PATTERN.search(kxy or "") or KXY_PATTERN.search(text or "")
+    kingdom, x, y = (int(value) for value in match.groups()) if match else (None, None, None)
+    if isinstance(observed_at, datetime):
+        observed_at = observed_at.isoformat(sep=" ")
+    return {
+        "kingdom": kingdom,
+        "x": x,
+        "y": y,
+        "observed_at": observed_at,
+        "tap_x": tap[0] if tap else None,
+        "tap_y": tap[1] if tap else None,
+        "tile_class": classify_tile_by_text(text) if has_class_text(text) else None,
+        "text": text,
+        "screenshot": screenshot,
+        "source": source,
+        "source_key": str(source_key),
+    }
+
+
+def has_class_text(text):
+    """True if text holds more than the KXY line, so its tile class can be read from it."""
+    return bool(KXY_PATTERN.sub("", text or "").strip())
+
+
+def classified_tiles(path=DB_FILE):
+    """
+    (kingdom, x, y) of every tile with a known class.
+
+    Opened read-only, so OCR workers can call it while an importer writes.
+    """
+    if not os.path.exists(path):
+        return set()
+    conn = sqlite3.connect(f"{pathlib.Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        return set(conn.execute("SELECT kingdom, x, y FROM tiles WHERE tile_class != 'unknown'"))
+    except sqlite3.DatabaseError:
+        return set()  # No tiles table yet
+    finally:
+        conn.close()
+
+
+def _file_time(path):
+    return datetime.fromtimestamp(os.path.getmtime(path)).isoformat(sep=" ", timespec="seconds")
+
+
+class TileDB:
+    """Embedded SQLite store of tile observations, with the latest one per KXY in `tiles`."""
+
+    def __init__(self, path=DB_FILE, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # WAL keeps this crash-safe
+        self.conn.executescript(SCHEMA)
+
+    def add(self, observations):
+        """
+        Insert observations in batches of batch_size per transaction.
+
+        Observations already stored under the same (source, source_key) are skipped.
+
+        Returns:
+            int: Number of new observations.
+        """
+        columns = ", ".join(OBSERVATION_FIELDS)
+        placeholders = ", ".join(f":{field}" for field in OBSERVATION_FIELDS)
+        sql = f"INSERT OR IGNORE INTO observations ({columns}) VALUES ({placeholders})"
+
+        added = 0
+        batch = []
+        for observation in observations:
+            batch.append(observation)
+            if len(batch) >= self.batch_size:
+                added += self._insert(sql, batch)
+                batch = []
+        if batch:
+            added += self._insert(sql, batch)
+        return added
+
+    def _insert(self, sql, batch):
+        # Ignored rows take no id, so the id high-water mark counts the inserts
+        last_id = "SELECT COALESCE(MAX(id), 0) FROM observations"
+        with self.conn:
+            before = self.conn.execute(last_id).fetchone()[0]
+            self.conn.executemany(sql, batch)
+            return self.conn.execute(last_id).fetchone()[0] - before
+
+    # 🔍 Queries
+
+    def tile(self, kingdom, x, y):
+        """Latest observation of one tile as a dict, or None."""
+        row = self.conn.execute("SELECT * FROM tiles WHERE kingdom = ? AND x = ? AND y = ?", (kingdom, x, y)).fetchone()
+        return dict(row) if row else None
+
+    def tiles(self, tile_class=None, kingdom=None):
+        """All known tiles, optionally filtered by class and kingdom."""
+        sql = "SELECT * FROM tiles WHERE 1 = 1"
+        params = []
+        if tile_class is not None:
+            sql += " AND tile_class = ?"
+            params.append(tile_class)
+        if kingdom is not None:
+            sql += " AND kingdom = ?"
+            params.append(kingdom)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def observations_at(self, kingdom, x, y):
+        """Every observation of one tile, oldest first."""
+        rows = self.conn.execute(
+            "SELECT * FROM observations WHERE kingdom = ? AND x = ? AND y = ? ORDER BY observed_at, id", (kingdom, x, y)
+        )
+        return [dict(row) for row in rows]
+
+    def observations_by_tap(self, tap_x, tap_y):
+        """Every observation made by tapping one screen point."""
+        rows = self.conn.execute("SELECT * FROM observations WHERE tap_x = ? AND tap_y = ? ORDER BY id", (tap_x, tap_y))
+        return [dict(row) for row in rows]
+
+    def counts(self):
+        observations = self.conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+        tiles = self.conn.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+        by_class = dict(self.conn.execute("SELECT tile_class, COUNT(*) FROM tiles GROUP BY tile_class").fetchall())
+        return {"observations": observations, "tiles": tiles, "by_class": by_class}
+
+    # 📥 Importers for the existing artifacts
+
+    def import_ocr_results(self, path=RESULTS_FILE):
+        """ocr_results.jsonl (or the legacy JSON array) from ocr_to_json / the scan pipeline."""
+        if not os.path.exists(path):
+            return 0
+        if path.endswith(".jsonl"):
+            records = read_records(path)[0]
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+
+        # The JSON array and its JSONL migration hold the same records in the same order
+        source = os.path.splitext(os.path.basename(path))[0]
+
+        def observations():
+            for i, record in enumerate(records):
+                filename = record.get("filename", "")
+                try:
+                    observed_at = extract_timestamp(filename)
+                except (ValueError, IndexError):
+                    observed_at = None
+                tap = (record["x"], record["y"]) if "x" in record and "y" in record else None
+                yield make_observation(record.get("text", ""), source, i, observed_at, tap, filename)
+
+        return self.add(observations())
+
+    def import_click_data(self, path=CLICK_DATA_FILE):
+        """click_data.json / refined.json records from the old grid mappers."""
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        observed_at = _file_time(path)
+        return self.add(
+            make_observation(record.get("metadata", ""), os.path.basename(path), i, observed_at,
+                             (record.get("x"), record.get("y")), record.get("screenshot"), record.get("kxy"))
+            for i, record in enumerate(records)
+        )
+
+    def import_ocr_labels(self, path=OCR_LABELS_FILE):
+        """ocr_labels.txt: `template | (x, y) | text` records, the text running over several lines."""
+        if not os.path.exists(path):
+            return 0
+        header = re.compile(r"^(\S+\.png) \| \((\d+), (\d+)\) \| (.*)$")
+        observed_at = _file_time(path)
+
+        records = []
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                match = header.match(line.rstrip("\n"))
+                if match:
+                    records.append([match.group(1), (int(match.group(2)), int(match.group(3))), [match.group(4)]])
+                elif records:
+                    records[-1][2].append(line.rstrip("\n"))
+
+        return self.add(
+            make_observation("\n".join(lines).strip(), os.path.basename(path), i, observed_at, tap, template)
+            for i, (template, tap, lines) in enumerate(records)
+        )
+
+    def import_all(self):
+        """Import every known artifact; safe to re-run."""
+        results_file = RESULTS_FILE if os.path.exists(RESULTS_FILE) else LEGACY_RESULTS_FILE
+        return {
+            results_file: self.import_ocr_results(results_file),
+            CLICK_DATA_FILE: self.import_click_data(CLICK_DATA_FILE),
+            REFINED_FILE: self.import_click_data(REFINED_FILE),
+            OCR_LABELS_FILE: self.import_ocr_labels(OCR_LABELS_FILE),
+        }
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+if __name__ == "__main__":
+    with TileDB() as db:
+        for source, added in db.import_all().items():
+            print(f"✔ {source}: {added} new observations")
+        counts = db.counts()
+        print(f"📊 {counts['observations']} observations, {counts['tiles']} unique tiles")
+        for tile_class, count in sorted(counts["by_class"].items()):
+            print(f"🔹 {tile_class}: {count}")
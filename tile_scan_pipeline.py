@@ -0,0 +1,230 @@
+import multiprocessing as mp
+import os
+import threading
+import time
+from datetime import datetime
+import ocr_engine
+from kxy_ocr import read_kxy_item
+from adb_session import AdbSessionError, get_session
+from calibration import Calibration, KxyTracker
+from frame_stream import wait_for_ui_change
+from result_store import ResultStore, migrate_json_array
+from screen_capture import ScreenCaptureError, capture_frame, save_frame
+from workflow_tile_scan import UI_CHANGE_TIMEOUT, check_adb_connection, coordinates
+import ocr_to_json
+
+# 📌 Pipeline Parameters
+DEVICE_ID = None                          # None = the only connected device
+OCR_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+FRAME_QUEUE_SIZE = 8                      # Popups waiting for OCR before capture blocks
+REPORT_INTERVAL = 5.0                     # Seconds between progress reports
+SAVE_SCREENSHOTS = False                  # Also keep each popup in screenshots/
+PREDICT_KXY = True                        # With a calibration, predict KXY instead of OCRing every popup
+SPOT_CHECK_INTERVAL = 10                  # OCR every Nth popup to anchor the camera and catch drift
+
+
+class StageStats:
+    """Shared counters for one pipeline stage: items handled and seconds spent on them."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = mp.Value("i", 0)
+        self.busy = mp.Value("d", 0.0)
+        self.blocked = mp.Value("d", 0.0)  # Time spent waiting on a full downstream queue
+
+    def record(self, busy_seconds, blocked_seconds=0.0):
+        with self.items.get_lock():
+            self.items.value += 1
+            self.busy.value += busy_seconds
+            self.blocked.value += blocked_seconds
+
+
+def queue_depth(queue):
+    """Approximate queue size, or None where the platform cannot report it."""
+    try:
+        return queue.qsize()
+    except NotImplementedError:
+        return None
+
+
+# 🔍 OCR Stage
+def ocr_worker(frame_queue, result_queue, stats):
+    """Pull captured popups, OCR them, and hand the text to the writer."""
+    ocr_engine.init_worker()  # Persistent tesseract binding for this process
+    while True:
+        item = frame_queue.get()
+        if item is None:
+            result_queue.put(None)
+            return
+
+        start = time.perf_counter()
+        if not item["ocr"]:
+            text, error = "", None  # The writer fills in the predicted KXY
+        elif ocr_to_json.OCR_MODE == "kxy":
+            text, error = read_kxy_item((item["frame"], (item["x"], item["y"])))
+        else:
+            text, error = ocr_engine.ocr_item(item["frame"])
+        if error:
+            print(f"❌ OCR failed for {item['filename']}: {error}")
+        result = {"filename": item["filename"], "text": text, "x": item["x"], "y": item["y"], "ocr": item["ocr"]}
+
+        busy = time.perf_counter() - start
+        start = time.perf_counter()
+        result_queue.put(result)
+        stats.record(busy, time.perf_counter() - start)
+
+
+# 💾 Writer Stage
+def writer(result_queue, workers, stats, calibration=None):
+    """
+    Single owner of the results log; appends until every OCR worker is done.
+
+    With a calibration, OCR'd popups anchor a KxyTracker and the KXY of the
+    others is predicted. Those arriving before the first anchor wait for it.
+    """
+    finished_workers = 0
+    tracker = KxyTracker(calibration) if calibration else None
+    waiting = []
+
+    def finish(result):
+        if tracker:
+            kxy, predicted = tracker.observe((result["x"], result["y"]), result["text"])
+            if predicted:
+                result["text"] = f"{kxy}\n{result['text']}".strip()
+                result["kxy_predicted"] = True
+        del result["ocr"]
+        store.append(result)
+
+    with ResultStore(ocr_to_json.OUTPUT_FILE) as store:
+        while finished_workers < workers:
+            result = result_queue.get()
+            if result is None:
+                finished_workers += 1
+                continue
+
+            start = time.perf_counter()
+            if tracker and not result["ocr"] and tracker.camera is None:
+                waiting.append(result)
+            else:
+                finish(result)
+                if waiting and tracker.camera is not None:
+                    for pending in waiting:
+                        finish(pending)
+                    waiting = []
+            stats.record(time.perf_counter() - start)
+
+        for pending in waiting:
+            finish(pending)  # Never anchored; stored without a KXY
+
+    if tracker:
+        print(f"📊 KXY spot checks: {tracker.checked} checked, {tracker.drifted} disagreed with the calibration")
+
+
+# 📸 Capture Stage
+def capture_popups(frame_queue, stats, session, spot_check_interval=None):
+    """
+    Tap each coordinate and queue the popup; blocks when OCR falls behind.
+
+    With spot_check_interval, only every Nth popup is sent for OCR and the
+    rest are queued without their frame for the writer to predict.
+    """
+    baseline = capture_frame(DEVICE_ID)
+
+    for index, (x, y) in enumerate(coordinates):
+        start = time.perf_counter()
+        try:
+            session.run(f"input tap {x} {y}")
+            change = wait_for_ui_change(timeout=UI_CHANGE_TIMEOUT, baseline=baseline, device_id=DEVICE_ID)
+            if not change.changed:
+                print(f"⚠️ Screen did not change after tapping ({x}, {y}). Skipping...")
+                baseline = change.frame
+                continue
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            filename = f"screenshot_{timestamp}_x{x}_y{y}.png"
+            if SAVE_SCREENSHOTS:
+                save_frame(change.frame, os.path.join(ocr_to_json.SCREENSHOTS_DIR, filename))
+
+            session.run("input keyevent 111")  # Escape closes the popup
+            baseline = wait_for_ui_change(timeout=UI_CHANGE_TIMEOUT, baseline=change.frame,
+                                          device_id=DEVICE_ID).frame
+        except (AdbSessionError, ScreenCaptureError) as e:
+            print(f"❌ Error processing ({x}, {y}): {e}")
+            continue
+
+        busy = time.perf_counter() - start
+        start = time.perf_counter()
+        ocr = spot_check_interval is None or index % spot_check_interval == 0
+        frame = change.frame if ocr else None
+        frame_queue.put({"filename": filename, "x": x, "y": y, "frame": frame, "ocr": ocr})  # Backpressure
+        stats.record(busy, time.perf_counter() - start)
+
+
+def report(stages, queues, started):
+    """Print per-stage throughput and queue depths."""
+    elapsed = time.monotonic() - started
+    print(f"\n📊 Pipeline ({elapsed:.0f}s)")
+    for stage in stages:
+        items = stage.items.value
+        busy = stage.busy.value
+        rate = items / elapsed if elapsed else 0.0
+        per_item = busy / items if items else 0.0
+        print(f"🔹 {stage.name:<8} {items:5d} done, {rate:5.2f}/s, "
+              f"{per_item:.2f}s busy per item, {stage.blocked.value:.1f}s blocked downstream")
+    depths = ", ".join(f"{name}={queue_depth(queue)}" for name, queue in queues.items())
+    print(f"🔹 Queue depths: {depths}")
+
+
+def run_pipeline():
+    check_adb_connection()
+    # Convert the old ocr_results.json array before the writer starts appending
+    migrate_json_array(jsonl_path=ocr_to_json.OUTPUT_FILE)
+
+    calibration = Calibration.load() if PREDICT_KXY and ocr_to_json.OCR_MODE == "kxy" else None
+    spot_check_interval = SPOT_CHECK_INTERVAL if calibration else None
+    if calibration:
+        print(f"✔ Calibrated: OCR on every {SPOT_CHECK_INTERVAL}th popup, KXY predicted for the rest")
+
+    frame_queue = mp.Queue(maxsize=FRAME_QUEUE_SIZE)
+    result_queue = mp.Queue()
+    capture_stats = StageStats("capture")
+    ocr_stats = StageStats("ocr")
+    writer_stats = StageStats("writer")
+    stages = [capture_stats, ocr_stats, writer_stats]
+    queues = {"frames": frame_queue, "results": result_queue}
+
+    workers = [
+        mp.Process(target=ocr_worker, args=(frame_queue, result_queue, ocr_stats), daemon=True)
+        for _ in range(OCR_WORKERS)
+    ]
+    writer_process = mp.Process(target=writer, args=(result_queue, OCR_WORKERS, writer_stats, calibration))
+    for process in workers + [writer_process]:
+        process.start()
+
+    started = time.monotonic()
+    done = threading.Event()
+
+    def reporter():
+        while not done.wait(REPORT_INTERVAL):
+            report(stages, queues, started)
+
+    threading.Thread(target=reporter, daemon=True).start()
+
+    session = get_session(DEVICE_ID)
+    try:
+        capture_popups(frame_queue, capture_stats, session, spot_check_interval)
+    finally:
+        for _ in workers:
+            frame_queue.put(None)
+        for process in workers:
+            process.join()
+        writer_process.join()
+        done.set()
+        session.close()
+
+    report(stages, queues, started)
+    print("✅ Pipelined tile scan complete!")
+
+
+if __name__ == "__main__":
+    run_pipeline()
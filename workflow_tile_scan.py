@@ -2,148 +2,22 @@ import os
 import subprocess
 import time
 from datetime import datetime
+from screen_capture import ScreenCaptureError, capture_frame, save_frame
+from frame_stream import open_device_stream, wait_for_ui_change
+from tap_lattice import load_tap_points
 
 # Ensure screenshots directory exists
 os.makedirs('screenshots', exist_ok=True)
 
+# Read frames from a continuous screen stream instead of one capture per tap
+USE_FRAME_STREAM = False
+frame_stream = None
+
+# Longest wait for a popup to open or close before treating the tap as a no-op
+UI_CHANGE_TIMEOUT = 1.5
+
 # Define coordinates
-coordinates = [
-    (99, 451),
-    (332, 451),
-    (568, 451),
-    (802, 451),
-    (1031, 451),
-    (1262, 451),
-    (1479, 451),
-    (99, 893),
-    (332, 893),
-    (568, 893),
-    (802, 893),
-    (1031, 893),
-    (1262, 893),
-    (1470, 889),
-    (15, 850),
-    (215, 850),
-    (450, 850),
-    (684, 850),
-    (916, 850),
-    (1145, 850),
-    (1377, 850),
-    (99, 451),
-    (332, 451),
-    (568, 451),
-    (802, 451),
-    (1031, 451),
-    (1262, 451),
-    (1479, 451),
-    (99, 893),
-    (332, 893),
-    (568, 893),
-    (802, 893),
-    (1031, 893),
-    (1262, 893),
-    (1470, 889),
-    (15, 850),
-    (215, 850),
-    (450, 850),
-    (684, 850),
-    (916, 850),
-    (1145, 850),
-    (1377, 850),
-    (99, 795),
-    (332, 795),
-    (568, 795),
-    (802, 795),
-    (1031, 795),
-    (1262, 795),
-    (1470, 795),
-    (215, 734),
-    (450, 734),
-    (684, 734),
-    (916, 734),
-    (1145, 734),
-    (1377, 734),
-    (1581, 734),
-    (99, 678),
-    (332, 678),
-    (568, 678),
-    (802, 678),
-    (1031, 678),
-    (1262, 678),
-    (1479, 678),
-    (215, 620),
-    (450, 620),
-    (684, 620),
-    (916, 620),
-    (1145, 620),
-    (1377, 620),
-    (1581, 620),
-    (99, 562),
-    (332, 562),
-    (568, 562),
-    (802, 562),
-    (1031, 562),
-    (1262, 562),
-    (1479, 562),
-    (8, 505),
-    (215, 505),
-    (450, 505),
-    (684, 505),
-    (916, 505),
-    (1145, 505),
-    (1377, 505),
-    (1581, 505),
-    (8, 394),
-    (215, 394),
-    (450, 394),
-    (684, 394),
-    (916, 394),
-    (1145, 394),
-    (1377, 394),
-    (1581, 394),
-    (99, 338),
-    (332, 338),
-    (568, 338),
-    (802, 338),
-    (1031, 338),
-    (1262, 338),
-    (1479, 338),
-    (8, 281),
-    (215, 281),
-    (450, 281),
-    (684, 281),
-    (916, 281),
-    (1145, 281),
-    (1377, 281),
-    (1581, 265),
-    (99, 225),
-    (332, 225),
-    (568, 225),
-    (802, 225),
-    (1031, 225),
-    (1262, 225),
-    (1479, 225),
-    (8, 168),
-    (215, 168),
-    (450, 168),
-    (684, 168),
-    (916, 168),
-    (1145, 168),
-    (1377, 168),
-    (1581, 168),
-    (99, 112),
-    (332, 112),
-    (568, 112),
-    (799, 89),
-    (1012, 89),
-    (1262, 112),
-    (1442, 101),
-    (8, 61),
-    (215, 61),
-    (373, 61),
-    (1392, 61)
-    # Add more coordinates as needed
-]
+coordinates = load_tap_points()  # One tap per visible tile, see tap_lattice.py
 
 def check_adb_connection():
     """Check if an ADB device is connected before starting."""
@@ -156,46 +30,68 @@ def check_adb_connection():
         print(f"ADB check failed: {e}")
         exit(1)
 
-def capture_screenshot(x, y):
-    """Tap on coordinates, take a screenshot, and pull it to the local system."""
+def capture_screenshot(x, y, baseline=None):
+    """Tap on coordinates, capture the popup, and save it to the local system.
+
+    Returns the settled screen after the popup closes, to use as the
+    baseline for the next tap.
+    """
     try:
+        if baseline is None and not frame_stream:
+            baseline = capture_frame()
+
         # Tap the screen
+        tap_time = time.monotonic()
         subprocess.run(['adb', 'shell', 'input', 'tap', str(x), str(y)], check=True)
-        time.sleep(0.2)  # Ensure UI updates before screenshot
 
-        # Capture timestamp AFTER the screenshot is taken
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if frame_stream:
+            # Use the first streamed frame that differs from the pre-tap screen
+            frame = frame_stream.first_changed_frame(tap_time, timeout=UI_CHANGE_TIMEOUT)
+            if frame is None:
+                print(f"⚠️ Screen did not change after tapping ({x}, {y}). Skipping...")
+                return None
+            frame = frame.image
+        else:
+            # Wait until the popup has rendered rather than a fixed delay
+            change = wait_for_ui_change(timeout=UI_CHANGE_TIMEOUT, baseline=baseline)
+            if not change.changed:
+                print(f"⚠️ Screen did not change after tapping ({x}, {y}). Skipping...")
+                return change.frame
+            frame = change.frame
 
-        # Take a screenshot
-        subprocess.run(['adb', 'shell', 'screencap', '-p', '/sdcard/screenshot.png'], check=True)
+        # Capture timestamp AFTER the tap has settled; popups settle several times a
+        # second, so the name carries microseconds and the tap as well
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        screenshot_path = f'./screenshots/screenshot_{timestamp}_x{x}_y{y}.png'
+        save_frame(frame, screenshot_path)
 
-        # Wait for the file to be created
-        time.sleep(0.2)
+        # Press escape key
+        escape_time = time.monotonic()
+        subprocess.run(['adb', 'shell', 'input', 'keyevent', '111'], check=True)
 
-        # Check if the screenshot file exists before pulling
-        ls_output = subprocess.run(['adb', 'shell', 'ls', '/sdcard/screenshot.png'], capture_output=True, text=True)
-        if "No such file or directory" in ls_output.stdout:
-            print(f"❌ Screenshot not found on device for ({x}, {y}). Skipping...")
-            return
+        print(f"✔ Screenshot saved: {screenshot_path}")
 
-        # Pull the screenshot to local machine
-        subprocess.run(['adb', 'pull', '/sdcard/screenshot.png', f'./screenshots/screenshot_{timestamp}.png'], check=True)
+        # Wait for the popup to close before the next tap
+        if frame_stream:
+            frame_stream.first_changed_frame(escape_time, reference=frame, timeout=UI_CHANGE_TIMEOUT)
+            return None
+        return wait_for_ui_change(timeout=UI_CHANGE_TIMEOUT, baseline=frame).frame
 
-        # Delete screenshot from the device only if it exists
-        subprocess.run(['adb', 'shell', 'rm', '/sdcard/screenshot.png'], check=True)
+    except (subprocess.CalledProcessError, ScreenCaptureError) as e:
+        print(f"❌ Error processing ({x}, {y}): {e}")
+        return None
 
-        # Press escape key
-        subprocess.run(['adb', 'shell', 'input', 'keyevent', '111'], check=True)
+if __name__ == "__main__":
+    # Ensure ADB is connected before starting
+    check_adb_connection()
 
-        print(f"✔ Screenshot saved: screenshots/screenshot_{timestamp}.png")
-    
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error processing ({x}, {y}): {e}")
+    if USE_FRAME_STREAM:
+        frame_stream = open_device_stream()
 
-# Ensure ADB is connected before starting
-check_adb_connection()
+    # Loop through each coordinate, reusing each settled screen as the next baseline
+    baseline = None
+    for x, y in coordinates:
+        baseline = capture_screenshot(x, y, baseline)
 
-# Loop through each coordinate
-for x, y in coordinates:
-    capture_screenshot(x, y)
-    time.sleep(0.2)  # Small delay between taps
+    if frame_stream:
+        frame_stream.stop()